@@ -0,0 +1,95 @@
+"""Benchmark: bulk CV ingestion throughput (text + layout extraction) at several worker counts.
+
+Writes a synthetic HR export of multi-page PDF and DOCX CVs to a temporary
+directory (optionally as one zip archive) and reads it with ingest_cvs at
+each worker count. Reports wall time, CVs per second, speedup over one
+worker and this process's peak RSS. No LLM is involved.
+
+Usage: uv run python benchmarks/bench_ingest.py [--cvs 400] [--workers 1 2 4 8] [--pages 3] [--zip]
+"""
+
+import argparse
+import os
+import random
+import resource
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from cv_rank_agent.tools.cv_ingest import CVRecord, ingest_cvs
+
+SKILLS = ["Python", "Go", "Kubernetes", "PostgreSQL", "Kafka", "Terraform", "React", "AWS", "Rust", "Spark"]
+
+
+def _pdf(path: Path, name: str, pages: int, rng: random.Random) -> None:
+    import pymupdf
+
+    doc = pymupdf.open()
+    for number in range(pages):
+        page = doc.new_page()
+        y = 60
+        lines = [(name, 20, "hebo"), ("EXPERIENCE" if number else "SKILLS", 13, "hebo")]
+        lines += [(f"- {', '.join(rng.sample(SKILLS, 4))} on project {rng.randint(1, 999)}", 10, "helv")] * 40
+        for text, size, font in lines:
+            page.insert_text((50, y), text, fontsize=size, fontname=font)
+            y += size * 1.4
+    doc.save(path)
+
+
+def _docx(path: Path, name: str, pages: int, rng: random.Random) -> None:
+    from docx import Document
+
+    document = Document()
+    document.add_heading(name, level=1)
+    document.add_heading("Skills", level=2)
+    document.add_paragraph(", ".join(rng.sample(SKILLS, 6)))
+    document.add_heading("Experience", level=2)
+    for _ in range(20 * pages):
+        document.add_paragraph(f"Built {rng.choice(SKILLS)} services for team {rng.randint(1, 99)}.", style="List Bullet")
+    document.save(path)
+
+
+def _write_export(root: Path, count: int, pages: int, as_zip: bool) -> str:
+    rng = random.Random(7)
+    export = root / "export"
+    export.mkdir()
+    for i in range(count):
+        write = _pdf if i % 2 == 0 else _docx
+        write(export / f"cv-{i:05d}.{'pdf' if write is _pdf else 'docx'}", f"Candidate Number{i}", pages, rng)
+    if not as_zip:
+        return str(export)
+    archive = root / "export.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for path in sorted(export.iterdir()):
+            zf.write(path, f"export/{path.name}")
+    return str(archive)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cvs", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--pages", type=int, default=3, help="pages per PDF (DOCX CVs get a similar length)")
+    parser.add_argument("--zip", action="store_true", help="ingest one zip archive instead of a directory")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = _write_export(Path(tmp), args.cvs, args.pages, args.zip)
+        print(f"{args.cvs} CVs in {source} ({os.cpu_count()} CPU cores)\n")
+        print(f"{'workers':>8} {'wall s':>8} {'CVs/s':>8} {'speedup':>8} {'peak MB':>8} {'drafts':>7}")
+        single = None
+        for workers in dict.fromkeys(args.workers):
+            start = time.perf_counter()
+            records = drafts = 0
+            for record in ingest_cvs([source], workers=workers):
+                records += isinstance(record, CVRecord)
+                drafts += isinstance(record, CVRecord) and record.draft is not None
+            wall = time.perf_counter() - start
+            single = single or wall
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"{workers:>8} {wall:>8.2f} {records / wall:>8.1f} {single / wall:>7.1f}x {peak:>8.1f} {drafts:>7}")
+
+
+if __name__ == "__main__":
+    main()
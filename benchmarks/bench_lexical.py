@@ -0,0 +1,51 @@
+"""Benchmark: BM25 skill index build and query time for 500 to 100k synthetic jobs.
+
+Usage: uv run python benchmarks/bench_lexical.py [--query-terms 25]
+"""
+
+import argparse
+import random
+import time
+
+from cv_rank_agent.lexical import SYNONYMS, BM25Index, tokenize
+from cv_rank_agent.similarity import top_k
+
+SIZES = [500, 5_000, 20_000, 100_000]
+VOCABULARY = sorted(set(SYNONYMS.values())) + [f"skill{i}" for i in range(2_000)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--query-terms", type=int, default=25, help="skills in the CV query")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    query = tokenize(" ".join(rng.sample(VOCABULARY, args.query_terms)))
+
+    print(f"{'jobs':>8} {'build ms':>9} {'add µs/job':>11} {'query ms':>9} {'query µs/job':>13} {'+1 job ms':>10}")
+    for size in SIZES:
+        jobs = [tokenize(" ".join(rng.choices(VOCABULARY, k=rng.randint(20, 120)))) for _ in range(size)]
+        index = BM25Index()
+        start = time.perf_counter()
+        index.extend(jobs)
+        build_ms = (time.perf_counter() - start) * 1000
+        index.scores(query)  # pack postings once
+
+        start = time.perf_counter()
+        for _ in range(10):
+            top_k(index.scores(query), 10)
+        query_ms = (time.perf_counter() - start) * 100
+
+        # Incremental update: one new job, then the next query repacks only the touched terms
+        start = time.perf_counter()
+        index.add(jobs[0])
+        index.scores(query)
+        add_ms = (time.perf_counter() - start) * 1000
+        print(
+            f"{size:>8} {build_ms:>9.1f} {build_ms * 1000 / size:>11.2f} {query_ms:>9.2f}"
+            f" {query_ms * 1000 / size:>13.3f} {add_ms:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Benchmark: the real build_graph() end to end against a fake Ollama and a local job board.
+
+Each job count runs in a fresh subprocess (so peak RSS is per run) with an
+empty cache directory. Reports wall time, throughput, peak memory and, per
+graph node, the number of tasks, their summed run time and the span from
+the first task start to the last task end. Job pages are fetched with the
+HTTP crawl strategy unless ``--crawler browser`` is given.
+
+Results can be stored as a baseline; later runs are compared against it and
+the script exits with status 1 when wall time or peak memory regress by more
+than ``--tolerance``.
+
+Usage: uv run python benchmarks/bench_pipeline.py [--sizes 1 5 10 50 500]
+       [--save-baseline] [--baseline FILE] [--tolerance 0.25]
+       [--latency 0.02] [--prompt-rate 20000] [--gen-rate 2000] [--num-parallel 1] [--endpoints 1]
+       [--prompt-cache] [--batch-size 1] [--small-model-speedup 0] [--site-latency 0.02] [--crawler http|browser]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCHMARKS = Path(__file__).resolve().parent
+SMALL_MODEL = "fake-small:1b"  # JOB_PARSER_MODEL and CV_PARSER_MODEL with --small-model-speedup
+BASELINE = BENCHMARKS / "baselines" / "pipeline.json"
+SIZES = [1, 5, 10, 50, 500]
+
+
+def _write_cv(path: Path) -> Path:
+    from docx import Document
+
+    document = Document()
+    document.add_heading("Ada Example", level=1)
+    document.add_paragraph("Backend engineer with 7 years of Python, PostgreSQL and Kubernetes experience.")
+    document.add_heading("Skills", level=2)
+    document.add_paragraph("Python, FastAPI, PostgreSQL, Kafka, Docker, Kubernetes, AWS, machine learning")
+    document.add_heading("Experience", level=2)
+    document.add_paragraph("Senior Backend Engineer, Acme (2021 – now): event ingestion services and REST APIs.")
+    document.add_paragraph("Software Engineer, Beta (2017 – 2021): data pipelines and internal tooling in Python.")
+    document.save(path)
+    return path
+
+
+async def _run_graph(cv_path: Path, urls: list[str]) -> tuple[float, dict[str, dict[str, float]], int]:
+    """Run the compiled graph once; returns wall time, per-node timings and the number of scores."""
+    from cv_rank_agent.graph import build_graph
+    from cv_rank_agent.tools.web_crawl import close_shared_pool
+
+    graph = build_graph()
+    started: dict[str, tuple[str, float]] = {}
+    nodes: dict[str, dict[str, float]] = {}
+    scores = 0
+    start = time.perf_counter()
+    try:
+        async for mode, chunk in graph.astream(
+            {"cv_paths": [str(cv_path)], "job_urls": urls}, stream_mode=["tasks", "values"]
+        ):
+            now = time.perf_counter() - start
+            if mode == "values":
+                scores = len(chunk.get("score_results", []))
+            elif "result" not in chunk and "error" not in chunk:
+                started[chunk["id"]] = (chunk["name"], now)
+            elif chunk["id"] in started:
+                name, task_start = started.pop(chunk["id"])
+                node = nodes.setdefault(name, {"tasks": 0, "busy_s": 0.0, "first_start_s": task_start, "last_end_s": now})
+                node["tasks"] += 1
+                node["busy_s"] += now - task_start
+                node["first_start_s"] = min(node["first_start_s"], task_start)
+                node["last_end_s"] = max(node["last_end_s"], now)
+    finally:
+        await close_shared_pool()
+    return time.perf_counter() - start, nodes, scores
+
+
+def run_one(args: argparse.Namespace) -> dict:
+    """Benchmark one job count in this process; returns the measurements."""
+    sys.path.insert(0, str(BENCHMARKS))
+    from fake_ollama import FakeOllama
+    from fixture_site import FixtureJobBoard
+
+    from cv_rank_agent.config import settings
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp, contextlib.ExitStack() as stack, \
+            FixtureJobBoard(latency=args.site_latency) as site:
+        instances = [
+            stack.enter_context(FakeOllama(
+                latency=args.latency, prompt_rate=args.prompt_rate, gen_rate=args.gen_rate,
+                num_parallel=args.num_parallel, prompt_cache=args.prompt_cache,
+                speedups={SMALL_MODEL: args.small_model_speedup} if args.small_model_speedup else {},
+            ))
+            for _ in range(args.endpoints)
+        ]
+        settings.ollama_base_url = instances[0].url
+        settings.ollama_endpoints = [ollama.url for ollama in instances]
+        settings.cache_dir = Path(tmp) / "cache"
+        settings.crawl_strategy = args.crawler
+        settings.llm_concurrency = args.num_parallel
+        settings.scorer_batch_size = args.batch_size
+        if args.small_model_speedup:
+            settings.cv_parser_model = settings.job_parser_model = SMALL_MODEL
+        cv_path = _write_cv(Path(tmp) / "cv.docx")
+
+        wall, nodes, scores = asyncio.run(_run_graph(cv_path, site.job_urls(args.run_one)))
+        return {
+            "jobs": args.run_one,
+            "wall_s": round(wall, 3),
+            "jobs_per_min": round(args.run_one / wall * 60, 1),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "scores": scores,
+            "llm_calls": sum(ollama.stats.chat for ollama in instances),
+            "embed_calls": sum(ollama.stats.embed for ollama in instances),
+            "prompt_eval_s": round(sum(ollama.stats.prompt_eval_s for ollama in instances), 3),
+            "pages_served": site.requests,
+            "nodes": {name: {k: round(v, 3) for k, v in node.items()} for name, node in nodes.items()},
+        }
+
+
+def _regressions(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    found = []
+    for metric in ("wall_s", "peak_rss_mb"):
+        if baseline.get(metric) and result[metric] > baseline[metric] * (1 + tolerance):
+            found.append(f"{result['jobs']} job(s): {metric} {result[metric]} vs baseline {baseline[metric]}")
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    # Defaults are a fast GPU, to keep the 500-job run short; raise them to model your hardware
+    parser.add_argument("--latency", type=float, default=0.02, help="fake Ollama seconds per request")
+    parser.add_argument("--prompt-rate", type=float, default=20000.0, help="fake Ollama prompt tokens per second")
+    parser.add_argument("--gen-rate", type=float, default=2000.0, help="fake Ollama output tokens per second")
+    parser.add_argument("--num-parallel", type=int, default=1, help="fake OLLAMA_NUM_PARALLEL (and LLM_CONCURRENCY)")
+    parser.add_argument("--endpoints", type=int, default=1, help="fake Ollama instances, used as OLLAMA_ENDPOINTS")
+    parser.add_argument("--prompt-cache", action="store_true", help="fake Ollama reuses shared prompt prefixes")
+    parser.add_argument("--batch-size", type=int, default=1, help="SCORER_BATCH_SIZE")
+    parser.add_argument(
+        "--small-model-speedup", type=float, default=0,
+        help="extract CVs and jobs with a fake small model this many times faster (0 = LLM_MODEL everywhere)",
+    )
+    parser.add_argument("--site-latency", type=float, default=0.02, help="job board seconds per page")
+    parser.add_argument("--crawler", choices=("http", "browser"), default="http")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown / growth vs the baseline")
+    parser.add_argument("--run-one", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one is not None:
+        print(json.dumps(run_one(args)))
+        return
+
+    forwarded = [
+        "--latency", str(args.latency), "--prompt-rate", str(args.prompt_rate), "--gen-rate", str(args.gen_rate),
+        "--num-parallel", str(args.num_parallel), "--site-latency", str(args.site_latency), "--crawler", args.crawler,
+    ]
+    if args.endpoints != 1:
+        forwarded += ["--endpoints", str(args.endpoints)]
+    if args.batch_size != 1:
+        forwarded += ["--batch-size", str(args.batch_size)]
+    if args.small_model_speedup:
+        forwarded += ["--small-model-speedup", str(args.small_model_speedup)]
+    run_settings = dict(zip(forwarded[::2], forwarded[1::2]))
+    if args.prompt_cache:
+        forwarded.append("--prompt-cache")
+        run_settings["--prompt-cache"] = "true"
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if baseline and baseline["settings"] != run_settings and not args.save_baseline:
+        print(f"Settings differ from {args.baseline}; not comparing against it\n")
+        baseline = {}
+    results, regressions = [], []
+    print(
+        f"{'jobs':>5} {'wall s':>8} {'jobs/min':>9} {'peak MB':>8} {'scores':>7} {'LLM':>5} {'embed':>6} {'prompt s':>9}"
+        "  per node: tasks / busy s / span s"
+    )
+    for size in args.sizes:
+        output = subprocess.run(
+            [sys.executable, __file__, "--run-one", str(size), *forwarded],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        results.append(result)
+        per_node = "  ".join(
+            f"{name} {node['tasks']:.0f}/{node['busy_s']:.2f}/{node['last_end_s'] - node['first_start_s']:.2f}"
+            for name, node in result["nodes"].items()
+        )
+        print(
+            f"{size:>5} {result['wall_s']:>8.2f} {result['jobs_per_min']:>9.1f} {result['peak_rss_mb']:>8.1f}"
+            f" {result['scores']:>7} {result['llm_calls']:>5} {result['embed_calls']:>6}"
+            f" {result['prompt_eval_s']:>9.2f}  {per_node}"
+        )
+        if str(size) in baseline.get("results", {}):
+            regressions += _regressions(result, baseline["results"][str(size)], args.tolerance)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(
+            {"settings": run_settings, "results": {str(r["jobs"]): r for r in results}}, indent=2
+        ) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+    elif regressions:
+        print("\nRegressions against " + str(args.baseline) + ":\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    elif baseline:
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Benchmark: prompt-size reduction of boilerplate pruning on saved job pages.
+
+Usage: uv run python benchmarks/bench_prune.py [--max-tokens N]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from cv_rank_agent.config import settings
+from cv_rank_agent.prompts.job_parser import JOB_PARSER_PROMPT
+from cv_rank_agent.tools.content_prune import prune_markdown
+from cv_rank_agent.tools.tokens import estimate_tokens
+
+PAGES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "pages"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-tokens", type=int, default=settings.job_content_max_tokens)
+    args = parser.parse_args()
+
+    print(f"{'page':<36} {'prompt tokens':>14} {'pruned':>8} {'saved':>7} {'prune ms':>9}")
+    total_before = total_after = 0
+    for path in sorted(PAGES.glob("*.md")):
+        markdown = path.read_text(encoding="utf-8")
+        start = time.perf_counter()
+        pruned = prune_markdown(markdown, args.max_tokens)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        before = estimate_tokens(JOB_PARSER_PROMPT.format(content=markdown))
+        after = estimate_tokens(JOB_PARSER_PROMPT.format(content=pruned))
+        total_before += before
+        total_after += after
+        print(f"{path.stem:<36} {before:>14} {after:>8} {1 - after / before:>7.0%} {elapsed_ms:>9.2f}")
+    if total_before:
+        print(f"{'TOTAL':<36} {total_before:>14} {total_after:>8} {1 - total_after / total_before:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
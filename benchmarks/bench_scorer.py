@@ -0,0 +1,88 @@
+"""Benchmark: scorer latency at different concurrency levels against a live Ollama.
+
+Scores the same synthetic CV against N synthetic jobs with the artifact
+cache disabled, once per concurrency level. Concurrency above Ollama's
+OLLAMA_NUM_PARALLEL only queues requests on the server, so run the server
+with e.g. OLLAMA_NUM_PARALLEL=4 to see scaling up to 4.
+
+Usage: uv run python benchmarks/bench_scorer.py [--jobs 10] [--levels 1 2 4 8]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+
+from cv_rank_agent.config import settings
+from cv_rank_agent.models import JobDescription, ParsedCV, WorkExperience
+from cv_rank_agent.nodes import scorer as scorer_module
+
+CV = ParsedCV(
+    name="Ada Example",
+    summary="Backend engineer with 7 years of Python, PostgreSQL and cloud experience.",
+    skills=["Python", "FastAPI", "PostgreSQL", "Kafka", "Docker", "Kubernetes", "AWS"],
+    experience=[
+        WorkExperience(company="Acme", role="Senior Backend Engineer", duration="2021 - now",
+                       description="Owns event ingestion services and the public REST API."),
+        WorkExperience(company="Beta", role="Software Engineer", duration="2017 - 2021",
+                       description="Built data pipelines and internal tooling in Python."),
+    ],
+)
+
+
+def _job(i: int) -> JobDescription:
+    return JobDescription(
+        title=f"Backend Engineer {i}",
+        company=f"Company {i}",
+        requirements=["Python", "SQL", f"{3 + i % 4}+ years of experience", "Cloud platforms"],
+        responsibilities=["Build APIs", "Operate services in production"],
+        job_description=f"Company {i} is hiring a backend engineer to build and run its platform services.",
+        source_url=f"https://example.com/jobs/{i}",
+    )
+
+
+async def _run(level: int, jobs: list[JobDescription]) -> tuple[float, list[float], int]:
+    settings.llm_concurrency = level
+    latencies: list[float] = []
+    original = scorer_module._score
+
+    async def timed_score(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await original(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    scorer_module._score = timed_score
+    try:
+        start = time.perf_counter()
+        result = await scorer_module.scorer({"parsed_cvs": {"cv.pdf": CV}, "job_descriptions": jobs})
+        return time.perf_counter() - start, latencies, len(result["score_results"])
+    finally:
+        scorer_module._score = original
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=10)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    settings.artifact_cache = False
+    jobs = [_job(i) for i in range(args.jobs)]
+
+    print(f"model={settings.llm_model} jobs={args.jobs} OLLAMA_NUM_PARALLEL={os.environ.get('OLLAMA_NUM_PARALLEL', '(server setting)')}")
+    print(f"{'concurrency':>11} {'scored':>7} {'wall s':>8} {'jobs/min':>9} {'p50 call s':>11} {'max call s':>11}")
+    for level in args.levels:
+        wall, latencies, scored = asyncio.run(_run(level, jobs))
+        print(
+            f"{level:>11} {scored:>7} {wall:>8.1f} {scored / wall * 60:>9.1f} "
+            f"{statistics.median(latencies):>11.1f} {max(latencies):>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark: import time of the CLI, the graph and the service, from ``python -X importtime``.
+
+Each entry point is imported in a fresh interpreter (best of ``--repeat``
+runs). Reports its cumulative import time, which heavy third-party packages
+it pulled in, and the modules with the largest self time. ``python -m
+cv_rank_agent --help`` is timed end to end as well.
+
+The import budgets themselves are enforced by tests/test_startup.py.
+
+Usage: uv run python benchmarks/bench_startup.py [--repeat 5] [--top 10]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = ["cv_rank_agent.__main__", "cv_rank_agent.graph", "cv_rank_agent.service"]
+HEAVY = ["crawl4ai", "playwright", "langchain_ollama", "ollama", "numpy", "pymupdf", "docx", "aiohttp", "langgraph"]
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Self and cumulative import time (µs) of every module imported by ``import module``."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True,
+    ).stderr
+    return {m.group(4): (int(m.group(1)), int(m.group(2))) for m in map(_LINE.match, stderr.splitlines()) if m}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="modules with the largest self time to list")
+    args = parser.parse_args()
+
+    for module in ENTRY_POINTS:
+        runs = [import_times(module) for _ in range(args.repeat)]
+        best = min(runs, key=lambda times: times[module][1])
+        heavy = [name for name in HEAVY if name in best]
+        print(f"\n{module}: {best[module][1] / 1000:.0f} ms cumulative, {len(best)} modules")
+        print(f"  heavy packages: {', '.join(heavy) or 'none'}")
+        for name, (own, _) in sorted(best.items(), key=lambda item: item[1][0], reverse=True)[: args.top]:
+            print(f"  {own / 1000:>7.1f} ms  {name}")
+
+    wall = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "cv_rank_agent", "--help"], capture_output=True, check=True)
+        wall.append(time.perf_counter() - start)
+    print(f"\npython -m cv_rank_agent --help: {min(wall) * 1000:.0f} ms (best of {args.repeat}, interpreter start-up included)")
+
+
+if __name__ == "__main__":
+    main()
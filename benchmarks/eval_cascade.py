@@ -0,0 +1,105 @@
+"""Evaluation: LLM calls vs ranking quality of cascade policies on a saved evaluation set.
+
+Usage: uv run python benchmarks/eval_cascade.py [--eval-set FILE] [--top-n N] [--k K]
+
+The evaluation set is NDJSON in the ``--stream ndjson`` format: every
+``score`` event carries a candidate, a job, its cosine similarity and its LLM
+overall fit. Record one from a real run with a large LLM_TOP_N so every job
+is scored, e.g.
+
+    LLM_TOP_N=1000 uv run python -m cv_rank_agent cvs/ jobs.json --stream ndjson > eval.ndjson
+
+The bundled benchmarks/data/cascade_eval.ndjson is synthetic (8 candidates x
+60 jobs, seeded): some candidates have three standout jobs, others a cluster
+of twenty close matches. Quality is measured against each candidate's true
+top K by LLM fit over every job: recall@K, and NDCG@K with the fit as gain.
+"""
+
+import argparse
+import json
+import math
+from collections import defaultdict
+from pathlib import Path
+
+from cv_rank_agent.cascade import CascadePolicy, EarlyStop
+from cv_rank_agent.config import settings
+
+EVAL_SET = Path(__file__).resolve().parent / "data" / "cascade_eval.ndjson"
+
+
+def load_eval_set(path: Path) -> dict[str, list[tuple[str, float, float]]]:
+    """Per candidate: (job, cosine, fit), best cosine first."""
+    candidates: dict[str, list[tuple[str, float, float]]] = defaultdict(list)
+    for line in path.read_text(encoding="utf-8").splitlines():
+        event = json.loads(line)
+        if event.get("event") == "score" and event.get("cosine_similarity_score") is not None:
+            candidates[event["candidate_reference"]].append(
+                (event["job_reference"], event["cosine_similarity_score"], event["overall_fit_score"])
+            )
+    return {c: sorted(jobs, key=lambda job: job[1], reverse=True) for c, jobs in candidates.items()}
+
+
+def simulate(policy: CascadePolicy, eval_set: dict[str, list[tuple[str, float, float]]]) -> dict[str, list[str]]:
+    """Jobs the scorer would call the LLM for, per candidate, in scoring order."""
+    fits = {(c, job): fit for c, jobs in eval_set.items() for job, _, fit in jobs}
+    selected = policy.select({c: [(job, cosine) for job, cosine, _ in jobs] for c, jobs in eval_set.items()})
+    scored: dict[str, list[str]] = {}
+    for c, ranked in selected.items():
+        early_stop = EarlyStop(policy.early_stop_n)
+        scored[c] = []
+        for job, cosine in ranked:  # llm_concurrency = 1
+            if not early_stop.can_improve(cosine):
+                break
+            early_stop.record(cosine, fits[(c, job)])
+            scored[c].append(job)
+    return scored
+
+
+def top_k(jobs: list[str], fits: dict[str, float], k: int) -> list[str]:
+    return sorted(jobs, key=lambda job: fits[job], reverse=True)[:k]
+
+
+def dcg(gains: list[float]) -> float:
+    return sum(gain / math.log2(rank + 2) for rank, gain in enumerate(gains))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--eval-set", type=Path, default=EVAL_SET)
+    parser.add_argument("--top-n", type=int, default=settings.llm_top_n, help="baseline fixed top N (LLM_TOP_N)")
+    parser.add_argument("--k", type=int, default=5, help="size of the ranking that has to stay the same")
+    args = parser.parse_args()
+
+    eval_set = load_eval_set(args.eval_set)
+    fits = {c: {job: fit for job, _, fit in jobs} for c, jobs in eval_set.items()}
+    policies = [
+        CascadePolicy(top_n=args.top_n),
+        CascadePolicy(top_n=args.top_n, min_similarity=0.55),
+        CascadePolicy(top_n=args.top_n, knee_gap=0.05),
+        CascadePolicy(top_n=args.top_n, call_budget=len(eval_set) * args.top_n // 2),
+        CascadePolicy(top_n=args.top_n, early_stop_n=args.k),
+        CascadePolicy(top_n=args.top_n * 2, early_stop_n=args.k),
+        CascadePolicy(top_n=args.top_n * 2, min_similarity=0.58, early_stop_n=args.k),
+    ]
+
+    print(f"{len(eval_set)} candidate(s), {sum(map(len, eval_set.values()))} scored job(s), top K = {args.k}\n")
+    print(f"{'policy':<52} {'LLM calls':>9} {'saved':>7} {'recall@K':>9} {'NDCG@K':>7}")
+    baseline_calls = None
+    for policy in policies:
+        scored = simulate(policy, eval_set)
+        calls = sum(map(len, scored.values()))
+        baseline_calls = baseline_calls or calls
+        recall = ndcg = 0.0
+        for c, candidate_fits in fits.items():
+            ideal = top_k(list(candidate_fits), candidate_fits, args.k)
+            found = top_k(scored[c], candidate_fits, args.k)
+            recall += len(set(found) & set(ideal)) / len(ideal)
+            ndcg += dcg([candidate_fits[job] for job in found]) / dcg([candidate_fits[job] for job in ideal])
+        print(
+            f"{policy.describe():<52} {calls:>9} {1 - calls / baseline_calls:>7.0%}"
+            f" {recall / len(fits):>9.0%} {ndcg / len(fits):>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Ollama-compatible stand-in for offline benchmarks.
+
+Serves /api/chat (streamed NDJSON, structured output from the request's
+JSON-schema ``format``; a batch of scores gets one entry per "reference: job-N"
+in the prompt), /api/embed, /api/generate (model loads only),
+/api/tags and /api/version on a local port. Responses are deterministic functions of the request: structured
+outputs are generated from the schema and a hash of the prompt, embeddings
+are hashed bags of words (so similar texts get similar vectors).
+
+Timing follows a simple model of a local Ollama: a one-off model load, a
+fixed per-request latency, prompt evaluation at ``prompt_rate`` tokens/s and
+generation at ``gen_rate`` tokens/s (both times ``speedups[model]``, to
+stand in for a smaller model), with at most ``num_parallel`` requests
+processed at once (like OLLAMA_NUM_PARALLEL). The usual Ollama timing fields
+are returned with every response. With ``prompt_cache``, a chat prompt that
+starts like one of the last ``num_parallel`` prompts only pays for the tokens
+after the shared prefix, as with Ollama's per-slot prompt cache.
+
+Usage: uv run python benchmarks/fake_ollama.py [--port 11435] [--latency 0.05]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMBEDDING_DIM = 768
+_WORD = re.compile(r"\w+")
+_REFERENCE = re.compile(r"reference: (job-\d+)")
+
+
+def _tokens(text: str) -> int:
+    """Rough token count, ~4 characters per token."""
+    return max(1, math.ceil(len(text) / 4))
+
+
+def _digest(*parts: str) -> bytes:
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).digest()
+
+
+def embed(text: str, dim: int = EMBEDDING_DIM) -> list[float]:
+    """Deterministic unit vector: hashed bag of lower-cased words."""
+    vector = [0.0] * dim
+    for word in _WORD.findall(text.lower()):
+        digest = _digest(word)
+        vector[int.from_bytes(digest[:4], "little") % dim] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def instance(schema: dict, seed: bytes, defs: dict | None = None, name: str = "value") -> object:
+    """A deterministic instance of a JSON schema (the subset pydantic emits)."""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return instance(defs[schema["$ref"].rsplit("/", 1)[1]], seed, defs, name)
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            options = [option for option in schema[key] if option.get("type") != "null"] or schema[key]
+            return instance(options[0], seed, defs, name)
+    kind = schema.get("type", "string")
+    number = int.from_bytes(_digest(seed.hex(), name)[:8], "little")
+    if kind == "object":
+        return {
+            prop: instance(sub, _digest(seed.hex(), prop), defs, prop)
+            for prop, sub in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [instance(schema.get("items", {}), _digest(seed.hex(), str(i)), defs, name) for i in range(2 + number % 3)]
+    if kind == "number":
+        return round(0.3 + (number % 650) / 1000, 2)  # scores land in 0.30–0.95
+    if kind == "integer":
+        return number % 10
+    if kind == "boolean":
+        return bool(number & 1)
+    return f"{name.replace('_', ' ')} {number % 100_000:05d}"
+
+
+@dataclass
+class FakeOllamaStats:
+    """Requests served, per endpoint."""
+    chat: int = 0
+    embed: int = 0
+    texts_embedded: int = 0
+    loads: int = 0
+    prompt_tokens: int = 0          # chat prompt tokens evaluated (after prompt cache reuse)
+    prompt_eval_s: float = 0.0      # simulated time spent on them
+
+
+@dataclass
+class FakeOllama:
+    """A local Ollama stand-in running in a background thread; use as a context manager."""
+    latency: float = 0.05          # seconds added to every request
+    prompt_rate: float = 2000.0    # prompt tokens evaluated per second
+    gen_rate: float = 200.0        # output tokens generated per second
+    load_time: float = 0.0         # one-off delay the first time a model is used
+    num_parallel: int = 1          # requests processed at once; the rest queue
+    port: int = 0                  # 0 = pick a free port
+    models: tuple[str, ...] = ()   # listed by /api/tags (every model is served either way)
+    prompt_cache: bool = False     # skip evaluating a prefix shared with a recent prompt
+    speedups: dict[str, float] = field(default_factory=dict)  # model → rate multiplier, e.g. a small model
+    stats: FakeOllamaStats = field(default_factory=FakeOllamaStats)
+
+    def __post_init__(self) -> None:
+        self._slots = threading.Semaphore(self.num_parallel)
+        self._loaded: set[str] = set()
+        self._recent: deque[str] = deque(maxlen=self.num_parallel)  # last prompt of each slot
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self) -> "FakeOllama":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+            def _send(self, body: bytes, content_type: str = "application/json") -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                if self.path == "/api/version":
+                    self._send(b'{"version": "0.0.0-fake"}')
+                else:
+                    self._send(json.dumps({"models": [{"name": name, "model": name} for name in fake.models]}).encode())
+
+            def do_HEAD(self) -> None:
+                self._send(b"")
+
+            def do_POST(self) -> None:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path == "/api/chat":
+                    self._send(fake._chat(request), "application/x-ndjson")
+                elif self.path == "/api/generate":
+                    self._send(fake._load(request))
+                elif self.path == "/api/embed":
+                    self._send(fake._embed(request))
+                else:
+                    self.send_error(404)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _serve(self, model: str, seconds: float) -> float:
+        """Hold one of the parallel slots for the simulated work; returns the load time spent."""
+        with self._slots:
+            with self._lock:
+                load = 0.0 if model in self._loaded else self.load_time
+                if load:
+                    self.stats.loads += 1
+                self._loaded.add(model)
+            time.sleep(load + seconds)
+        return load
+
+    def _chat(self, request: dict) -> bytes:
+        prompt = "\n".join(str(message.get("content", "")) for message in request.get("messages", []))
+        schema = request.get("format")
+        if isinstance(schema, dict):
+            value = instance(schema, _digest(prompt))
+            references = _REFERENCE.findall(prompt)
+            if references and "scores" in schema.get("properties", {}):  # ScoreBatch: one score per listed job
+                item = schema["properties"]["scores"]["items"]
+                value["scores"] = [
+                    {**instance(item, _digest(prompt, reference), schema.get("$defs", {})), "job_reference": reference}
+                    for reference in references
+                ]
+            content = json.dumps(value)
+        else:
+            content = json.dumps({"answer": f"ok {_digest(prompt).hex()[:8]}"}) if schema == "json" else "ok"
+        prompt_tokens, eval_tokens = self._uncached_tokens(prompt), _tokens(content)
+        speedup = self.speedups.get(request.get("model", ""), 1.0)
+        prompt_seconds = prompt_tokens / (self.prompt_rate * speedup)
+        eval_seconds = eval_tokens / (self.gen_rate * speedup)
+        load = self._serve(request.get("model", ""), self.latency + prompt_seconds + eval_seconds)
+        with self._lock:
+            self.stats.chat += 1
+            self.stats.prompt_tokens += prompt_tokens
+            self.stats.prompt_eval_s += prompt_seconds
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        base = {"model": request.get("model", ""), "created_at": now}
+        chunk = {**base, "message": {"role": "assistant", "content": content}, "done": False}
+        final = {
+            **base,
+            "message": {"role": "assistant", "content": ""},
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((load + self.latency + prompt_seconds + eval_seconds) * 1e9),
+            "load_duration": int(load * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prompt_seconds * 1e9),
+            "eval_count": eval_tokens,
+            "eval_duration": int(eval_seconds * 1e9),
+        }
+        return (json.dumps(chunk) + "\n" + json.dumps(final) + "\n").encode("utf-8")
+
+    def _uncached_tokens(self, prompt: str) -> int:
+        """Prompt tokens to evaluate: all of them, or those after the longest prefix shared with a recent prompt."""
+        if not self.prompt_cache:
+            return _tokens(prompt)
+        with self._lock:
+            shared = max((len(os.path.commonprefix([prompt, recent])) for recent in self._recent), default=0)
+            self._recent.append(prompt)
+        return _tokens(prompt[shared:])
+
+    def _load(self, request: dict) -> bytes:
+        """An empty /api/generate request, which Ollama answers by loading the model."""
+        load = self._serve(request.get("model", ""), self.latency)
+        return json.dumps({
+            "model": request.get("model", ""),
+            "response": "",
+            "done": True,
+            "done_reason": "load",
+            "load_duration": int(load * 1e9),
+        }).encode("utf-8")
+
+    def _embed(self, request: dict) -> bytes:
+        texts = request.get("input", [])
+        texts = [texts] if isinstance(texts, str) else texts
+        prompt_tokens = sum(_tokens(text) for text in texts)
+        prompt_seconds = prompt_tokens / (self.prompt_rate * 4)  # embedding models are small
+        load = self._serve(request.get("model", ""), self.latency + prompt_seconds)
+        with self._lock:
+            self.stats.embed += 1
+            self.stats.texts_embedded += len(texts)
+        return json.dumps({
+            "model": request.get("model", ""),
+            "embeddings": [embed(text) for text in texts],
+            "total_duration": int((load + self.latency + prompt_seconds) * 1e9),
+            "load_duration": int(load * 1e9),
+            "prompt_eval_count": prompt_tokens,
+        }).encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--prompt-rate", type=float, default=2000.0)
+    parser.add_argument("--gen-rate", type=float, default=200.0)
+    parser.add_argument("--load-time", type=float, default=0.0)
+    parser.add_argument("--num-parallel", type=int, default=1)
+    parser.add_argument("--prompt-cache", action="store_true", help="reuse prompt prefixes like Ollama")
+    args = parser.parse_args()
+
+    with FakeOllama(
+        latency=args.latency, prompt_rate=args.prompt_rate, gen_rate=args.gen_rate,
+        load_time=args.load_time, num_parallel=args.num_parallel, port=args.port, prompt_cache=args.prompt_cache,
+    ) as fake:
+        print(f"Fake Ollama listening on {fake.url} — set OLLAMA_BASE_URL={fake.url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
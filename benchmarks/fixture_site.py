@@ -0,0 +1,110 @@
+"""Local job-board site serving the saved pages in tests/fixtures/pages for benchmarks.
+
+``/jobs/<n>`` serves saved page ``n`` modulo the number of pages, with the
+job title suffixed by ``#n`` so every job has distinct content (and distinct
+cache keys). Pages carry an ETag and Last-Modified and answer conditional
+requests with 304, like a real job board.
+
+Usage: uv run python benchmarks/fixture_site.py [--port 8800] [--latency 0.05]
+"""
+
+import argparse
+import hashlib
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+PAGES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "pages"
+_H1 = re.compile(r"<h1[^>]*>(.*?)</h1>", re.S)
+_LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+@dataclass
+class FixtureJobBoard:
+    """The saved job pages on a local HTTP server; use as a context manager."""
+    latency: float = 0.05   # seconds before each page response
+    port: int = 0           # 0 = pick a free port
+    pages_dir: Path = PAGES
+
+    def __post_init__(self) -> None:
+        self.pages = [path.read_text(encoding="utf-8") for path in sorted(self.pages_dir.glob("*.html"))]
+        self.requests = 0
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def job_urls(self, count: int) -> list[str]:
+        return [f"{self.url}/jobs/{n}" for n in range(count)]
+
+    def page(self, n: int) -> str:
+        page = self.pages[n % len(self.pages)]
+        match = _H1.search(page)
+        if match is None:
+            return page
+        title = match.group(1).strip()
+        return page.replace(title, f"{title} #{n}")
+
+    def __enter__(self) -> "FixtureJobBoard":
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                match = re.fullmatch(r"/jobs/(\d+)/?", self.path.split("?")[0])
+                if match is None:
+                    self.send_error(404)
+                    return
+                body = site.page(int(match.group(1))).encode("utf-8")
+                etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+                site.requests += 1
+                time.sleep(site.latency)
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", _LAST_MODIFIED)
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with FixtureJobBoard(latency=args.latency, port=args.port) as site:
+        print(f"Fixture job board on {site.url}/jobs/<n> ({len(site.pages)} saved pages)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
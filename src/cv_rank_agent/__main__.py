@@ -1,6 +1,10 @@
 """cv_rank_agent — CV-to-job-opening ranking agent.
 
 Entry point: uv run python -m cv_rank_agent
+
+Only the standard library is imported at module level, so ``--help`` and
+argument errors return immediately; the graph (LangGraph, LangChain,
+pydantic) is imported once the arguments are valid.
 """
 
 from __future__ import annotations
@@ -10,10 +14,15 @@ import json
 import logging
 import sys
 import asyncio
+from contextlib import nullcontext
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from cv_rank_agent.graph import build_graph
-from cv_rank_agent.models import ScoreResult
+if TYPE_CHECKING:
+    from cv_rank_agent import metrics
+    from cv_rank_agent.models import JobDescription, ScoreResult
+    from langchain_core.runnables import RunnableConfig
+    from langgraph.graph.state import CompiledStateGraph
 
 logger = logging.getLogger(__name__)
 
@@ -26,53 +35,136 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser.add_argument(
         "cv",
         type=Path,
-        help="Path to the CV file (PDF or DOCX).",
+        nargs="*",
+        help="Path to the CV file (PDF or DOCX). Pass several files, a directory of CVs or a zip/tar "
+             "archive of them to rank many candidates against the same jobs in one run.",
     )
     parser.add_argument(
         "jobs",
         type=Path,
+        nargs="?",
         help='Path to a JSON file containing job URLs (e.g. samples/jobs.json). '
              'Expected format: {"jobs": ["url1", "url2", ...]}',
     )
-    return parser.parse_args(argv)
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore the crawl cache and re-crawl every job URL (the cache is still updated).",
+    )
+    cache_mode.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve job pages from the crawl cache only; uncached URLs are skipped.",
+    )
+    parser.add_argument(
+        "--stream",
+        choices=("ndjson", "table"),
+        help="Emit results as they complete: 'ndjson' writes one JSON object per line to stdout "
+             "(interim cosine rankings, then each score); 'table' redraws a live ranking after every score.",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        metavar="PATH",
+        help="Write a JSON run report: wall time per node and per item, LLM token counts and Ollama eval "
+             "durations, crawl bytes and cache hit rates.",
+    )
+    parser.add_argument(
+        "--prometheus",
+        type=Path,
+        metavar="PATH",
+        help="Write the run metrics in Prometheus text format (e.g. for node_exporter's textfile collector).",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Continue a failed or interrupted run where it stopped, without redoing finished crawls, "
+             "extractions or scores. The run id is logged when a run starts and when it stops.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-rank whenever the jobs file changes (and every WATCH_INTERVAL seconds): "
+             "only new or changed postings are crawled, parsed and scored, and removed ones are dropped.",
+    )
+    args = parser.parse_args(argv)
+    # argparse gives every positional to cv; the last one is the jobs file
+    if args.resume and args.watch:
+        parser.error("--watch starts a new ranking and cannot be combined with --resume")
+    if args.resume:
+        if args.cv:
+            parser.error("--resume continues a saved run and takes no CV or jobs arguments")
+    elif len(args.cv) < 2:
+        parser.error("the following arguments are required: cv, jobs")
+    else:
+        args.jobs = args.cv.pop()
+    return args
 
 
 def load_job_urls(jobs_path: Path) -> list[str]:
-    """Load and validate job URLs from a JSON file."""
+    """Load and validate job URLs from a JSON file; exits with an error message if it is invalid."""
+    from cv_rank_agent.tools.file_load import read_job_urls
+
     try:
-        data = json.loads(jobs_path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as exc:
-        print(f"Error: Invalid JSON in {jobs_path}: {exc}", file=sys.stderr)
+        return read_job_urls(jobs_path)
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
         sys.exit(1)
 
-    if not isinstance(data, dict) or "jobs" not in data:
-        print(
-            f'Error: {jobs_path} must contain a JSON object with a "jobs" key.',
-            file=sys.stderr,
-        )
+
+def read_inputs(cv_paths: list[Path], jobs_path: Path, max_jobs: int) -> dict:
+    """Check the CV and jobs paths and build the graph inputs; exits with an error message otherwise."""
+    for cv_path in cv_paths:
+        if not cv_path.exists():
+            print(f"Error: CV file not found: {cv_path}", file=sys.stderr)
+            sys.exit(1)
+
+    if not jobs_path.exists():
+        print(f"Error: Jobs file not found: {jobs_path}", file=sys.stderr)
         sys.exit(1)
 
-    urls = data["jobs"]
-    if not isinstance(urls, list) or not all(isinstance(u, str) for u in urls):
-        print(
-            f'Error: "jobs" in {jobs_path} must be a list of URL strings.',
-            file=sys.stderr,
-        )
+    urls = load_job_urls(jobs_path)
+
+    if not urls:
+        print("Error: No job URLs found in the jobs file.", file=sys.stderr)
         sys.exit(1)
 
-    return urls
+    if len(urls) > max_jobs:
+        print(f"Error: Maximum {max_jobs} job URLs allowed (MAX_JOBS).", file=sys.stderr)
+        sys.exit(1)
+
+    logger.info("CV:   %s", ", ".join(map(str, cv_paths)))
+    logger.info("Jobs: %d URL(s) from %s", len(urls), jobs_path)
+    return {"cv_paths": [str(p) for p in cv_paths], "job_urls": urls}
 
 
 def print_results(scores: list[ScoreResult]) -> None:
-    """Pretty-print the scoring results to stdout."""
+    """Pretty-print the scoring results to stdout.
+
+    With several candidates, each gets its own ranking, followed by a
+    candidate × job matrix and the per-job ranking of candidates.
+    """
     if not scores:
         print("\nNo scores to display.")
         return
 
+    candidates = list(dict.fromkeys(score.candidate_reference for score in scores))
+    for candidate in candidates:
+        candidate_scores = [score for score in scores if score.candidate_reference == candidate]
+        _print_ranking(candidate_scores, candidate if len(candidates) > 1 else None)
+    if len(candidates) > 1:
+        print_ranking_matrix(scores)
+
+
+def _print_ranking(scores: list[ScoreResult], candidate: str | None = None) -> None:
+    """Print one candidate's jobs, best overall fit first."""
     # Sort by overall_fit_score descending
     ranked = sorted(scores, key=lambda s: s.overall_fit_score, reverse=True)
 
     print(f"\n{'=' * 80}")
+    if candidate is not None:
+        print(f"  CANDIDATE: {candidate}")
     print(f"  RANKING RESULTS — {len(ranked)} job(s) evaluated")
     print(f"{'=' * 80}")
 
@@ -91,45 +183,213 @@ def print_results(scores: list[ScoreResult]) -> None:
     print(f"\n{'=' * 80}")
 
 
+def print_ranking_matrix(scores: list[ScoreResult]) -> None:
+    """Print overall fit as a candidate × job matrix, then each job's best candidates."""
+    candidates = list(dict.fromkeys(score.candidate_reference for score in scores))
+    jobs = list(dict.fromkeys(score.job_reference for score in scores))
+    fit = {(s.candidate_reference, s.job_reference): s.overall_fit_score for s in scores}
+    names = {candidate: Path(candidate).name for candidate in candidates}
+    width = max(len(name) for name in names.values())
+
+    print(f"\n{'=' * 80}")
+    print(f"  RANKING MATRIX — {len(candidates)} candidate(s) × {len(jobs)} job(s), overall fit")
+    print(f"{'=' * 80}\n")
+    for j, job in enumerate(jobs, start=1):
+        print(f"  J{j:<4} {job}")
+    print(f"\n  {'':<{width}}" + "".join(f" {f'J{j}':>5}" for j in range(1, len(jobs) + 1)))
+    for candidate in candidates:
+        cells = (fit.get((candidate, job)) for job in jobs)
+        print(f"  {names[candidate]:<{width}}" + "".join(f" {'-' if c is None else f'{c:.0%}':>5}" for c in cells))
+
+    print("\n  Best candidates per job:")
+    for j, job in enumerate(jobs, start=1):
+        ranked = sorted(
+            ((fit[(c, job)], c) for c in candidates if (c, job) in fit), key=lambda x: x[0], reverse=True
+        )
+        print(f"  J{j:<4} " + ", ".join(f"{names[c]} {f:.0%}" for f, c in ranked))
+    print(f"\n{'=' * 80}")
+
+
+def _write_ndjson(record: dict) -> None:
+    """Write one NDJSON line and flush, so consumers see it immediately."""
+    print(json.dumps(record, ensure_ascii=False), flush=True)
+
+
+def print_live_ranking(
+    scores: list[ScoreResult], cosine_results: dict[str, list[tuple[JobDescription, float]]]
+) -> None:
+    """Redraw the interim ranking: scored jobs by overall fit, then jobs ranked by cosine only."""
+    if sys.stdout.isatty():
+        print("\033[2J\033[H", end="")  # clear the screen and move the cursor home
+    candidates = list(dict.fromkeys([*cosine_results, *(score.candidate_reference for score in scores)]))
+    print(f"\n  LIVE RANKING — {len(scores)} job(s) scored so far")
+    for candidate in candidates:
+        candidate_scores = sorted(
+            (s for s in scores if s.candidate_reference == candidate), key=lambda s: s.overall_fit_score, reverse=True
+        )
+        scored_urls = {score.job_reference for score in candidate_scores}
+        pending = [(job, cosine) for job, cosine in cosine_results.get(candidate, []) if job.source_url not in scored_urls]
+        print(f"\n  {candidate}")
+        print(f"  {'#':>3}  {'Fit':>5}  {'Skill':>5}  {'Exp':>5}  {'Cos':>5}  Job")
+        for i, score in enumerate(candidate_scores, start=1):
+            cosine = "" if score.cosine_similarity_score is None else f"{score.cosine_similarity_score:.0%}"
+            print(
+                f"  {i:>3}  {score.overall_fit_score:>5.0%}  {score.skill_match_score:>5.0%}"
+                f"  {score.experience_match_score:>5.0%}  {cosine:>5}  {score.job_reference}"
+            )
+        for job, cosine in pending:
+            print(f"  {'…':>3}  {'':>5}  {'':>5}  {'':>5}  {cosine:>5.0%}  {job.source_url} (scoring pending)")
+    sys.stdout.flush()
+
+
+async def stream_results(
+    graph: CompiledStateGraph, inputs: dict | None, output: str, config: RunnableConfig | None = None
+) -> list[ScoreResult]:
+    """Run the graph with ``astream``, emitting interim cosine rankings and each score as it completes.
+
+    In ``ndjson`` mode every event is written straight to stdout and nothing is
+    kept; ``table`` mode keeps the scores to redraw the ranking. Returns the
+    scores kept.
+    """
+    from cv_rank_agent.streaming import result_updates, to_events
+
+    scores: list[ScoreResult] = []
+    cosine_results: dict[str, list[tuple[JobDescription, float]]] = {}
+    async for update in result_updates(graph, inputs, config, durability="sync"):
+        if output == "ndjson":
+            for event in to_events(update):
+                _write_ndjson(event)
+            continue
+        kind, value = update
+        if kind == "cosine_results":
+            cosine_results = value
+        else:
+            scores.append(value)
+        print_live_ranking(scores, cosine_results)
+    return scores
+
+
+def write_run_metrics(run: metrics.RunMetrics, report: Path | None, prometheus: Path | None) -> None:
+    """Log the run summary and write the run report wherever it was asked for."""
+    from cv_rank_agent.config import settings
+
+    summary = run.report()
+    llm = summary["llm"].values()
+    logger.info(
+        "Run %s — %.1fs, %d LLM call(s), %d prompt / %d completion token(s), node wall time: %s",
+        run.run_id, summary["wall_s"], sum(s["calls"] for s in llm),
+        sum(s["prompt_tokens"] for s in llm), sum(s["completion_tokens"] for s in llm),
+        ", ".join(f"{name} {node['wall_s']:.1f}s" for name, node in summary["nodes"].items()),
+    )
+    if settings.metrics_dir is not None:
+        run.write_report(settings.metrics_dir / f"run-{run.run_id}.json")
+        (settings.metrics_dir / f"run-{run.run_id}.prom").write_text(run.prometheus(), encoding="utf-8")
+    if report is not None:
+        run.write_report(report)
+        logger.info("Run report written to %s", report)
+    if prometheus is not None:
+        prometheus.parent.mkdir(parents=True, exist_ok=True)
+        prometheus.write_text(run.prometheus(), encoding="utf-8")
+        logger.info("Prometheus metrics written to %s", prometheus)
+
+
+async def watch_jobs(cv_paths: list[str], args: argparse.Namespace) -> None:
+    """Watch mode: print (or stream) the updated ranking after every refresh, until interrupted."""
+    from cv_rank_agent.streaming import score_event
+    from cv_rank_agent.watch import IncrementalRanking, RefreshStats, watch
+
+    def on_refresh(ranking: IncrementalRanking, stats: RefreshStats, run: metrics.RunMetrics) -> None:
+        logger.info(
+            "Refresh — %d added, %d changed, %d removed, %d revalidated, %d pair(s) scored",
+            len(stats.added), len(stats.changed), len(stats.removed), stats.rechecked, stats.scored,
+        )
+        write_run_metrics(run, args.report, args.prometheus)
+        if args.stream == "ndjson":
+            _write_ndjson({
+                "event": "refresh", "added": stats.added, "changed": stats.changed,
+                "removed": stats.removed, "scored": stats.scored,
+            })
+        elif stats.added or stats.changed or stats.removed:
+            print_results(ranking.score_results)
+
+    def write_score(chunk: dict) -> None:
+        if args.stream == "ndjson":
+            _write_ndjson(score_event(chunk["score_result"]))
+
+    logger.info("Watching %s for changes — Ctrl-C to stop", args.jobs)
+    await watch(cv_paths, args.jobs, on_refresh, write_score)
+
+
 async def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
         datefmt="%H:%M:%S",
     )
-    args = parse_args(argv)
-
-    cv_path: Path = args.cv
-    jobs_path: Path = args.jobs
-
-    if not cv_path.exists():
-        print(f"Error: CV file not found: {cv_path}", file=sys.stderr)
-        sys.exit(1)
+    from cv_rank_agent import metrics
+    from cv_rank_agent.checkpoints import checkpointer, discard_progress
+    from cv_rank_agent.config import settings
+    from cv_rank_agent.graph import build_graph
+    from cv_rank_agent.tools.web_crawl import close_shared_pool
 
-    if not jobs_path.exists():
-        print(f"Error: Jobs file not found: {jobs_path}", file=sys.stderr)
-        sys.exit(1)
+    if args.refresh:
+        settings.crawl_cache_mode = "refresh"
+    elif args.offline:
+        settings.crawl_cache_mode = "offline"
 
-    urls = load_job_urls(jobs_path)
-
-    if not urls:
-        print("Error: No job URLs found in the jobs file.", file=sys.stderr)
-        sys.exit(1)
-
-    if len(urls) > 50:
-        print("Error: Maximum 50 job URLs allowed.", file=sys.stderr)
-        sys.exit(1)
+    if args.watch:
+        await watch_jobs(read_inputs(args.cv, args.jobs, settings.max_jobs)["cv_paths"], args)
+        return
 
-    logger.info("CV:   %s", cv_path)
-    logger.info("Jobs: %d URL(s) from %s", len(urls), jobs_path)
+    if args.resume:
+        if not settings.checkpoints:
+            print("Error: --resume needs CHECKPOINTS=true.", file=sys.stderr)
+            sys.exit(1)
+        inputs = None  # continue from the last checkpoint
+        run = metrics.RunMetrics(run_id=args.resume)
+    else:
+        inputs = read_inputs(args.cv, args.jobs, settings.max_jobs)
+        run = metrics.RunMetrics()
 
-    graph = build_graph()
-    logger.info("Graph compiled — starting execution")
-    result = await graph.ainvoke({"cv_path": str(cv_path), "job_urls": urls})
+    with metrics.recording(run):
+        config: RunnableConfig = {
+            "callbacks": [metrics.MetricsCallback(run)],
+            "configurable": {"thread_id": run.run_id},
+        }
+        async with checkpointer() if settings.checkpoints else nullcontext() as saver:
+            graph = build_graph(saver)
+            if args.resume:
+                snapshot = await graph.aget_state(config)
+                if not snapshot.next:
+                    print(f"Error: No unfinished run {args.resume} in the checkpoints.", file=sys.stderr)
+                    sys.exit(1)
+                logger.info("Resuming run %s at %s", run.run_id, ", ".join(sorted(set(snapshot.next))))
+            else:
+                logger.info("Graph compiled — starting run %s", run.run_id)
+            try:
+                if args.stream:
+                    scores = await stream_results(graph, inputs, args.stream, config)
+                else:
+                    scores = (await graph.ainvoke(inputs, config, durability="sync"))["score_results"]
+            except BaseException:  # Ollama timeouts, a crashed browser, Ctrl-C
+                if saver is not None:
+                    logger.error("Run %s stopped — continue it with: python -m cv_rank_agent --resume %s", run.run_id, run.run_id)
+                raise
+            finally:
+                await close_shared_pool()  # only still open if the run failed before collect_jobs
+            if saver is not None:
+                await saver.adelete_thread(run.run_id)  # completed runs are not kept
+                discard_progress(run.run_id)
     logger.info("Graph execution complete")
+    write_run_metrics(run, args.report, args.prometheus)
 
-    print_results(result["score_results"])
+    if args.stream != "ndjson":
+        print_results(scores)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
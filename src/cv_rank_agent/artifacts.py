@@ -0,0 +1,88 @@
+"""Content-addressed store for LLM artifacts: ParsedCV, JobDescription, ScoreResult.
+
+Keys hash the exact LLM input together with the model, temperature and a
+version derived from the prompt template, so unchanged inputs are never
+sent to the LLM twice and editing a prompt only invalidates its own entries.
+"""
+import hashlib
+import json
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TypeVar
+
+from pydantic import BaseModel
+
+from cv_rank_agent import metrics
+from cv_rank_agent.config import settings
+from cv_rank_agent.db import connect
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def prompt_version(template: str) -> str:
+    """Short, stable version id for a prompt template."""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+
+
+def artifact_key(template: str, *inputs: str, model: str | None = None) -> str:
+    """Content hash of one LLM call: prompt version + model + temperature + input text."""
+    payload = json.dumps(
+        [prompt_version(template), model or settings.llm_model, settings.temperature, *inputs],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ArtifactStats:
+    """Counters for one node run."""
+    hits: int = 0
+    misses: int = 0
+
+
+class ArtifactStore:
+    """SQLite-backed store of validated pydantic artifacts keyed by artifact_key()."""
+
+    def __init__(self, path: Path | None = None, enabled: bool | None = None) -> None:
+        self.path = path or settings.cache_dir / "artifacts.sqlite3"
+        self.enabled = settings.artifact_cache if enabled is None else enabled
+        self.stats = ArtifactStats()
+        if self.enabled:
+            with connect(self.path) as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS artifacts ("
+                    " key TEXT PRIMARY KEY, kind TEXT NOT NULL, created_at REAL NOT NULL, payload TEXT NOT NULL)"
+                )
+
+    def get(self, key: str | Sequence[str], model_cls: type[ModelT]) -> ModelT | None:
+        """Return the stored artifact for ``key`` (the first stored one of several keys), or None on a miss."""
+        keys = [key] if isinstance(key, str) else list(key)
+        kind = model_cls.__name__
+        if not self.enabled:
+            self.stats.misses += 1
+            metrics.count("artifact_cache_lookups", kind=kind, outcome="miss")
+            return None
+        with connect(self.path) as conn:
+            rows = dict(conn.execute(
+                f"SELECT key, payload FROM artifacts WHERE key IN ({','.join('?' * len(keys))})", keys,
+            ).fetchall())
+        payload = next((rows[k] for k in keys if k in rows), None)
+        if payload is None:
+            self.stats.misses += 1
+            metrics.count("artifact_cache_lookups", kind=kind, outcome="miss")
+            return None
+        self.stats.hits += 1
+        metrics.count("artifact_cache_lookups", kind=kind, outcome="hit")
+        return model_cls.model_validate_json(payload)
+
+    def put(self, key: str, artifact: BaseModel) -> None:
+        """Store an artifact produced by the LLM."""
+        if not self.enabled:
+            return
+        with connect(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (key, kind, created_at, payload) VALUES (?, ?, ?, ?)",
+                (key, type(artifact).__name__, time.time(), artifact.model_dump_json()),
+            )
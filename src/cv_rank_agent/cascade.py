@@ -0,0 +1,118 @@
+"""Adaptive cascade that decides which cosine-ranked jobs reach the LLM scorer (Option B).
+
+The embedder's cosine top N is trimmed before scoring by up to four cutoffs:
+
+- a similarity floor (``llm_min_similarity``)
+- a knee cutoff at the first large drop in cosine score (``llm_knee_gap``)
+- a run-wide LLM call budget spent in global cosine order (``llm_call_budget``)
+- early stopping in the scorer once the remaining jobs can no longer enter
+  a CV's top N by LLM score (``llm_early_stop_n``)
+
+With every cutoff disabled, the cascade is the plain fixed top N.
+"""
+from dataclasses import dataclass
+from typing import TypeVar
+
+from cv_rank_agent.config import settings
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class CascadePolicy:
+    """The cutoffs of one run; 0 disables a cutoff."""
+    top_n: int
+    min_similarity: float = 0.0
+    knee_gap: float = 0.0
+    call_budget: int = 0
+    early_stop_n: int = 0
+
+    @classmethod
+    def from_settings(cls) -> "CascadePolicy":
+        return cls(
+            top_n=settings.llm_top_n,
+            min_similarity=settings.llm_min_similarity,
+            knee_gap=settings.llm_knee_gap,
+            call_budget=settings.llm_call_budget,
+            early_stop_n=settings.llm_early_stop_n,
+        )
+
+    def describe(self) -> str:
+        """Human-readable summary, e.g. ``top 10, floor 0.55, knee gap 0.05``."""
+        parts = [f"top {self.top_n}"]
+        if self.min_similarity:
+            parts.append(f"floor {self.min_similarity:.2f}")
+        if self.knee_gap:
+            parts.append(f"knee gap {self.knee_gap:.2f}")
+        if self.call_budget:
+            parts.append(f"budget {self.call_budget} call(s)")
+        if self.early_stop_n:
+            parts.append(f"early stop at top {self.early_stop_n}")
+        return ", ".join(parts) if len(parts) > 1 else f"fixed top {self.top_n}"
+
+    def cut(self, ranked: list[tuple[T, float]]) -> list[tuple[T, float]]:
+        """Apply the floor and knee cutoffs to one CV's ranking (best first)."""
+        kept = ranked[: self.top_n]
+        if self.min_similarity:
+            kept = [item for item in kept if item[1] >= self.min_similarity]
+        if self.knee_gap:
+            for i in range(1, len(kept)):
+                if kept[i - 1][1] - kept[i][1] >= self.knee_gap:
+                    return kept[:i]
+        return kept
+
+    def select(self, rankings: dict[str, list[tuple[T, float]]]) -> dict[str, list[tuple[T, float]]]:
+        """Cut every CV's ranking, then spend the call budget on the best cosine scores across CVs."""
+        selected = {key: self.cut(ranked) for key, ranked in rankings.items()}
+        if not self.call_budget:
+            return selected
+        # Global cosine order; ties go to the earlier CV and the better-ranked job
+        candidates = sorted(
+            ((-score, k, i) for k, ranked in enumerate(selected.values()) for i, (_, score) in enumerate(ranked)),
+        )[: self.call_budget]
+        keep = {(k, i) for _, k, i in candidates}
+        return {
+            key: [item for i, item in enumerate(ranked) if (k, i) in keep]
+            for k, (key, ranked) in enumerate(selected.items())
+        }
+
+
+class EarlyStop:
+    """Early-stopping rule for one CV whose jobs are scored in cosine order.
+
+    LLM fit is bounded from the jobs scored so far: a least-squares line of
+    fit over cosine, shifted up by its largest residual, is an optimistic
+    estimate of what a lower-cosine job could score. Once that bound cannot
+    beat the current Nth-best fit, no remaining job can enter the top N.
+    While fit does not rise with cosine, nothing is skipped.
+    """
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.scored: list[tuple[float, float]] = []  # (cosine, fit)
+
+    def record(self, cosine: float, fit: float) -> None:
+        self.scored.append((cosine, fit))
+
+    def upper_bound(self, cosine: float) -> float | None:
+        """Optimistic fit estimate for a job with this cosine, or None while cosine is uninformative."""
+        count = len(self.scored)
+        mean_cos = sum(c for c, _ in self.scored) / count
+        mean_fit = sum(f for _, f in self.scored) / count
+        spread = sum((c - mean_cos) ** 2 for c, _ in self.scored)
+        if spread == 0:
+            return None
+        slope = sum((c - mean_cos) * (f - mean_fit) for c, f in self.scored) / spread
+        if slope <= 0:
+            return None
+        intercept = mean_fit - slope * mean_cos
+        margin = max(f - (slope * c + intercept) for c, f in self.scored)
+        return slope * cosine + intercept + margin
+
+    def can_improve(self, cosine: float) -> bool:
+        """Whether a job with this cosine score could still enter the top N."""
+        if not self.n or len(self.scored) < self.n:
+            return True
+        bound = self.upper_bound(cosine)
+        nth_best = sorted((f for _, f in self.scored), reverse=True)[self.n - 1]
+        return bound is None or bound > nth_best
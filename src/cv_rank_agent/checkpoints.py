@@ -0,0 +1,71 @@
+"""Durable, resumable runs: a SQLite LangGraph checkpointer and per-run scorer progress.
+
+Every CLI run is a LangGraph thread whose id is the run id. The graph state
+is saved after each superstep, and each task's writes are saved as soon as
+the task finishes, so a run that dies at job 41 of 50 keeps the 40 parsed
+jobs and ``--resume <run-id>`` only runs the unfinished job_parser tasks
+and the steps after them.
+
+The scorer is one node, so its per-job progress lives outside the graph
+state: every score goes to the content-addressed artifact cache as it
+completes. With ``ARTIFACT_CACHE=false`` a run-scoped store under
+``CACHE_DIR/progress`` takes its place and is removed once the run completes.
+
+aiosqlite and the checkpointer are imported on first use.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from cv_rank_agent.artifacts import ArtifactStore
+from cv_rank_agent.config import settings
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+# Pydantic models stored in the graph state, allowed back out of the checkpoint
+STATE_MODELS = [
+    ("cv_rank_agent.models", name)
+    for name in ("ParsedCV", "WorkExperience", "Education", "LanguageSkill", "JobDescription", "ScoreResult")
+]
+
+
+@asynccontextmanager
+async def checkpointer(path: Path | None = None) -> AsyncIterator[AsyncSqliteSaver]:
+    """Open the run checkpoint database (default ``CACHE_DIR/checkpoints.sqlite3``)."""
+    import aiosqlite
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    path = path or settings.cache_dir / "checkpoints.sqlite3"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    async with aiosqlite.connect(path) as conn:
+        yield AsyncSqliteSaver(conn, serde=JsonPlusSerializer(allowed_msgpack_modules=STATE_MODELS))
+
+
+def run_id_of(config: RunnableConfig | None) -> str | None:
+    """The checkpointed run a node executes in, or None outside one."""
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+
+def _progress_path(run_id: str) -> Path:
+    return settings.cache_dir / "progress" / f"{run_id}.sqlite3"
+
+
+def progress_store(config: RunnableConfig | None = None) -> ArtifactStore:
+    """Where a node keeps each completed LLM result, so a resumed run does not redo it."""
+    run_id = run_id_of(config)
+    if settings.artifact_cache or run_id is None:
+        return ArtifactStore()
+    return ArtifactStore(_progress_path(run_id), enabled=True)
+
+
+def discard_progress(run_id: str) -> None:
+    """Remove a completed run's scoped progress store, if it had one."""
+    for path in _progress_path(run_id).parent.glob(f"{run_id}.sqlite3*"):  # WAL and shared-memory files too
+        path.unlink(missing_ok=True)
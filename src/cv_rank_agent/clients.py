@@ -0,0 +1,387 @@
+"""Shared Ollama clients, the Ollama endpoint pool and LLM slots, reused by every node call.
+
+ChatOllama and OllamaEmbeddings each hold HTTP connection pools. Building
+them once per model, endpoint and settings keeps connections alive across
+the hundreds of job_parser tasks of a run, and across the runs of the
+service. Async connection pools are bound to an event loop, so chat models
+used from a running loop are kept per loop; sync callers (cv_parser,
+embedding in worker threads) share one process-wide instance.
+
+With several Ollama instances in ``settings.ollama_endpoints``, every call
+goes through one EndpointPool: the healthy endpoint with the fewest
+outstanding requests that has the model installed is used, and a call that
+fails with a timeout or connection error is retried on another endpoint.
+LLM slots scale with the number of endpoints, and large embedding batches
+are split across the endpoints that serve the embedding model.
+
+langchain_ollama is imported on the first actual LLM or embedding call, so
+runs served entirely from the caches never load it.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from pydantic import BaseModel
+
+from cv_rank_agent import metrics
+from cv_rank_agent.config import settings
+from cv_rank_agent.runtime import LoopLocal
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import Runnable
+    from langchain_ollama import OllamaEmbeddings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop_chat_models: LoopLocal[dict[tuple, Runnable]] = LoopLocal(dict)
+_sync_chat_models: dict[tuple, Runnable] = {}
+_embeddings: dict[tuple, OllamaEmbeddings] = {}
+
+_pools: dict[tuple[str, ...], EndpointPool] = {}
+
+# In-flight LLM calls, shared by every node (and every service run) on the same event loop
+_llm_slots: LoopLocal[asyncio.Semaphore] = LoopLocal(lambda: asyncio.Semaphore(llm_parallelism()))
+
+
+def endpoint_urls() -> list[str]:
+    """The Ollama instances to use: ``settings.ollama_endpoints``, or just ``settings.ollama_base_url``."""
+    return [url.rstrip("/") for url in settings.ollama_endpoints or [settings.ollama_base_url]]
+
+
+def llm_parallelism() -> int:
+    """LLM calls in flight at once: ``settings.llm_concurrency`` per Ollama endpoint."""
+    return settings.llm_concurrency * len(endpoint_urls())
+
+
+def _model_name(name: str) -> str:
+    """Ollama model name with its tag, as /api/tags reports it ("nomic-embed-text" → "nomic-embed-text:latest")."""
+    return name if ":" in name else f"{name}:latest"
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Errors after which the same call may succeed on another endpoint."""
+    import httpx
+    from ollama import ResponseError
+
+    if isinstance(exc, ResponseError):
+        return _is_missing_model(exc) or exc.status_code >= 500  # model not on that instance, or server error
+    return isinstance(exc, (httpx.TransportError, ConnectionError, TimeoutError))
+
+
+def _is_missing_model(exc: BaseException) -> bool:
+    """A 404: the model is not installed on that instance, which says nothing about its other models."""
+    from ollama import ResponseError
+
+    return isinstance(exc, ResponseError) and exc.status_code == 404
+
+
+@dataclass(eq=False)
+class Endpoint:
+    """One Ollama instance, as last seen by the pool."""
+    url: str
+    models: set[str] | None = None  # installed models from the last health check; None = not filtered
+    missing: set[str] = field(default_factory=set)  # models that got a 404 since the last health check
+    healthy: bool = True
+    outstanding: int = 0            # requests in flight
+    dispatched: int = 0             # requests sent so far; breaks ties between idle endpoints
+    checked_at: float = float("-inf")
+
+    def serves(self, model: str) -> bool:
+        name = _model_name(model)
+        return name not in self.missing and (self.models is None or name in self.models)
+
+
+class EndpointPool:
+    """Ollama endpoints shared by every node: fewest outstanding requests first, model-aware, with failover.
+
+    Safe to use from the event loop and from worker threads at once.
+    """
+
+    def __init__(self, urls: Sequence[str]) -> None:
+        self.endpoints = [Endpoint(url) for url in urls]
+        self._lock = threading.Lock()
+
+    def _due(self, now: float) -> list[Endpoint]:
+        """Endpoints whose last health check is older than ``settings.ollama_health_interval``."""
+        if len(self.endpoints) == 1:
+            return []  # nothing to choose between
+        return [e for e in self.endpoints if now - e.checked_at >= settings.ollama_health_interval]
+
+    def check(self) -> None:
+        """Health-check the endpoints that are due: reachable, and which models they have installed."""
+        import httpx
+
+        now = time.monotonic()
+        with self._lock:
+            due = self._due(now)
+            for endpoint in due:
+                endpoint.checked_at = now  # concurrent callers skip it
+        for endpoint in due:
+            try:
+                response = httpx.get(f"{endpoint.url}/api/tags", timeout=2.0)
+                response.raise_for_status()
+                models = {_model_name(model["name"]) for model in response.json().get("models", [])}
+            except (httpx.HTTPError, ValueError, KeyError) as exc:
+                if endpoint.healthy:
+                    logger.warning("Ollama endpoint %s is unavailable: %s", endpoint.url, exc)
+                endpoint.healthy = False
+                continue
+            if not endpoint.healthy:
+                logger.info("Ollama endpoint %s is available again", endpoint.url)
+            endpoint.healthy, endpoint.models = True, models or None  # an empty list (e.g. a proxy) filters nothing
+            endpoint.missing.clear()
+
+    async def acheck(self) -> None:
+        """``check()`` in a worker thread, when any endpoint is due."""
+        if self._due(time.monotonic()):
+            await asyncio.to_thread(self.check)
+
+    def width(self, model: str) -> int:
+        """How many healthy endpoints serve ``model``."""
+        return sum(e.healthy and e.serves(model) for e in self.endpoints)
+
+    def acquire(self, model: str, exclude: Sequence[Endpoint] = ()) -> Endpoint:
+        """Reserve the endpoint with the fewest outstanding requests that serves ``model``.
+
+        Falls back to any healthy endpoint, then to any endpoint at all, so a
+        stale health check never blocks a call. Raises LookupError when every
+        endpoint is excluded.
+        """
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                raise LookupError(f"No Ollama endpoint left to try for {model}")
+            preferred = (
+                [e for e in candidates if e.healthy and e.serves(model)]
+                or [e for e in candidates if e.healthy]
+                or candidates
+            )
+            endpoint = min(preferred, key=lambda e: (e.outstanding, e.dispatched))
+            endpoint.outstanding += 1
+            endpoint.dispatched += 1
+        metrics.count("ollama_requests", endpoint=endpoint.url, model=model)
+        return endpoint
+
+    def release(self, endpoint: Endpoint, exc: BaseException | None = None, model: str | None = None) -> bool:
+        """Return a reserved endpoint; after a retryable error it is marked down until its next health check.
+
+        A 404 for ``model`` only stops routing that model to the endpoint;
+        its other models keep being served. Returns whether the failed call
+        should be retried on another endpoint.
+        """
+        retry = exc is not None and _is_retryable(exc)
+        missing = retry and model is not None and _is_missing_model(exc)
+        with self._lock:
+            endpoint.outstanding -= 1
+            if missing:
+                endpoint.missing.add(_model_name(model))
+            elif retry:
+                endpoint.healthy = False
+                endpoint.checked_at = time.monotonic()
+            retry = retry and any(
+                e is not endpoint and e.healthy and (not missing or e.serves(model)) for e in self.endpoints
+            )
+        if retry:
+            metrics.count("ollama_failovers", endpoint=endpoint.url)
+            logger.warning("Ollama endpoint %s failed (%s) — retrying on another endpoint", endpoint.url, exc)
+        return retry
+
+    def run(self, model: str, call: Callable[[str], T]) -> T:
+        """``call(url)`` on the best endpoint for ``model``, failing over to the others."""
+        self.check()
+        tried: list[Endpoint] = []
+        while True:
+            endpoint = self.acquire(model, tried)
+            tried.append(endpoint)
+            try:
+                result = call(endpoint.url)
+            except Exception as exc:
+                if not self.release(endpoint, exc, model):
+                    raise
+                continue
+            self.release(endpoint)
+            return result
+
+    async def arun(self, model: str, call: Callable[[str], Awaitable[T]]) -> T:
+        """Async ``run()``."""
+        await self.acheck()
+        tried: list[Endpoint] = []
+        while True:
+            endpoint = self.acquire(model, tried)
+            tried.append(endpoint)
+            try:
+                result = await call(endpoint.url)
+            except Exception as exc:
+                if not self.release(endpoint, exc, model):
+                    raise
+                continue
+            self.release(endpoint)
+            return result
+
+    def status(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "url": e.url, "healthy": e.healthy, "outstanding": e.outstanding, "dispatched": e.dispatched,
+                "models": sorted(e.models) if e.models is not None else None,
+            }
+            for e in self.endpoints
+        ]
+
+
+def endpoint_pool() -> EndpointPool:
+    """The process-wide pool for the configured endpoints."""
+    urls = tuple(endpoint_urls())
+    if urls not in _pools:
+        _pools[urls] = EndpointPool(urls)
+    return _pools[urls]
+
+
+class ChatModel:
+    """Structured-output chat model for ``schema``, dispatched through the endpoint pool on each call."""
+
+    def __init__(self, schema: type[BaseModel], model: str | None = None) -> None:
+        self.schema = schema
+        self._model = model
+
+    @property
+    def model(self) -> str:
+        """The Ollama model: the one given, else ``settings.llm_model``."""
+        return self._model or settings.llm_model
+
+    def client(self, base_url: str | None = None) -> Runnable:
+        """The ChatOllama with structured output, built once per model, endpoint, settings and event loop."""
+        return _structured_chat_model(self.schema, self.model, base_url or endpoint_urls()[0])
+
+    def invoke(self, prompt: str) -> BaseModel:
+        return endpoint_pool().run(self.model, lambda url: self.client(url).invoke(prompt))
+
+    async def ainvoke(self, prompt: str) -> BaseModel:
+        return await endpoint_pool().arun(self.model, lambda url: self.client(url).ainvoke(prompt))
+
+
+def chat_model(schema: type[BaseModel], model: str | None = None) -> ChatModel:
+    """Chat model with structured output for ``schema`` on ``model`` (default ``settings.llm_model``).
+
+    Nothing is imported or connected until it is called.
+    """
+    return ChatModel(schema, model)
+
+
+def _client_kwargs() -> dict[str, Any]:
+    return {"timeout": settings.ollama_timeout} if settings.ollama_timeout else {}
+
+
+def _structured_chat_model(schema: type[BaseModel], model: str, base_url: str) -> Runnable:
+    key = (
+        schema, model, settings.temperature, base_url,
+        settings.ollama_keep_alive, settings.ollama_timeout, settings.ollama_num_ctx,
+    )
+    try:
+        models = _loop_chat_models.get()
+    except RuntimeError:  # no running loop: a sync node in LangGraph's thread pool
+        models = _sync_chat_models
+    if key not in models:
+        from langchain_ollama import ChatOllama
+
+        llm = ChatOllama(
+            model=model,
+            temperature=settings.temperature,
+            base_url=base_url,
+            keep_alive=settings.ollama_keep_alive,
+            num_ctx=settings.ollama_num_ctx,
+            client_kwargs=_client_kwargs(),
+        )
+        models[key] = llm.with_structured_output(schema)
+    return models[key]
+
+
+class Embeddings:
+    """The embedding model behind the endpoint pool; large batches are split across the endpoints serving it."""
+
+    def client(self, base_url: str | None = None) -> OllamaEmbeddings:
+        """OllamaEmbeddings for ``settings.embedding_model``, built once per model, endpoint and settings."""
+        base_url = base_url or endpoint_urls()[0]
+        key = (settings.embedding_model, base_url, settings.ollama_keep_alive, settings.ollama_timeout)
+        if key not in _embeddings:
+            from langchain_ollama import OllamaEmbeddings
+
+            keep_alive = settings.ollama_keep_alive
+            _embeddings[key] = OllamaEmbeddings(
+                model=settings.embedding_model,
+                base_url=base_url,
+                keep_alive=keep_alive if isinstance(keep_alive, int) else None,  # OllamaEmbeddings takes seconds only
+                client_kwargs=_client_kwargs(),
+            )
+        return _embeddings[key]
+
+    def _embed(self, texts: list[str]) -> list[list[float]]:
+        return endpoint_pool().run(settings.embedding_model, lambda url: self.client(url).embed_documents(texts))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        pool, model = endpoint_pool(), settings.embedding_model
+        pool.check()
+        shards = min(pool.width(model), len(texts))
+        if shards <= 1:
+            return self._embed(texts)
+        size = math.ceil(len(texts) / shards)
+        with ThreadPoolExecutor(shards) as executor:
+            parts = executor.map(self._embed, [texts[i:i + size] for i in range(0, len(texts), size)])
+            return [vector for part in parts for vector in part]
+
+
+def embeddings() -> Embeddings:
+    """The pooled embedding model for ``settings.embedding_model``."""
+    return Embeddings()
+
+
+def llm_slots() -> asyncio.Semaphore:
+    """Bounds in-flight LLM calls on the running event loop to ``llm_parallelism()``."""
+    return _llm_slots.get()
+
+
+async def warm_models() -> None:
+    """Load the LLMs and embedding model into every Ollama endpoint now, pinned for ``settings.ollama_keep_alive``.
+
+    An empty generate or embed request loads a model without running it.
+    Failures are logged: the first real call simply pays the load time.
+    """
+    from ollama import AsyncClient
+
+    keep_alive = settings.ollama_keep_alive
+
+    async def load(url: str, model: str, embedding: bool) -> None:
+        client = AsyncClient(host=url)
+        try:
+            if embedding:
+                await client.embed(model=model, input=[], keep_alive=keep_alive)
+            else:
+                # With the context size the calls use: another num_ctx would make Ollama reload the model
+                options = {"num_ctx": settings.ollama_num_ctx} if settings.ollama_num_ctx else None
+                await client.generate(model=model, keep_alive=keep_alive, options=options)
+            logger.info("Model %s loaded on %s (keep_alive=%s)", model, url, keep_alive)
+        except Exception as exc:
+            logger.warning("Could not preload model %s on %s: %s", model, url, exc)
+
+    pool = endpoint_pool()
+    await pool.acheck()
+    # LLM_MODEL and every per-stage model (see escalation.stage_model)
+    llms = dict.fromkeys(
+        [settings.llm_model, settings.cv_parser_model, settings.job_parser_model, settings.scorer_model]
+    )
+    models = [(model, False) for model in llms if model] + [(settings.embedding_model, True)]
+    await asyncio.gather(*(
+        load(endpoint.url, model, embedding)
+        for endpoint in pool.endpoints
+        for model, embedding in models
+        if endpoint.healthy and endpoint.serves(model)
+    ))
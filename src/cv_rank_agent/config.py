@@ -1,8 +1,10 @@
 """Pydantic-settings configuration loaded from .env."""
 
 from pathlib import Path
+from typing import Annotated, Literal
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
 # Path to the project root (where .env lives)
@@ -24,13 +26,94 @@ class Settings(BaseSettings):
     llm_model: str = "llama3.1:8b"
     embedding_model: str = "nomic-embed-text"
     temperature: float = 0.0
+    ollama_keep_alive: int | str | None = None  # how long Ollama keeps models loaded: seconds or "30m"; -1 = forever
+    ollama_endpoints: Annotated[list[str], NoDecode] = []  # several Ollama instances, comma-separated; empty = base URL
+    ollama_timeout: float | None = None     # seconds per Ollama request before failing over to another endpoint
+    ollama_health_interval: float = 30.0    # seconds between endpoint health checks (with several endpoints)
+    ollama_num_ctx: int | None = None       # LLM context window in tokens; None = the model's Ollama default
+
+    # Per-stage models (unset = LLM_MODEL)
+    cv_parser_model: str | None = None      # CV extraction
+    job_parser_model: str | None = None     # job page extraction, e.g. a 1–3B instruct model
+    scorer_model: str | None = None         # CV/job scoring
+    escalate_extraction: bool = True        # re-run a stage model's incomplete or invalid extraction on LLM_MODEL
 
     # Scoring strategy
     llm_only_threshold: int = 5   # <= this many jobs → LLM scores all (Option A)
     llm_top_n: int = 10           # > threshold → LLM deep-scores top N (Option B)
+    ann_min_jobs: int = 0         # >= this many jobs → IVF approximate top-N (0 = always exact)
+    ann_probes: int = 8           # IVF clusters scanned per query
+    scorer_batch_size: int = 1    # jobs scored per LLM call; > 1 evaluates each CV once per batch instead of per job
+
+    # Lexical skill index (BM25 over normalized skills, no model calls)
+    lexical_prefilter_n: int = 0     # > this many jobs → embed only each CV's best N BM25 matches (0 = off)
+    lexical_fusion: bool = False     # top N by reciprocal-rank fusion of cosine and BM25 rankings
+    rrf_k: int = 60                  # RRF damping constant: score = sum of 1 / (k + rank)
+
+    # Adaptive cascade (Option B) — each cutoff trims the cosine top N; 0 disables it
+    llm_min_similarity: float = 0.0  # never LLM-score a job below this cosine similarity
+    llm_knee_gap: float = 0.0        # cut a CV's list at the first cosine drop of at least this much
+    llm_call_budget: int = 0         # max scorer calls per run, across all CVs, by global cosine rank
+    llm_early_stop_n: int = 0        # stop once remaining jobs can no longer enter a CV's top N by LLM score
+
+    # Crawling
+    crawl_strategy: Literal["browser", "http"] = "browser"  # "http" fetches static HTML without a headless browser
+
+    # Concurrency
+    crawl_concurrency: int = 4             # pages crawled at once with the shared browser
+    crawl_per_domain_concurrency: int = 2  # pages crawled at once per domain
+    llm_concurrency: int = 1               # in-flight LLM calls per Ollama endpoint
+
+    # CV parsing
+    cv_layout_parser: bool = True       # read sections from the CV layout; the LLM only extracts what is left
+    cv_ingest_workers: int = 0          # processes extracting CV text and layout; 0 = one per CPU core, 1 = no pool
+    cv_ingest_queue: int = 0            # CVs extracted ahead of parsing at most; 0 = two per worker
+
+    # Prompt budgets (estimated tokens)
+    job_content_max_tokens: int = 4000  # pruned job-page markdown sent to JOB_PARSER_PROMPT
+    scorer_prompt_max_tokens: int = 0   # one SCORER_PROMPT (instructions, CV, job); 0 = fit OLLAMA_NUM_CTX if set
+
+    # Caches
+    cache_dir: Path = _PROJECT_ROOT / ".cache"
+    crawl_cache_ttl_hours: float = 24.0
+    crawl_cache_mode: Literal["default", "refresh", "offline"] = "default"  # set by --refresh / --offline
+    artifact_cache: bool = True         # reuse ParsedCV / JobDescription / ScoreResult for identical LLM inputs
+    embedding_dtype: Literal["float32", "float16"] = "float32"  # on-disk precision of stored embeddings
+    embedding_compact_share: float = 0.25  # discarded share of the store at which watch mode compacts it; 0 = never
+
+    # Resumable runs
+    checkpoints: bool = True            # save CLI run progress to CACHE_DIR/checkpoints.sqlite3 for --resume
+
+    # Watch mode (--watch)
+    watch_interval: float = 300.0       # seconds between refreshes while the jobs file is unchanged
+
+    # Instrumentation
+    metrics_dir: Path | None = None     # also write every run's JSON report and Prometheus text here
+
+    # Service mode (python -m cv_rank_agent.service)
+    service_host: str = "127.0.0.1"
+    service_port: int = 8765
+    service_max_running: int = 2        # ranking runs executed at once
+    service_max_queued: int = 16        # runs waiting for a slot; more are rejected with 503
 
     # Limits
-    max_jobs: int = 50
+    max_jobs: int = 100_000
+
+    @field_validator("ollama_endpoints", mode="before")
+    @classmethod
+    def _split_endpoints(cls, value: object) -> object:
+        """Read OLLAMA_ENDPOINTS=http://localhost:11434,http://localhost:11435 from .env."""
+        if isinstance(value, str):
+            return [url.strip() for url in value.split(",") if url.strip()]
+        return value
+
+    @field_validator("ollama_keep_alive", mode="before")
+    @classmethod
+    def _keep_alive_seconds(cls, value: object) -> object:
+        """Read "-1" or "300" from .env as seconds; Ollama only accepts strings with a unit ("5m")."""
+        if isinstance(value, str) and value.lstrip("-").isdigit():
+            return int(value)
+        return value
 
 
 # Singleton instance — import this wherever you need settings
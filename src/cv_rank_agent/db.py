@@ -0,0 +1,22 @@
+"""SQLite connection helper shared by the on-disk caches."""
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def connect(path: Path) -> Iterator[sqlite3.Connection]:
+    """Open ``path`` in WAL mode for one transaction, then close it.
+
+    WAL lets several runs on the same machine read while one writes; the
+    busy timeout makes concurrent writers wait instead of failing.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
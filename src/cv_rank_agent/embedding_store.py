@@ -0,0 +1,224 @@
+"""Persistent, memory-mapped store of CV and job embeddings.
+
+Vectors live in one contiguous, append-only float32/float16 matrix file per
+embedding model; a SQLite index maps content hash to row. Only texts that
+were never embedded with the model are sent to Ollama, and stored vectors
+are read zero-copy through ``numpy.memmap``.
+
+Compaction writes the live rows to a new generation of the matrix file and
+switches the index to it (row numbers and generation) in one transaction;
+the old file is deleted only after that commits. Readers take the rows and
+the generation from one snapshot of the index, so a compaction by another
+run never pairs old row numbers with the new file.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from cv_rank_agent.config import settings
+from cv_rank_agent.db import connect
+
+EmbedFn = Callable[[list[str]], list[list[float]]]
+
+
+def text_key(text: str) -> str:
+    """Content hash used as the index key of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Append-only embedding matrix for one model, with compaction.
+
+    Appends and compaction run inside an IMMEDIATE SQLite transaction on the
+    index, which serializes writers across concurrent runs on one machine.
+    """
+
+    def __init__(self, model: str | None = None, directory: Path | None = None, dtype: str | None = None) -> None:
+        self.model = model or settings.embedding_model
+        self.dtype = np.dtype(dtype or settings.embedding_dtype)
+        self.directory = directory or settings.cache_dir / "embeddings"
+        model_slug = re.sub(r"[^\w.-]+", "_", self.model)
+        self.matrix_name = f"{model_slug}.{self.dtype.name}.bin"
+        self.index_path = self.directory / "index.sqlite3"
+        with connect(self.index_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS vectors ("
+                " matrix TEXT NOT NULL, key TEXT NOT NULL, row INTEGER NOT NULL, PRIMARY KEY (matrix, key))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS matrices ("
+                " matrix TEXT PRIMARY KEY, dim INTEGER NOT NULL, generation INTEGER NOT NULL DEFAULT 0)"
+            )
+            if "generation" not in {column[1] for column in conn.execute("PRAGMA table_info(matrices)")}:
+                conn.execute("ALTER TABLE matrices ADD COLUMN generation INTEGER NOT NULL DEFAULT 0")
+            row = conn.execute("SELECT dim FROM matrices WHERE matrix = ?", (self.matrix_name,)).fetchone()
+        self.dim: int | None = row[0] if row else None
+
+    def _path(self, generation: int) -> Path:
+        """The matrix file of one generation; generation 0 keeps the original name."""
+        if generation == 0:
+            return self.directory / self.matrix_name
+        return self.directory / f"{self.matrix_name.removesuffix('.bin')}.{generation}.bin"
+
+    def _generation(self, conn: sqlite3.Connection) -> int:
+        """The current file generation (and, once another run has stored vectors, their dimension)."""
+        row = conn.execute("SELECT dim, generation FROM matrices WHERE matrix = ?", (self.matrix_name,)).fetchone()
+        if row is None:
+            return 0
+        self.dim = row[0]
+        return row[1]
+
+    def _file_rows(self, generation: int) -> int:
+        path = self._path(generation)
+        if self.dim is None or not path.exists():
+            return 0
+        return path.stat().st_size // (self.dim * self.dtype.itemsize)
+
+    def _open(self, generation: int) -> np.ndarray:
+        """Memory-map one generation; FileNotFoundError if it does not exist (yet, or any more)."""
+        path = self._path(generation)
+        rows = path.stat().st_size // (self.dim * self.dtype.itemsize) if self.dim else 0
+        if rows == 0:
+            return np.empty((0, self.dim or 0), dtype=self.dtype)
+        return np.memmap(path, dtype=self.dtype, mode="r", shape=(rows, self.dim))
+
+    def _rows(self, conn: sqlite3.Connection, keys: Sequence[str]) -> dict[str, int]:
+        found: dict[str, int] = {}
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            found.update(conn.execute(
+                f"SELECT key, row FROM vectors WHERE matrix = ? AND key IN ({','.join('?' * len(chunk))})",
+                (self.matrix_name, *chunk),
+            ).fetchall())
+        return found
+
+    def _snapshot(self, keys: Sequence[str]) -> tuple[dict[str, int], np.ndarray]:
+        """The stored rows of ``keys`` and the matrix file they index, from one read of the index."""
+        while True:
+            with connect(self.index_path) as conn:
+                conn.execute("BEGIN")  # rows and generation come from the same snapshot
+                generation = self._generation(conn)
+                found = self._rows(conn, keys)
+                try:
+                    return found, self._open(generation)
+                except FileNotFoundError:
+                    if not conn.execute("SELECT 1 FROM vectors WHERE matrix = ? LIMIT 1", (self.matrix_name,)).fetchone():
+                        return found, np.empty((0, self.dim or 0), dtype=self.dtype)  # nothing stored yet
+                    # Compacted and deleted since the snapshot: read the new generation
+
+    def matrix(self) -> np.ndarray:
+        """All stored vectors as a read-only memory map of shape (rows, dim)."""
+        return self._snapshot([])[1]
+
+    def rows(self, keys: Sequence[str]) -> dict[str, int]:
+        """Map the stored subset of ``keys`` to their matrix rows."""
+        with connect(self.index_path) as conn:
+            return self._rows(conn, keys)
+
+    def add(self, vectors: dict[str, Sequence[float]]) -> None:
+        """Append vectors for new keys; keys already stored are left untouched."""
+        if not vectors:
+            return
+        with connect(self.index_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")  # exclusive writer until commit
+            if self.dim is None:
+                self.dim = len(next(iter(vectors.values())))
+                conn.execute("INSERT OR IGNORE INTO matrices (matrix, dim) VALUES (?, ?)", (self.matrix_name, self.dim))
+                self.dim = conn.execute(
+                    "SELECT dim FROM matrices WHERE matrix = ?", (self.matrix_name,)
+                ).fetchone()[0]
+            stored = self._rows(conn, list(vectors))
+            new_keys = [key for key in vectors if key not in stored]
+            if not new_keys:
+                return
+            generation = self._generation(conn)
+            first_row = self._file_rows(generation)
+            block = np.asarray([vectors[key] for key in new_keys], dtype=self.dtype)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self._path(generation), "ab") as f:
+                # Truncate any torn tail left by a crashed writer before appending
+                f.truncate(first_row * self.dim * self.dtype.itemsize)
+                f.write(block.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            conn.executemany(
+                "INSERT INTO vectors (matrix, key, row) VALUES (?, ?, ?)",
+                [(self.matrix_name, key, first_row + i) for i, key in enumerate(new_keys)],
+            )
+
+    def embed(self, texts: Sequence[str], embed_fn: EmbedFn) -> np.ndarray:
+        """Return a (len(texts), dim) matrix, calling ``embed_fn`` only for unseen texts."""
+        keys = [text_key(text) for text in texts]
+        stored, matrix = self._snapshot(keys)
+        missing = {key: text for key, text in zip(keys, texts) if key not in stored}
+        if missing:
+            self.add(dict(zip(missing, embed_fn(list(missing.values())))))
+            stored, matrix = self._snapshot(keys)
+        return matrix[[stored[key] for key in keys]]
+
+    def discard(self, keys: Sequence[str]) -> None:
+        """Drop keys from the index; their rows are reclaimed by compact()."""
+        with connect(self.index_path) as conn:
+            conn.executemany(
+                "DELETE FROM vectors WHERE matrix = ? AND key = ?", [(self.matrix_name, key) for key in keys]
+            )
+
+    def _usage(self) -> tuple[int, int]:
+        """Indexed rows and rows in the current matrix file, from one snapshot."""
+        with connect(self.index_path) as conn:
+            conn.execute("BEGIN")
+            live = conn.execute("SELECT COUNT(*) FROM vectors WHERE matrix = ?", (self.matrix_name,)).fetchone()[0]
+            return live, self._file_rows(self._generation(conn))
+
+    def dead_rows(self) -> int:
+        """Rows of the matrix file that are no longer indexed (discarded, or left by a torn append)."""
+        live, total = self._usage()
+        return max(total - live, 0)
+
+    def compact_if_needed(self, min_dead_share: float) -> int:
+        """compact() once at least ``min_dead_share`` of the matrix rows are dead (0 = never); returns rows reclaimed."""
+        live, total = self._usage()
+        if min_dead_share <= 0 or total == 0 or total - live < min_dead_share * total:
+            return 0
+        return self.compact()
+
+    def compact(self) -> int:
+        """Rewrite the matrix with only indexed rows, as a new generation; returns the number of rows reclaimed."""
+        with connect(self.index_path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            generation = self._generation(conn)
+            live = conn.execute(
+                "SELECT key, row FROM vectors WHERE matrix = ? ORDER BY row", (self.matrix_name,)
+            ).fetchall()
+            total = self._file_rows(generation)
+            if len(live) == total:
+                return 0
+            new_path = self._path(generation + 1)
+            try:
+                with open(new_path, "wb") as f:
+                    if live:
+                        f.write(np.ascontiguousarray(self._open(generation)[[row for _, row in live]]).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                conn.executemany(
+                    "UPDATE vectors SET row = ? WHERE matrix = ? AND key = ?",
+                    [(i, self.matrix_name, key) for i, (key, _) in enumerate(live)],
+                )
+                conn.execute(
+                    "UPDATE matrices SET generation = ? WHERE matrix = ?", (generation + 1, self.matrix_name)
+                )
+                conn.commit()
+            except BaseException:
+                new_path.unlink(missing_ok=True)  # the index still points at the old generation
+                raise
+        # Readers that took their snapshot before the commit retry on the new generation. Older
+        # generations are only left behind by a run that crashed between its commit and this cleanup.
+        for old in range(generation + 1):
+            self._path(old).unlink(missing_ok=True)
+        return total - len(live)
@@ -0,0 +1,98 @@
+"""Per-stage models: extraction on a small, fast model, escalated to LLM_MODEL when its output falls short.
+
+``settings.cv_parser_model``, ``settings.job_parser_model`` and
+``settings.scorer_model`` pick the LLM of each node; unset, a node uses
+``settings.llm_model``. An extraction node whose model differs from
+``settings.llm_model`` checks every result: when the structured output fails
+validation or a required field comes back empty, the same prompt is re-run on
+``settings.llm_model`` (unless ``settings.escalate_extraction`` is off).
+Scoring is never escalated. A result is cached under the model that
+produced it, so an escalated one is looked up with artifact_models().
+"""
+import logging
+from typing import Literal
+
+from pydantic import BaseModel
+
+from cv_rank_agent import metrics
+from cv_rank_agent.clients import ChatModel, chat_model
+from cv_rank_agent.config import settings
+from cv_rank_agent.models import JobDescription, ParsedCV
+
+logger = logging.getLogger(__name__)
+
+Stage = Literal["cv_parser", "job_parser", "scorer"]
+
+# Fields an extraction must fill to be accepted; a group is satisfied by any one of its fields
+REQUIRED_FIELDS: dict[type[BaseModel], tuple[tuple[str, ...], ...]] = {
+    ParsedCV: (("name",), ("skills", "experience")),
+    JobDescription: (("title",), ("job_description",), ("requirements", "responsibilities")),
+}
+
+
+def stage_model(stage: Stage) -> str:
+    """The LLM a node uses: its own setting (e.g. ``settings.job_parser_model``), else ``settings.llm_model``."""
+    return getattr(settings, f"{stage}_model") or settings.llm_model
+
+
+def artifact_models(stage: Stage) -> list[str]:
+    """The models whose cached results a stage reuses: its own, then ``settings.llm_model`` if it escalates."""
+    return [stage_model(stage), settings.llm_model] if _escalates(stage) else [stage_model(stage)]
+
+
+def missing_fields(result: BaseModel) -> list[str]:
+    """The required field groups of ``result`` that came back empty."""
+    def filled(value: object) -> bool:
+        return bool(value.strip()) if isinstance(value, str) else bool(value)
+
+    return [
+        " or ".join(group)
+        for group in REQUIRED_FIELDS.get(type(result), ())
+        if not any(filled(getattr(result, name)) for name in group)
+    ]
+
+
+def _escalates(stage: Stage) -> bool:
+    return settings.escalate_extraction and stage_model(stage) != settings.llm_model
+
+
+def _rejection(stage: Stage, result: BaseModel) -> str | None:
+    """Why a stage model's result must be re-run on ``settings.llm_model``, or None to keep it."""
+    missing = missing_fields(result) if _escalates(stage) else []
+    return f"empty {', '.join(missing)}" if missing else None
+
+
+def _fallback(stage: Stage, llm: ChatModel, reason: str) -> ChatModel:
+    metrics.count("llm_escalations", node=stage, model=stage_model(stage))
+    logger.info("%s: %s output rejected (%s) — re-running on %s", stage, stage_model(stage), reason, settings.llm_model)
+    return chat_model(llm.schema, settings.llm_model)
+
+
+def extract(stage: Stage, llm: ChatModel, prompt: str) -> tuple[BaseModel, str]:
+    """Run an extraction prompt on the stage's model, escalating when needed; returns the result and the model used."""
+    try:
+        result = llm.invoke(prompt)
+    except Exception as exc:  # malformed structured output, or the small model is not installed
+        if not _escalates(stage):
+            raise
+        reason = f"invalid output: {exc}"
+    else:
+        reason = _rejection(stage, result)
+        if reason is None:
+            return result, stage_model(stage)
+    return _fallback(stage, llm, reason).invoke(prompt), settings.llm_model
+
+
+async def aextract(stage: Stage, llm: ChatModel, prompt: str) -> tuple[BaseModel, str]:
+    """Async ``extract()``."""
+    try:
+        result = await llm.ainvoke(prompt)
+    except Exception as exc:
+        if not _escalates(stage):
+            raise
+        reason = f"invalid output: {exc}"
+    else:
+        reason = _rejection(stage, result)
+        if reason is None:
+            return result, stage_model(stage)
+    return await _fallback(stage, llm, reason).ainvoke(prompt), settings.llm_model
@@ -4,16 +4,16 @@ import logging
 from cv_rank_agent.state import InputState, OverallState, OutputState
 from cv_rank_agent.config import settings
 from cv_rank_agent.nodes.cv_parser import cv_parser
-from cv_rank_agent.nodes.job_parser import job_parser
-from cv_rank_agent.nodes.embedder import embedder
+from cv_rank_agent.nodes.job_parser import collect_jobs, fan_out_jobs, job_parser
 from cv_rank_agent.nodes.scorer import scorer
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.state import CompiledStateGraph
+from langgraph.types import Checkpointer
 
 logger = logging.getLogger(__name__)
 
 
-def route_after_job_parser(state: OverallState) -> str:
+def route_after_collect_jobs(state: OverallState) -> str:
     """Decide whether to use the embedder (Option B) or go straight to scorer (Option A)."""
     job_count = len(state["job_descriptions"])
     if job_count > settings.llm_only_threshold:
@@ -23,23 +23,37 @@ def route_after_job_parser(state: OverallState) -> str:
     return "few_jobs"
 
 
-def build_graph() -> CompiledStateGraph:
-    """Construct and compile the LangGraph graph with nodes and edges."""
+def embedder(state: OverallState) -> dict:
+    """The embedder node, imported on first use: Option A runs never load NumPy or the embedding stack."""
+    from cv_rank_agent.nodes.embedder import embedder as embed_and_rank
 
-    graph = StateGraph(OverallState, input=InputState, output=OutputState)
+    return embed_and_rank(state)
+
+
+def build_graph(checkpointer: Checkpointer = None) -> CompiledStateGraph:
+    """Construct and compile the LangGraph graph with nodes and edges.
+
+    cv_parser and the per-job job_parser tasks start together from START;
+    collect_jobs waits for all of them before routing to Option A or B.
+    With a ``checkpointer`` (see checkpoints.py), runs are saved per thread and can be resumed.
+    """
+
+    graph = StateGraph(OverallState, input_schema=InputState, output_schema=OutputState)
     graph.add_node("cv_parser", cv_parser)
     graph.add_node("job_parser", job_parser)
+    graph.add_node("collect_jobs", collect_jobs)
     graph.add_node("embedder", embedder)
     graph.add_node("scorer", scorer)
 
     graph.add_edge(START, "cv_parser")
-    graph.add_edge("cv_parser", "job_parser")
+    graph.add_conditional_edges(START, fan_out_jobs, ["job_parser"])
+    graph.add_edge(["cv_parser", "job_parser"], "collect_jobs")
     graph.add_conditional_edges(
-        "job_parser",
-        route_after_job_parser,
+        "collect_jobs",
+        route_after_collect_jobs,
         {"many_jobs": "embedder", "few_jobs": "scorer"},
     )
     graph.add_edge("embedder", "scorer")
     graph.add_edge("scorer", END)
 
-    return graph.compile()
\ No newline at end of file
+    return graph.compile(checkpointer=checkpointer)
\ No newline at end of file
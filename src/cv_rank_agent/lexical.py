@@ -0,0 +1,156 @@
+"""In-process BM25 index over job skills, with reciprocal-rank fusion.
+
+Job requirements, titles and descriptions are reduced to normalized skill
+tokens (lower-cased, synonyms folded: "k8s" → "kubernetes", "Postgres" →
+"postgresql", "machine learning" → "ml") and kept in an inverted index that
+grows one job at a time. A CV's skills are scored against every job with
+BM25 — no model calls — and the lexical ranking can be fused with the
+cosine ranking by reciprocal rank.
+"""
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+from cv_rank_agent.models import JobDescription, ParsedCV
+
+# Multi-word skills folded to a single token before tokenizing
+_PHRASES = {
+    "amazon web services": "aws",
+    "google cloud platform": "gcp",
+    "google cloud": "gcp",
+    "microsoft azure": "azure",
+    "machine learning": "ml",
+    "deep learning": "dl",
+    "natural language processing": "nlp",
+    "computer vision": "cv",
+    "continuous integration": "ci",
+    "continuous delivery": "cd",
+    "ci/cd": "ci cd",
+    "large language models": "llm",
+    "large language model": "llm",
+    "infrastructure as code": "iac",
+    "test driven development": "tdd",
+    "test-driven development": "tdd",
+    "object oriented": "oop",
+    "object-oriented": "oop",
+    "rest api": "rest",
+    "node js": "nodejs",
+    "restful": "rest",
+}
+_PHRASE = re.compile(r"\b(?:" + "|".join(re.escape(p) for p in sorted(_PHRASES, key=len, reverse=True)) + r")\b")
+
+# Single-token synonyms and spelling variants. Abbreviations that name different
+# skills in different postings ("tf": Terraform or TensorFlow, "node": Node.js
+# or a Kubernetes node, "ai" vs "ml") are left as they are.
+SYNONYMS = {
+    "js": "javascript", "ecmascript": "javascript", "ts": "typescript",
+    "node.js": "nodejs", "react.js": "react", "reactjs": "react",
+    "vue.js": "vue", "vuejs": "vue", "angularjs": "angular",
+    "py": "python", "python3": "python", "golang": "go",
+    "postgres": "postgresql", "psql": "postgresql", "mongo": "mongodb",
+    "k8s": "kubernetes", "kube": "kubernetes",
+    "sklearn": "scikit-learn", "scikit": "scikit-learn", "pytorch": "torch",
+    "genai": "llm", "llms": "llm",
+    "c#": "csharp", "c++": "cpp", ".net": "dotnet",
+    "apis": "api", "microservice": "microservices",
+}
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our the this to we with you your will"
+    " experience years year strong knowledge skills ability good plus".split()
+)
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*|[.#][a-z]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Normalized skill tokens of ``text``, in order, stopwords removed."""
+    text = _PHRASE.sub(lambda m: _PHRASES[m.group(0)], text.lower())
+    tokens: list[str] = []
+    for token in _TOKEN.findall(text):
+        token = token.rstrip(".-")
+        token = SYNONYMS.get(token, token)
+        if token and token not in _STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def job_terms(job: JobDescription) -> list[str]:
+    """Index terms of a job; requirements and title count twice, as they name the skills asked for."""
+    emphasized = [job.title, *job.requirements]
+    return tokenize(" ".join(emphasized)) * 2 + tokenize(" ".join([*job.responsibilities, job.job_description]))
+
+
+def cv_terms(parsed_cv: ParsedCV) -> list[str]:
+    """Query terms of a CV: its skills and the roles it has held."""
+    return tokenize(" ".join([*parsed_cv.skills, *(exp.role for exp in parsed_cv.experience)]))
+
+
+class BM25Index:
+    """Inverted BM25 index; documents are appended one at a time and get consecutive ids.
+
+    Postings are plain lists while documents are added and are packed into
+    numpy arrays on the first query after a change, so scoring a query is a
+    few vectorized operations per query term.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, tuple[list[int], list[int]]] = {}  # term → (doc ids, term frequencies)
+        self._lengths: list[int] = []
+        self._packed: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._norm: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, terms: Sequence[str]) -> int:
+        """Index one document; returns its id."""
+        doc = len(self._lengths)
+        for term, tf in Counter(terms).items():
+            docs, tfs = self._postings.setdefault(term, ([], []))
+            docs.append(doc)
+            tfs.append(tf)
+            self._packed.pop(term, None)
+        self._lengths.append(len(terms))
+        self._norm = None
+        return doc
+
+    def extend(self, documents: Iterable[Sequence[str]]) -> None:
+        for terms in documents:
+            self.add(terms)
+
+    def _term(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        if term not in self._packed:
+            docs, tfs = self._postings[term]
+            self._packed[term] = (np.asarray(docs, dtype=np.intp), np.asarray(tfs, dtype=np.float32))
+        return self._packed[term]
+
+    def scores(self, query: Sequence[str]) -> np.ndarray:
+        """BM25 score of every document for ``query`` (0 for documents matching no term)."""
+        scores = np.zeros(len(self._lengths), dtype=np.float32)
+        if not self._lengths:
+            return scores
+        if self._norm is None:
+            lengths = np.asarray(self._lengths, dtype=np.float32)
+            self._norm = self.k1 * (1 - self.b + self.b * lengths / max(lengths.mean(), 1.0))
+        n = len(self._lengths)
+        for term in set(query):
+            if term not in self._postings:
+                continue
+            docs, tfs = self._term(term)
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + self._norm[docs])
+        return scores
+
+
+def reciprocal_rank_fusion(rankings: Sequence[np.ndarray], k: int = 60) -> dict[int, float]:
+    """Fuse ranked lists of document ids (best first) into RRF scores, sum of 1 / (k + rank)."""
+    fused: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking.tolist(), start=1):
+            fused[doc] = fused.get(doc, 0.0) + 1.0 / (k + rank)
+    return fused
@@ -0,0 +1,292 @@
+"""Structured per-run instrumentation: node and item timings, LLM token and eval metrics, counters.
+
+A RunMetrics recorder is made current for one graph run with ``recording()``.
+Graph nodes and LLM calls are timed by ``MetricsCallback``, a LangChain
+callback handler passed in the run config, which also picks up Ollama's
+token counts and ``prompt_eval``/``eval``/``load`` durations. Code that
+knows more (crawl bytes, cache outcomes, per-job timings) records it with
+``count()`` and ``record_item()``, which are no-ops outside a recorded run.
+
+The result is a JSON run report (``RunMetrics.report()``) and, optionally,
+Prometheus text exposition format (``RunMetrics.prometheus()``).
+"""
+import json
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+_NS = 1e-9
+
+
+@dataclass
+class NodeStats:
+    """Wall time of one graph node, summed over its tasks (one task per Send)."""
+    tasks: int = 0
+    wall_s: float = 0.0
+    max_s: float = 0.0
+    first_start: float | None = None
+    last_end: float | None = None
+
+
+@dataclass
+class LLMStats:
+    """LLM calls made from one node, with Ollama's own accounting."""
+    calls: int = 0
+    wall_s: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    prompt_eval_s: float = 0.0
+    eval_s: float = 0.0
+    load_s: float = 0.0
+
+
+@dataclass
+class RunMetrics:
+    """Everything recorded for one graph run; safe to update from several threads."""
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    started_at: float = field(default_factory=time.time)
+    nodes: dict[str, NodeStats] = field(default_factory=dict)
+    llm: dict[str, LLMStats] = field(default_factory=dict)
+    counters: dict[tuple[str, tuple[tuple[str, str], ...]], float] = field(default_factory=dict)
+    items: list[dict[str, Any]] = field(default_factory=list)
+    finished_at: float | None = None
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clock_start = time.perf_counter()
+
+    def now(self) -> float:
+        """Seconds since the run started."""
+        return time.perf_counter() - self._clock_start
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def record_item(self, node: str, item: str, seconds: float, **fields: Any) -> None:
+        with self._lock:
+            self.items.append({"node": node, "item": item, "seconds": round(seconds, 4), **fields})
+
+    def record_node(self, node: str, start: float, end: float) -> None:
+        with self._lock:
+            stats = self.nodes.setdefault(node, NodeStats())
+            stats.tasks += 1
+            stats.wall_s += end - start
+            stats.max_s = max(stats.max_s, end - start)
+            stats.first_start = start if stats.first_start is None else min(stats.first_start, start)
+            stats.last_end = end if stats.last_end is None else max(stats.last_end, end)
+
+    def record_llm(self, node: str, seconds: float, info: dict[str, Any]) -> None:
+        with self._lock:
+            stats = self.llm.setdefault(node, LLMStats())
+            stats.calls += 1
+            stats.wall_s += seconds
+            stats.prompt_tokens += info.get("prompt_eval_count") or 0
+            stats.completion_tokens += info.get("eval_count") or 0
+            stats.prompt_eval_s += (info.get("prompt_eval_duration") or 0) * _NS
+            stats.eval_s += (info.get("eval_duration") or 0) * _NS
+            stats.load_s += (info.get("load_duration") or 0) * _NS
+
+    def finish(self) -> None:
+        self.finished_at = self.now()
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Sum of a counter over every label set matching ``labels``."""
+        wanted = set(labels.items())
+        return sum(v for (n, key), v in self.counters.items() if n == name and wanted <= set(key))
+
+    def _hit_rates(self) -> dict[str, float | None]:
+        def rate(hits: float, total: float) -> float | None:
+            return round(hits / total, 4) if total else None
+
+        crawl_total = self.counter("crawl_cache_lookups")
+        artifact_total = self.counter("artifact_cache_lookups")
+        embed_total = self.counter("embedding_texts")
+        return {
+            "crawl_cache": rate(crawl_total - self.counter("crawl_cache_lookups", outcome="miss"), crawl_total),
+            "artifact_cache": rate(self.counter("artifact_cache_lookups", outcome="hit"), artifact_total),
+            "embedding_store": rate(self.counter("embedding_texts", outcome="reused"), embed_total),
+        }
+
+    def report(self) -> dict[str, Any]:
+        """The run as a JSON-serializable dict."""
+        with self._lock:
+            wall = self.finished_at if self.finished_at is not None else self.now()
+            nodes = {
+                name: {
+                    "tasks": s.tasks,
+                    "wall_s": round(s.wall_s, 4),
+                    "max_s": round(s.max_s, 4),
+                    "span_s": round((s.last_end or 0) - (s.first_start or 0), 4),
+                }
+                for name, s in self.nodes.items()
+            }
+            llm = {}
+            for name, s in self.llm.items():
+                llm[name] = {k: round(v, 4) if isinstance(v, float) else v for k, v in asdict(s).items()}
+                llm[name]["completion_tokens_per_s"] = round(s.completion_tokens / s.eval_s, 1) if s.eval_s else None
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+            items = list(self.items)
+        jobs = self.counter("jobs_parsed")
+        return {
+            "run_id": self.run_id,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started_at)),
+            "wall_s": round(wall, 4),
+            "jobs": int(jobs),
+            "jobs_per_min": round(jobs / wall * 60, 2) if wall and jobs else None,
+            "nodes": nodes,
+            "llm": llm,
+            "hit_rates": self._hit_rates(),
+            "counters": counters,
+            "items": items,
+        }
+
+    def write_report(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    def prometheus(self, prefix: str = "cv_rank") -> str:
+        """The run in Prometheus text exposition format (e.g. for node_exporter's textfile collector)."""
+        report = self.report()
+        lines: list[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: list[tuple[dict[str, str], float]]) -> None:
+            if not samples:
+                return
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                rendered = ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in sorted(labels.items()))
+                lines.append(f"{prefix}_{name}{{{rendered}}} {value:g}" if rendered else f"{prefix}_{name} {value:g}")
+
+        # run_id only labels the info metric, so the other series stay comparable across runs
+        metric("run_info", "gauge", "The run these metrics describe.", [({"run_id": report["run_id"]}, 1)])
+        run: dict[str, str] = {}
+        metric("run_seconds", "gauge", "Wall time of the run.", [(run, report["wall_s"])])
+        metric("run_jobs_per_minute", "gauge", "Job URLs processed per minute.",
+               [(run, report["jobs_per_min"])] if report["jobs_per_min"] else [])
+        for name, field_name, help_text in (
+            ("node_tasks", "tasks", "Tasks run per node."),
+            ("node_wall_seconds", "wall_s", "Summed task wall time per node."),
+        ):
+            metric(f"{name}_total", "counter", help_text,
+                   [({**run, "node": n}, s[field_name]) for n, s in report["nodes"].items()])
+        for name, field_name, help_text in (
+            ("llm_calls", "calls", "LLM calls per node."),
+            ("llm_prompt_tokens", "prompt_tokens", "Prompt tokens evaluated by Ollama."),
+            ("llm_completion_tokens", "completion_tokens", "Tokens generated by Ollama."),
+            ("llm_prompt_eval_seconds", "prompt_eval_s", "Ollama prompt_eval_duration."),
+            ("llm_eval_seconds", "eval_s", "Ollama eval_duration."),
+            ("llm_load_seconds", "load_s", "Ollama load_duration."),
+            ("llm_wall_seconds", "wall_s", "Client-side LLM call wall time, including queueing."),
+        ):
+            metric(f"{name}_total", "counter", help_text,
+                   [({**run, "node": n}, s[field_name]) for n, s in report["llm"].items()])
+        for rate_name, value in report["hit_rates"].items():
+            metric(f"{rate_name}_hit_ratio", "gauge", f"Share of {rate_name.replace('_', ' ')} lookups served locally.",
+                   [(run, value)] if value is not None else [])
+        by_name: dict[str, list[tuple[dict[str, str], float]]] = {}
+        for counter in report["counters"]:
+            by_name.setdefault(counter["name"], []).append(({**run, **counter["labels"]}, counter["value"]))
+        for name, samples in by_name.items():
+            metric(f"{name}_total", "counter", f"{name.replace('_', ' ').capitalize()}.", samples)
+        return "\n".join(lines) + "\n"
+
+
+_current: ContextVar[RunMetrics | None] = ContextVar("run_metrics", default=None)
+
+
+def current() -> RunMetrics | None:
+    """The recorder of the run in progress, if any."""
+    return _current.get()
+
+
+@contextmanager
+def recording(metrics: RunMetrics | None = None) -> Iterator[RunMetrics]:
+    """Make ``metrics`` (or a new recorder) current for the enclosed graph run."""
+    metrics = metrics or RunMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        metrics.finish()
+        _current.reset(token)
+
+
+def count(name: str, value: float = 1, **labels: str) -> None:
+    """Add to a counter of the current run (no-op when nothing is recording)."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.count(name, value, **labels)
+
+
+def record_item(node: str, item: str, seconds: float, **fields: Any) -> None:
+    """Record the timing of one item (a CV, a job, a crawl) of the current run."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.record_item(node, item, seconds, **fields)
+
+
+class MetricsCallback(BaseCallbackHandler):
+    """Times graph nodes and LLM calls, and collects Ollama's eval metrics, into a RunMetrics.
+
+    Pass it in the graph config: ``graph.ainvoke(inputs, config={"callbacks": [MetricsCallback(metrics)]})``.
+    """
+
+    def __init__(self, metrics: RunMetrics) -> None:
+        self.metrics = metrics
+        self._nodes: dict[UUID, tuple[str, float]] = {}
+        self._llm_calls: dict[UUID, tuple[str, float]] = {}
+
+    def on_chain_start(
+        self, serialized: dict[str, Any] | None, inputs: Any, *, run_id: UUID,
+        metadata: dict[str, Any] | None = None, **kwargs: Any,
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # The node itself, not a runnable nested in it nor LangGraph's own __start__ step
+        if node and kwargs.get("name") == node and not node.startswith("__"):
+            self._nodes[run_id] = (node, self.metrics.now())
+
+    def _end_node(self, run_id: UUID) -> None:
+        started = self._nodes.pop(run_id, None)
+        if started is not None:
+            self.metrics.record_node(started[0], started[1], self.metrics.now())
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_node(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_node(run_id)
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: Any, *, run_id: UUID,
+        metadata: dict[str, Any] | None = None, **kwargs: Any,
+    ) -> None:
+        self._llm_calls[run_id] = ((metadata or {}).get("langgraph_node", "unknown"), self.metrics.now())
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._llm_calls.pop(run_id, None)
+        if started is None:
+            return
+        generations = [g for batch in response.generations for g in batch]
+        info = (generations[0].generation_info or {}) if generations else {}
+        self.metrics.record_llm(started[0], self.metrics.now() - started[1], info)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._llm_calls.pop(run_id, None)
+        if started is not None:
+            self.metrics.count("llm_errors", node=started[0])
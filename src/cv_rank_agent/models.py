@@ -1,4 +1,4 @@
-"""Pydantic data models: ParsedCV, JobDescription, ScoreResult."""
+"""Pydantic data models: ParsedCV, JobDescription, ScoreResult, ScoreBatch."""
 from __future__ import annotations
 
 from pydantic import BaseModel
@@ -47,9 +47,15 @@ class JobDescription(BaseModel):
 class ScoreResult(BaseModel):
     """LLM scoring result for a CV against a job description."""
     job_reference: str                            # Job URL
+    candidate_reference: str | None = None        # CV file path — set by the scorer
     overall_fit_score: float                      # 0.0 to 1.0
     skill_match_score: float                      # 0.0 to 1.0
     experience_match_score: float                 # 0.0 to 1.0
     identified_gaps: list[str] = []               # areas where CV falls short
     llm_explanation: str                          # LLM's reasoning behind the scores
-    cosine_similarity_score: float | None = None  # only present in Option B (hybrid mode)
\ No newline at end of file
+    cosine_similarity_score: float | None = None  # only present in Option B (hybrid mode)
+
+
+class ScoreBatch(BaseModel):
+    """LLM scoring result for one CV against several job descriptions (SCORER_BATCH_PROMPT)."""
+    scores: list[ScoreResult]                     # one per job, job_reference = the job's label in the prompt
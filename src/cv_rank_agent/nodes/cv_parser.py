@@ -1,26 +1,121 @@
-"""Node 1 — Parse CV (PDF/DOCX) into structured data."""
+"""Node 1 — Parse CV (PDF/DOCX) into structured data.
+
+The CV's layout is read first (tools/cv_layout.py): sections, bullets and
+contact details that are plainly visible in the document fill ParsedCV
+without the LLM, which then only extracts the fields the layout left open.
+A CV without recognizable sections goes to the LLM as a whole.
+
+Files are read by tools/cv_ingest.py, in worker processes when there are
+many, and parsed here in order as their records stream in. Unreadable
+files are skipped with a warning, and a file whose content was already
+parsed under another name reuses that result.
+"""
 import logging
+import time
+from functools import cache
 
-from cv_rank_agent.tools.file_load import load_cv
-from cv_rank_agent.models import ParsedCV
-from cv_rank_agent.prompts.cv_parser import CV_PARSER_PROMPT
+from pydantic import BaseModel, create_model
+
+from cv_rank_agent import metrics
+from cv_rank_agent.artifacts import ArtifactStore, artifact_key
+from cv_rank_agent.clients import ChatModel, chat_model
 from cv_rank_agent.config import settings
+from cv_rank_agent.escalation import artifact_models, extract, stage_model
+from cv_rank_agent.tools.cv_ingest import CVRecord, SkippedCV, ingest_cvs
+from cv_rank_agent.tools.cv_layout import CVDraft
+from cv_rank_agent.models import ParsedCV
+from cv_rank_agent.prompts.cv_parser import CV_FIELDS, CV_PARSER_PROMPT, CV_SECTIONS_PROMPT
 from cv_rank_agent.state import InputState
-from langchain_ollama import ChatOllama
 
 logger = logging.getLogger(__name__)
 
 
-def cv_parser(state: InputState) -> dict:
-    """LangGraph node: extract structured CV data from raw file."""
-    logger.info("Loading CV from %s", state["cv_path"])
-    raw_text = load_cv(state["cv_path"])
-    logger.info("CV loaded — %d characters", len(raw_text))
+@cache
+def _sections_schema(fields: tuple[str, ...]) -> type[BaseModel]:
+    """The ParsedCV fields in ``fields`` as a model of their own, for structured output."""
+    return create_model(
+        "ParsedCVSections", **{name: (ParsedCV.model_fields[name].annotation, ParsedCV.model_fields[name]) for name in fields}
+    )
 
-    llm = ChatOllama(model=settings.llm_model, temperature=settings.temperature)
-    llm = llm.with_structured_output(ParsedCV)
 
-    logger.info("Sending CV to LLM for parsing...")
-    result = llm.invoke(CV_PARSER_PROMPT.format(content=raw_text))
+def _complete_draft(cv_path: str, draft: CVDraft, store: ArtifactStore, started: float) -> ParsedCV:
+    """Finish a layout draft: the LLM extracts only the unresolved fields, from their sections."""
+    if not draft.unresolved:
+        result = draft.parsed_cv()
+        logger.info("CV parsed from its layout (no LLM) — name: %s, skills: %d, experience: %d", result.name, len(result.skills), len(result.experience))
+        metrics.record_item("cv_parser", cv_path, time.perf_counter() - started, path="layout")
+        return result
+
+    fields = tuple(draft.unresolved)
+    schema = _sections_schema(fields)
+    prompt = CV_SECTIONS_PROMPT.format(
+        fields="\n".join(f"- {name}: {CV_FIELDS[name]}" for name in fields), content=draft.context,
+    )
+    inputs = (",".join(fields), draft.context)
+    keys = [artifact_key(CV_SECTIONS_PROMPT, *inputs, model=model) for model in artifact_models("cv_parser")]
+    extracted = store.get(keys, schema)
+    path, model = "layout+cached", None
+    if extracted is None:
+        logger.info("Sending %s to LLM (the rest is read from the CV layout)...", ", ".join(fields))
+        extracted, model = extract("cv_parser", chat_model(schema, stage_model("cv_parser")), prompt)
+        store.put(artifact_key(CV_SECTIONS_PROMPT, *inputs, model=model), extracted)
+        path = "layout+llm"
+    result = draft.parsed_cv(extracted.model_dump(exclude_none=True))
     logger.info("CV parsed — name: %s, skills: %d, experience: %d", result.name, len(result.skills), len(result.experience))
-    return {"parsed_cv": result}
\ No newline at end of file
+    metrics.record_item("cv_parser", cv_path, time.perf_counter() - started, path=path, model=model, llm_fields=list(fields))
+    return result
+
+
+def _parse_cv(record: CVRecord, llm: ChatModel, store: ArtifactStore) -> ParsedCV:
+    """Extract the structured data of one loaded CV (layout first, then the artifact cache and the LLM)."""
+    cv_path, raw_text = record.path, record.text
+    logger.info("Parsing CV %s — %d characters", cv_path, len(raw_text))
+    started = time.perf_counter() - record.extract_s  # the item's time includes reading the file
+    if record.draft is not None:
+        return _complete_draft(cv_path, record.draft, store, started)
+    if settings.cv_layout_parser:
+        logger.info("No sections recognized in the CV layout — the LLM parses the whole CV")
+
+    keys = [artifact_key(CV_PARSER_PROMPT, raw_text, model=model) for model in artifact_models("cv_parser")]
+    result = store.get(keys, ParsedCV)
+    if result is not None:
+        logger.info("CV served from artifact cache — name: %s, skills: %d, experience: %d", result.name, len(result.skills), len(result.experience))
+        metrics.record_item("cv_parser", cv_path, time.perf_counter() - started, path="cached")
+        return result
+
+    logger.info("Sending CV to LLM for parsing...")
+    result, model = extract("cv_parser", llm, CV_PARSER_PROMPT.format(content=raw_text))
+    store.put(artifact_key(CV_PARSER_PROMPT, raw_text, model=model), result)
+    logger.info("CV parsed by %s — name: %s, skills: %d, experience: %d", model, result.name, len(result.skills), len(result.experience))
+    metrics.record_item("cv_parser", cv_path, time.perf_counter() - started, path="llm", model=model)
+    return result
+
+
+def cv_parser(state: InputState) -> dict:
+    """LangGraph node: extract structured CV data from every CV file (or directory or archive of CVs)."""
+    store = ArtifactStore()
+    llm = chat_model(ParsedCV, stage_model("cv_parser"))
+
+    parsed_cvs: dict[str, ParsedCV] = {}
+    by_content: dict[str, ParsedCV] = {}
+    skipped = 0
+    for record in ingest_cvs(state["cv_paths"]):
+        if isinstance(record, SkippedCV):
+            logger.warning("Skipping CV %s — %s", record.path, record.reason)
+            metrics.count("cvs_skipped")
+            metrics.record_item("cv_parser", record.path, 0.0, path="skipped", reason=record.reason)
+            skipped += 1
+        elif record.content_hash in by_content:
+            logger.info("CV %s has the same content as an earlier one — not parsed again", record.path)
+            parsed_cvs[record.path] = by_content[record.content_hash]
+            metrics.record_item("cv_parser", record.path, record.extract_s, path="duplicate")
+        else:
+            parsed_cvs[record.path] = by_content[record.content_hash] = _parse_cv(record, llm, store)
+
+    if not parsed_cvs:
+        raise ValueError(f"No readable CV in {', '.join(state['cv_paths'])} ({skipped} skipped)")
+    if len(parsed_cvs) > 1 or skipped:
+        logger.info(
+            "All %d CV(s) parsed — %d from artifact cache, %d skipped", len(parsed_cvs), store.stats.hits, skipped,
+        )
+    return {"parsed_cvs": parsed_cvs}
@@ -1,66 +1,128 @@
 """Node 3 — Embed CV + jobs with nomic-embed-text, cosine-rank (Option B only)."""
 
 import logging
+import time
+from collections.abc import Sequence
 
 import numpy as np
 
-from cv_rank_agent.models import JobDescription, ParsedCV
+from cv_rank_agent import metrics
+from cv_rank_agent.cascade import CascadePolicy
+from cv_rank_agent.clients import embeddings
+from cv_rank_agent.embedding_store import EmbeddingStore
+from cv_rank_agent.lexical import BM25Index, cv_terms, job_terms, reciprocal_rank_fusion
+from cv_rank_agent.models import JobDescription
+from cv_rank_agent.nodes.scorer import _cv_to_text
+from cv_rank_agent.similarity import IVFIndex, normalize_rows, top_k
 from cv_rank_agent.config import settings
 from cv_rank_agent.state import OverallState
-from langchain_ollama import OllamaEmbeddings
 
 logger = logging.getLogger(__name__)
 
 
-def _cosine_similarity(a: list[float], b: list[float]) -> float:
-    """Compute cosine similarity between two vectors."""
-    vec_a = np.array(a)
-    vec_b = np.array(b)
-    return float(np.dot(vec_a, vec_b) / (np.linalg.norm(vec_a) * np.linalg.norm(vec_b)))
+def embed_texts(texts: Sequence[str]) -> tuple[np.ndarray, int]:
+    """Embed ``texts`` through the persistent store.
 
+    Returns the (len(texts), dim) matrix and how many texts were sent to
+    Ollama; texts embedded by an earlier call or run are read from the store.
+    """
+    store = EmbeddingStore(settings.embedding_model)
+    sent: list[int] = []
 
-def _cv_to_text(parsed_cv: ParsedCV) -> str:
-    """Build a natural text representation of the CV for embedding."""
-    parts: list[str] = []
-    if parsed_cv.summary:
-        parts.append(parsed_cv.summary)
-    if parsed_cv.skills:
-        parts.append("Skills: " + ", ".join(parsed_cv.skills))
-    for exp in parsed_cv.experience:
-        entry = f"{exp.role} at {exp.company}"
-        if exp.duration:
-            entry += f" ({exp.duration})"
-        if exp.description:
-            entry += f" — {exp.description}"
-        parts.append(entry)
-    return "\n".join(parts)
+    def embed_unseen(unseen: list[str]) -> list[list[float]]:
+        sent.append(len(unseen))
+        started = time.perf_counter()
+        vectors = embeddings().embed_documents(unseen)
+        metrics.count("embedding_seconds", time.perf_counter() - started)
+        return vectors
+
+    matrix = store.embed(texts, embed_unseen)
+    metrics.count("embedding_texts", sum(sent), outcome="embedded")
+    metrics.count("embedding_texts", len(texts) - sum(sent), outcome="reused")
+    return matrix, sum(sent)
+
+
+def _lexical_prefilter(bm25: list[np.ndarray], keep_per_cv: int) -> np.ndarray:
+    """Jobs among the ``keep_per_cv`` best BM25 matches of any CV (all jobs if none match)."""
+    kept: set[int] = set()
+    for scores in bm25:
+        best = top_k(scores, keep_per_cv)
+        kept.update(best[scores[best] > 0].tolist())
+    return np.array(sorted(kept), dtype=np.intp) if kept else np.arange(len(bm25[0]) if bm25 else 0)
 
 
 def embedder(state: OverallState) -> dict:
-    """LangGraph node: embed CV + all jobs, cosine-rank, return top N."""
-    parsed_cv = state["parsed_cv"]
+    """LangGraph node: embed all CVs + all jobs, cosine-rank, return top N per CV.
+
+    With ``settings.lexical_prefilter_n``, jobs no CV matches well by BM25 are
+    dropped before embedding; with ``settings.lexical_fusion``, each CV's top N
+    comes from reciprocal-rank fusion of the cosine and BM25 rankings.
+    """
+    parsed_cvs = state["parsed_cvs"]
     job_descriptions = state["job_descriptions"]
+    prefilter = bool(settings.lexical_prefilter_n) and len(job_descriptions) > settings.lexical_prefilter_n
+
+    bm25: list[np.ndarray] = []
+    if prefilter or settings.lexical_fusion:
+        lexical_index = BM25Index()
+        lexical_index.extend(job_terms(job) for job in job_descriptions)
+        bm25 = [lexical_index.scores(cv_terms(cv)) for cv in parsed_cvs.values()]
+    if prefilter:
+        # No model calls for jobs that share no skills with any CV
+        kept = _lexical_prefilter(bm25, settings.lexical_prefilter_n)
+        logger.info(
+            "BM25 pre-filter — %d of %d job(s) kept, %d skipped before embedding",
+            len(kept), len(job_descriptions), len(job_descriptions) - len(kept),
+        )
+        job_descriptions = [job_descriptions[i] for i in kept]
+        bm25 = [scores[kept] for scores in bm25]
+
+    logger.info("Embedding %d CV(s) and %d job(s) with %s", len(parsed_cvs), len(job_descriptions), settings.embedding_model)
+    # CVs and all job descriptions in one batch; only texts not in the store reach Ollama.
+    # Jobs were usually embedded already by their job_parser task, so this is mostly store reads.
+    vectors, sent = embed_texts(
+        [_cv_to_text(cv) for cv in parsed_cvs.values()] + [job.job_description for job in job_descriptions]
+    )
+    cv_matrix = normalize_rows(vectors[: len(parsed_cvs)])
+    job_matrix = normalize_rows(vectors[len(parsed_cvs):])
+    logger.info(
+        "%d CV(s) and %d job(s) embedded — %d dimensions, %d new text(s) sent to Ollama, %d read from store",
+        len(cv_matrix), len(job_matrix), vectors.shape[1], sent, len(vectors) - sent,
+    )
+
+    # Fusion re-ranks a deeper cosine list, so lexical matches just outside the top N can move in
+    depth = settings.llm_top_n * 4 if settings.lexical_fusion else settings.llm_top_n
+
+    # Jobs are embedded and normalized once; every CV is ranked against the same job matrix
+    cosine_results: dict[str, list[tuple[JobDescription, float]]] = {}
+    if settings.ann_min_jobs and len(job_descriptions) >= settings.ann_min_jobs:
+        logger.info("Using IVF approximate index for %d job(s)", len(job_descriptions))
+        index = IVFIndex(job_matrix, n_probe=settings.ann_probes)
+        ranked = [index.search(cv_vector, depth) for cv_vector in cv_matrix]
+    else:
+        # One CV-matrix x job-matrix product, then top-N per CV without a full sort
+        ranked = []
+        for row in cv_matrix @ job_matrix.T:
+            indices = top_k(row, depth)
+            ranked.append((indices, row[indices]))
+
+    for c, (cv_path, (indices, scores)) in enumerate(zip(parsed_cvs, ranked)):
+        if settings.lexical_fusion:
+            lexical = top_k(bm25[c], depth)
+            fused = reciprocal_rank_fusion([indices, lexical[bm25[c][lexical] > 0]], settings.rrf_k)
+            indices = np.array(sorted(fused, key=fused.__getitem__, reverse=True)[: settings.llm_top_n], dtype=np.intp)
+            scores = job_matrix[indices] @ cv_matrix[c]  # cosine stays the reported score
+        cosine_results[cv_path] = [(job_descriptions[i], float(score)) for i, score in zip(indices, scores)]
 
-    logger.info("Embedding CV and %d job(s) with %s", len(job_descriptions), settings.embedding_model)
-    embed_model = OllamaEmbeddings(model=settings.embedding_model)
-
-    # Embed CV as natural text (one call)
-    cv_text = _cv_to_text(parsed_cv)
-    cv_embedding = embed_model.embed_query(cv_text)
-    logger.info("CV embedded — %d dimensions", len(cv_embedding))
-
-    # Embed all job descriptions in one batch call
-    job_embeddings = embed_model.embed_documents([job.job_description for job in job_descriptions])
-    logger.info("All %d job(s) embedded", len(job_embeddings))
-
-    # Compute cosine similarity for each job
-    scored: list[tuple[JobDescription, float]] = []
-    for job, job_embedding in zip(job_descriptions, job_embeddings):
-        score = _cosine_similarity(cv_embedding, job_embedding)
-        scored.append((job, score))
-
-    # Sort by score descending, return top N
-    scored.sort(key=lambda x: x[1], reverse=True)
-    top_n = scored[: settings.llm_top_n]
-    logger.info("Top %d jobs selected (scores: %s)", len(top_n), ", ".join(f"{s:.3f}" for _, s in top_n))
-    return {"cosine_results": top_n}
\ No newline at end of file
+    # The cascade trims each top N (floor, knee, call budget) before the expensive LLM scorer
+    policy = CascadePolicy.from_settings()
+    selected = policy.select(cosine_results)
+    for cv_path, top_n in selected.items():
+        logger.info("%s — top %d jobs selected (scores: %s)", cv_path, len(top_n), ", ".join(f"{s:.3f}" for _, s in top_n))
+    fixed_calls = sum(map(len, cosine_results.values()))
+    kept_calls = sum(map(len, selected.values()))
+    logger.info(
+        "Cascade policy: %s — %d of %d candidate(s) kept, %d LLM call(s) saved",
+        policy.describe(), kept_calls, fixed_calls, fixed_calls - kept_calls,
+    )
+    return {"cosine_results": selected}
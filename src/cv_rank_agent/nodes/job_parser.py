@@ -1,31 +1,133 @@
-"""Node 2 — Tool-calling node: crawl URLs and extract job descriptions."""
+"""Node 2 — Tool-calling node: crawl URLs and extract job descriptions.
 
+Runs as one task per URL, fanned out from START with LangGraph ``Send`` in
+parallel with cv_parser. All tasks share one crawler pool and one set of LLM
+slots; collect_jobs joins them back into job_descriptions in input order.
+"""
+
+import asyncio
 import logging
+import time
+from collections import Counter
 
-from cv_rank_agent.tools.web_crawl import web_crawl
+from cv_rank_agent import metrics
+from cv_rank_agent.artifacts import ArtifactStore, artifact_key
+from cv_rank_agent.clients import ChatModel, chat_model, llm_slots
+from cv_rank_agent.escalation import aextract, artifact_models, stage_model
+from cv_rank_agent.tools.content_prune import prune_markdown
+from cv_rank_agent.tools.crawl_cache import CrawlCacheMiss
+from cv_rank_agent.tools.structured_data import extract_job_posting
+from cv_rank_agent.tools.tokens import estimate_tokens
+from cv_rank_agent.tools.web_crawl import CrawlerPool, close_shared_pool, shared_pool
 from cv_rank_agent.prompts.job_parser import JOB_PARSER_PROMPT
 from cv_rank_agent.models import JobDescription
 from cv_rank_agent.config import settings
-from cv_rank_agent.state import OverallState
-from langchain_ollama import ChatOllama
+from cv_rank_agent.state import InputState, JobTask, OverallState
+from langgraph.types import Send
 
 logger = logging.getLogger(__name__)
 
 
-async def job_parser(state: OverallState) -> dict:
-    """LangGraph node: crawl all job URLs and extract structured job data."""
-    llm = ChatOllama(model=settings.llm_model, temperature=settings.temperature)
-    llm = llm.with_structured_output(JobDescription)
+async def _parse_job(
+    i: int,
+    total: int,
+    url: str,
+    pool: CrawlerPool,
+    llm: ChatModel,
+    slots: asyncio.Semaphore,
+    store: ArtifactStore,
+) -> tuple[JobDescription | None, str, str | None]:
+    """Crawl one URL and extract its job description.
+
+    Returns the job, the path it took and the model that extracted it. The
+    path is "structured" when a schema.org JobPosting was mapped without the
+    LLM, "cached" when identical content was extracted before, "llm" (the
+    only path with a model: ``settings.job_parser_model``, or
+    ``settings.llm_model`` after an escalation), or "skipped" when running
+    offline and the URL was never cached. Crawling is bounded by the pool;
+    the LLM call waits on its own slots, so extraction of one page overlaps
+    with crawling of the next.
+    """
+    logger.info("[%d/%d] Crawling %s", i, total, url)
+    try:
+        page = await pool.fetch(url)
+    except CrawlCacheMiss:
+        logger.warning("[%d/%d] Not in crawl cache, skipped (offline mode): %s", i, total, url)
+        return None, "skipped", None
 
-    job_descriptions: list[JobDescription] = []
-    for i, url in enumerate(state["job_urls"], start=1):
-        logger.info("[%d/%d] Crawling %s", i, len(state["job_urls"]), url)
-        raw_content = await web_crawl(url)
-        logger.info("[%d/%d] Crawled — %d characters, sending to LLM...", i, len(state["job_urls"]), len(raw_content))
-        result = await llm.ainvoke(JOB_PARSER_PROMPT.format(content=raw_content))
+    result = extract_job_posting(page.html, url)
+    if result is not None:
+        logger.info("[%d/%d] Parsed from JobPosting structured data — %s at %s", i, total, result.title, result.company)
+        return result, "structured", None
+
+    content = prune_markdown(page.markdown, settings.job_content_max_tokens)
+    logger.info(
+        "[%d/%d] Crawled — %d characters (~%d tokens), pruned to %d characters (~%d tokens), sending to LLM...",
+        i, total, len(page.markdown), estimate_tokens(page.markdown), len(content), estimate_tokens(content),
+    )
+    keys = [artifact_key(JOB_PARSER_PROMPT, content, model=model) for model in artifact_models("job_parser")]
+    result = store.get(keys, JobDescription)
+    if result is not None:
         result.source_url = url
-        logger.info("[%d/%d] Parsed — %s at %s", i, len(state["job_urls"]), result.title, result.company)
-        job_descriptions.append(result)
+        logger.info("[%d/%d] Served from artifact cache — %s at %s", i, total, result.title, result.company)
+        return result, "cached", None
+
+    async with slots:
+        result, model = await aextract("job_parser", llm, JOB_PARSER_PROMPT.format(content=content))
+    store.put(artifact_key(JOB_PARSER_PROMPT, content, model=model), result)
+    result.source_url = url
+    logger.info("[%d/%d] Parsed by %s — %s at %s", i, total, model, result.title, result.company)
+    return result, "llm", model
+
+
+def fan_out_jobs(state: InputState) -> list[Send]:
+    """Conditional edge from START: one job_parser task per job URL."""
+    urls = state["job_urls"]
+    return [Send("job_parser", {"url": url, "index": i, "total": len(urls)}) for i, url in enumerate(urls, start=1)]
+
+
+async def job_parser(task: JobTask) -> dict:
+    """LangGraph node: crawl one job URL and extract its structured job data.
+
+    When the run will use the embedder (Option B), the job description is
+    embedded right away, so embedding overlaps with crawling the other jobs.
+    """
+    i, total = task["index"], task["total"]
+    started = time.perf_counter()
+    job, path, model = await _parse_job(
+        i, total, task["url"], shared_pool(), chat_model(JobDescription, stage_model("job_parser")), llm_slots(),
+        ArtifactStore(),
+    )
+    metrics.record_item("job_parser", task["url"], time.perf_counter() - started, path=path, model=model)
+    metrics.count("jobs_parsed", path=path)
+    # Skipped with the BM25 pre-filter, which exists to avoid embedding most jobs
+    if job is not None and total > settings.llm_only_threshold and not settings.lexical_prefilter_n:
+        from cv_rank_agent.nodes.embedder import embed_texts  # NumPy is only loaded for Option B runs
+
+        try:
+            await asyncio.to_thread(embed_texts, [job.job_description])
+        except Exception:
+            # Not fatal — the embedder retries every job in one batch
+            logger.warning("[%d/%d] Embedding failed, deferred to the embedder", i, total, exc_info=True)
+    return {"parsed_jobs": [(i, job, path)]}
+
+
+async def collect_jobs(state: OverallState) -> dict:
+    """LangGraph node: join the per-job tasks (and cv_parser) into job_descriptions, in job_urls order."""
+    pool = shared_pool()
+    await close_shared_pool()  # no more crawls this run; free the browser before scoring
+
+    parsed = sorted(state["parsed_jobs"], key=lambda item: item[0])
+    job_descriptions = [job for _, job, _ in parsed if job is not None]
 
-    logger.info("All %d job(s) parsed", len(job_descriptions))
-    return {"job_descriptions": job_descriptions}
\ No newline at end of file
+    stats = pool.cache.stats
+    logger.info(
+        "Crawl cache — %d hit(s), %d revalidated, %d miss(es): %d browser crawl(s) saved",
+        stats.hits, stats.revalidated, stats.misses, stats.saved_crawls,
+    )
+    paths = Counter(path for _, _, path in parsed)
+    logger.info(
+        "All %d job(s) parsed — %d from structured data (no LLM), %d from artifact cache, %d by LLM",
+        len(job_descriptions), paths["structured"], paths["cached"], paths["llm"],
+    )
+    return {"job_descriptions": job_descriptions}
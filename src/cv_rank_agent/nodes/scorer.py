@@ -1,19 +1,58 @@
-"""Node 4 — LLM deep-scores CV against job descriptions."""
+"""Node 4 — LLM deep-scores CV against job descriptions.
 
+Scoring prompts are assembled from prioritized sections (tools/prompt_budget.py):
+description sentences that repeat a requirement or responsibility are
+dropped, and with a prompt budget (SCORER_PROMPT_MAX_TOKENS, or what
+OLLAMA_NUM_CTX leaves) the CV and the job are trimmed least important part
+first. The CV gets at most half of the budget and is the same for all of
+its jobs, so the prompt prefix stays cacheable.
+"""
+
+import asyncio
 import logging
+import time
+from collections.abc import Awaitable, Callable
+from functools import partial
+from itertools import accumulate
+from typing import Any
 
-from cv_rank_agent.models import JobDescription, ScoreResult
-from cv_rank_agent.nodes.embedder import _cv_to_text
+from cv_rank_agent import metrics
+from cv_rank_agent.artifacts import ArtifactStore, artifact_key
+from cv_rank_agent.cascade import EarlyStop
+from cv_rank_agent.checkpoints import progress_store
+from cv_rank_agent.clients import ChatModel, chat_model, llm_parallelism, llm_slots
+from cv_rank_agent.models import JobDescription, ParsedCV, ScoreBatch, ScoreResult
 from cv_rank_agent.state import OverallState
-from langchain_ollama import ChatOllama
+from langchain_core.runnables import RunnableConfig
+from langgraph.types import StreamWriter
 from cv_rank_agent.config import settings
-from cv_rank_agent.prompts.scorer import SCORER_PROMPT
+from cv_rank_agent.escalation import stage_model
+from cv_rank_agent.prompts.scorer import SCORER_BATCH_JOB, SCORER_BATCH_PROMPT, SCORER_PROMPT
+from cv_rank_agent.tools.prompt_budget import Section, fit_sections, remove_covered, unique_items
+from cv_rank_agent.tools.tokens import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
 
+def _cv_to_text(parsed_cv: ParsedCV) -> str:
+    """Build a natural text representation of the CV for embedding (scoring prompts use _cv_prompt_text)."""
+    parts: list[str] = []
+    if parsed_cv.summary:
+        parts.append(parsed_cv.summary)
+    if parsed_cv.skills:
+        parts.append("Skills: " + ", ".join(parsed_cv.skills))
+    for exp in parsed_cv.experience:
+        entry = f"{exp.role} at {exp.company}"
+        if exp.duration:
+            entry += f" ({exp.duration})"
+        if exp.description:
+            entry += f" — {exp.description}"
+        parts.append(entry)
+    return "\n".join(parts)
+
+
 def _get_job_content_text(job: JobDescription) -> str:
-    """Build a natural text representation of the job description for scoring."""
+    """Build a natural text representation of the job description, every field in full (see _job_prompt_text for prompts)."""
     parts: list[str] = []
     if job.title:
         parts.append(f"Title: {job.title}")
@@ -30,47 +69,337 @@ def _get_job_content_text(job: JobDescription) -> str:
     return "\n".join(parts)
 
 
-def scorer(state: OverallState) -> dict:
-    """LangGraph node: deep-score CV against job descriptions.
+# Generous estimate of one ScoreResult's JSON (scores, gaps, explanation), for the context budget
+SCORE_OUTPUT_TOKENS = 400
+
+
+def _content_budget() -> int | None:
+    """Tokens one SCORER_PROMPT has for the CV and the job; None = no limit.
+
+    SCORER_PROMPT_MAX_TOKENS, else what OLLAMA_NUM_CTX leaves for the prompt
+    after the reply, minus the instructions.
+    """
+    budget = settings.scorer_prompt_max_tokens or (
+        settings.ollama_num_ctx - SCORE_OUTPUT_TOKENS if settings.ollama_num_ctx else 0
+    )
+    return max(budget - estimate_tokens(SCORER_PROMPT), 0) if budget else None
+
+
+def _cv_prompt_text(parsed_cv: ParsedCV) -> str:
+    """The CV for scoring prompts, within half the content budget.
+
+    Experience descriptions are trimmed first (the oldest entry first), then
+    the summary, then whole experience entries; the skills go last.
+    """
+    sections = [
+        Section([parsed_cv.summary] if parsed_cv.summary else [], priority=1),
+        Section(["Skills: " + ", ".join(parsed_cv.skills)] if parsed_cv.skills else [], priority=3),
+    ]
+    for exp in parsed_cv.experience:
+        entry = f"{exp.role} at {exp.company}" + (f" ({exp.duration})" if exp.duration else "")
+        sections.append(Section([entry], priority=2))
+        sections.append(Section([f"  {exp.description}"] if exp.description else [], priority=0))
+    budget = _content_budget()
+    return fit_sections(sections, None if budget is None else budget // 2)
+
+
+def _job_sections(job: JobDescription) -> list[Section]:
+    """The job's prompt sections; the description keeps only what the requirements and responsibilities do not say."""
+    seen: set[str] = set()
+    requirements = unique_items(job.requirements, seen)
+    responsibilities = unique_items(job.responsibilities, seen)
+    description = remove_covered(job.job_description, requirements + responsibilities)
+    header = [
+        f"{label}: {value}"
+        for label, value in (("Title", job.title), ("Company", job.company), ("Location", job.location)) if value
+    ]
+    return [
+        Section(header, priority=3),
+        Section([f"- {item}" for item in requirements], priority=2, heading="Requirements:"),
+        Section([f"- {item}" for item in responsibilities], priority=1, heading="Responsibilities:"),
+        Section(description.splitlines(), priority=0, heading="Description:"),
+    ]
+
+
+def _job_prompt_text(job: JobDescription, cv_content: str) -> str:
+    """The job for scoring prompts, within what the content budget leaves after the CV.
+
+    The description is trimmed first, then the responsibilities; the
+    requirements go last.
+    """
+    budget = _content_budget()
+    return fit_sections(_job_sections(job), None if budget is None else max(budget - estimate_tokens(cv_content), 0))
+
+
+def _prompt_size(cv_content: str, job: JobDescription) -> dict[str, int]:
+    """A job's scoring prompt size (as one SCORER_PROMPT) and the job tokens deduplication and the budget saved.
+
+    Both are also summed on the run (scorer_prompt_tokens, scorer_prompt_tokens_saved).
+    """
+    job_tokens = estimate_tokens(_job_prompt_text(job, cv_content))
+    prompt_tokens = estimate_tokens(SCORER_PROMPT) + estimate_tokens(cv_content) + job_tokens
+    saved = estimate_tokens(_get_job_content_text(job)) - job_tokens
+    metrics.count("scorer_prompt_tokens", prompt_tokens)
+    metrics.count("scorer_prompt_tokens_saved", saved)
+    return {"prompt_tokens": prompt_tokens, "prompt_tokens_saved": saved}
+
+ScoringItem = tuple[JobDescription, float | None]  # a job and its cosine score (None in Option A)
+
+
+async def _score(
+    cv_content: str, job: JobDescription, llm: ChatModel, store: ArtifactStore, slots: asyncio.Semaphore
+) -> ScoreResult:
+    """Score one CV/job pair, reusing a stored result for identical inputs."""
+    job_content = _job_prompt_text(job, cv_content)
+    key = artifact_key(SCORER_PROMPT, cv_content, job_content, model=stage_model("scorer"))
+    score_result = store.get(key, ScoreResult)
+    if score_result is None:
+        async with slots:
+            score_result = await llm.ainvoke(SCORER_PROMPT.format(cv_content=cv_content, job_content=job_content))
+        store.put(key, score_result)
+    return score_result
+
+
+def _match_batch(batch: ScoreBatch, references: list[str]) -> list[ScoreResult]:
+    """The batch's scores in ``references`` order; ValueError unless every job came back exactly once."""
+    by_reference = {score.job_reference.strip(): score for score in batch.scores}
+    if len(batch.scores) != len(references) or set(by_reference) != set(references):
+        returned = [score.job_reference for score in batch.scores]
+        raise ValueError(f"expected scores for {references}, got {returned}")
+    return [by_reference[reference] for reference in references]
+
 
-    If cosine_results exist in state (Option B), score those with cosine scores.
-    Otherwise (Option A), score all job_descriptions directly.
+async def _score_batch(
+    cv_content: str, jobs: list[JobDescription], llm: ChatModel, store: ArtifactStore, slots: asyncio.Semaphore
+) -> list[ScoreResult | None]:
+    """Score several jobs for one CV in one LLM call, reusing stored results for identical inputs.
+
+    Each job's result is stored on its own, so a later batch of other jobs
+    still hits the cache. None marks the jobs to score one at a time instead:
+    a lone uncached job, or every job of a batch whose reply was malformed
+    (a job missing, repeated or unknown) or whose call failed.
+    """
+    contents = [_job_prompt_text(job, cv_content) for job in jobs]
+    keys = [artifact_key(SCORER_BATCH_PROMPT, cv_content, content, model=stage_model("scorer")) for content in contents]
+    results = [store.get(key, ScoreResult) for key in keys]
+    pending = [i for i, score_result in enumerate(results) if score_result is None]
+    if len(pending) < 2:
+        return results
+
+    references = [f"job-{n}" for n in range(1, len(pending) + 1)]
+    jobs_content = "\n".join(
+        SCORER_BATCH_JOB.format(reference=reference, job_content=contents[i]) for reference, i in zip(references, pending)
+    )
+    try:
+        async with slots:
+            batch = await llm.ainvoke(SCORER_BATCH_PROMPT.format(cv_content=cv_content, jobs_content=jobs_content))
+        scores = _match_batch(batch, references)
+    except Exception as exc:  # malformed structured output, Ollama errors, timeouts
+        logger.warning("Batch of %d job(s) not scored — scoring them one at a time: %s", len(pending), exc)
+        metrics.count("scorer_batch_fallbacks")
+        return results
+    for i, score_result in zip(pending, scores):
+        store.put(keys[i], score_result)
+        results[i] = score_result
+    return results
+
+
+def _scored(
+    i: int,
+    total: int,
+    cv_path: str,
+    job: JobDescription,
+    cosine_score: float | None,
+    score_result: ScoreResult,
+    seconds: float,
+    emit: StreamWriter,
+    **fields: Any,
+) -> ScoreResult:
+    """Attach the references to a finished score, record it and emit it on the graph's custom stream."""
+    metrics.record_item("scorer", job.source_url, seconds, cv=cv_path, **fields)
+    score_result.cosine_similarity_score = cosine_score
+    score_result.job_reference = job.source_url
+    score_result.candidate_reference = cv_path
+    logger.info("[%d/%d] Scored — overall fit: %.0f%%", i, total, score_result.overall_fit_score * 100)
+    emit({"score_result": score_result})
+    return score_result
+
+
+async def _score_job(
+    i: int,
+    total: int,
+    cv_path: str,
+    cv_content: str,
+    job: JobDescription,
+    cosine_score: float | None,
+    llm: ChatModel,
+    store: ArtifactStore,
+    slots: asyncio.Semaphore,
+    emit: StreamWriter,
+) -> ScoreResult | None:
+    """Score one job for one CV; a failed call is logged and yields None instead of aborting the run.
+
+    A successful result is emitted on the graph's custom stream as soon as it is ready.
     """
-    parsed_cv = state["parsed_cv"]
-    results: list[ScoreResult] = []
-
-    llm = ChatOllama(model=settings.llm_model, temperature=settings.temperature)
-    llm = llm.with_structured_output(ScoreResult)
-
-    if "cosine_results" in state:
-        jobs_to_score = state["cosine_results"]
-        logger.info("Scoring %d job(s) (Option B — with cosine pre-filter)", len(jobs_to_score))
-        # Option B: score the top-N jobs that came from the embedder
-        for i, (job, cosine_score) in enumerate(jobs_to_score, start=1):
-            logger.info("[%d/%d] Scoring %s...", i, len(jobs_to_score), job.source_url)
-            prompt = SCORER_PROMPT.format(
-                cv_content=_cv_to_text(parsed_cv),
-                job_content=_get_job_content_text(job),
-            )
-            score_result = llm.invoke(prompt)
-            score_result.cosine_similarity_score = cosine_score
-            score_result.job_reference = job.source_url
-            logger.info("[%d/%d] Scored — overall fit: %.0f%%", i, len(jobs_to_score), score_result.overall_fit_score * 100)
-            results.append(score_result)
-    else:
-        jobs_to_score = state["job_descriptions"]
-        logger.info("Scoring %d job(s) (Option A — LLM only)", len(jobs_to_score))
-        # Option A: score all jobs directly (no cosine pre-filter)
-        for i, job in enumerate(jobs_to_score, start=1):
-            logger.info("[%d/%d] Scoring %s...", i, len(jobs_to_score), job.source_url)
-            prompt = SCORER_PROMPT.format(
-                cv_content=_cv_to_text(parsed_cv),
-                job_content=_get_job_content_text(job),
-            )
-            score_result = llm.invoke(prompt)
-            score_result.job_reference = job.source_url
-            logger.info("[%d/%d] Scored — overall fit: %.0f%%", i, len(jobs_to_score), score_result.overall_fit_score * 100)
-            results.append(score_result)
-
-    logger.info("All %d job(s) scored", len(results))
-    return {"score_results": results}
\ No newline at end of file
+    logger.info("[%d/%d] Scoring %s...", i, total, job.source_url)
+    started = time.perf_counter()
+    try:
+        score_result = await _score(cv_content, job, llm, store, slots)
+    except Exception as exc:  # malformed structured output, Ollama errors, timeouts
+        logger.warning("[%d/%d] Scoring failed for %s — skipped: %s", i, total, job.source_url, exc)
+        metrics.record_item("scorer", job.source_url, time.perf_counter() - started, cv=cv_path, failed=True)
+        return None
+    return _scored(
+        i, total, cv_path, job, cosine_score, score_result, time.perf_counter() - started, emit,
+        **_prompt_size(cv_content, job),
+    )
+
+
+async def _score_jobs(
+    start: int,
+    group: list[ScoringItem],
+    total: int,
+    cv_path: str,
+    cv_content: str,
+    llm: ChatModel,
+    batch_llm: ChatModel,
+    store: ArtifactStore,
+    slots: asyncio.Semaphore,
+    emit: StreamWriter,
+) -> list[ScoreResult | None]:
+    """Score one group of a CV's jobs (see _group): in one batched call, or one call per job.
+
+    ``start`` is the 1-based position of the group's first job. Jobs the
+    batch did not score fall back to one call each, with per-job failure
+    isolation as in _score_job.
+    """
+    score_job = partial(
+        _score_job, total=total, cv_path=cv_path, cv_content=cv_content, llm=llm, store=store, slots=slots, emit=emit,
+    )
+    if len(group) == 1:
+        job, cosine = group[0]
+        return [await score_job(i=start, job=job, cosine_score=cosine)]
+
+    logger.info("[%d-%d/%d] Scoring %d jobs in one call...", start, start + len(group) - 1, total, len(group))
+    started = time.perf_counter()
+    batch = await _score_batch(cv_content, [job for job, _ in group], batch_llm, store, slots)
+    seconds = time.perf_counter() - started
+    results: list[ScoreResult | None] = [
+        None if score_result is None
+        else _scored(
+            start + k, total, cv_path, job, cosine, score_result, seconds, emit,
+            batch=len(group), **_prompt_size(cv_content, job),
+        )
+        for k, ((job, cosine), score_result) in enumerate(zip(group, batch))
+    ]
+    retry = [k for k, score_result in enumerate(batch) if score_result is None]
+    retried = await asyncio.gather(
+        *(score_job(i=start + k, job=group[k][0], cosine_score=group[k][1]) for k in retry)
+    )
+    for k, score_result in zip(retry, retried):
+        results[k] = score_result
+    return results
+
+
+def _group(jobs_to_score: list[ScoringItem], cv_content: str) -> list[list[ScoringItem]]:
+    """Split one CV's jobs into LLM calls of up to ``settings.scorer_batch_size`` jobs each, in order.
+
+    With ``settings.ollama_num_ctx`` set, a batch also closes before its prompt
+    and expected replies would overflow the context window: Ollama would
+    drop the start of the prompt, i.e. the instructions and the CV.
+    """
+    size = max(settings.scorer_batch_size, 1)
+    budget = (settings.ollama_num_ctx or 0) - estimate_tokens(SCORER_BATCH_PROMPT) - estimate_tokens(cv_content)
+    groups: list[list[ScoringItem]] = []
+    used = 0
+    for item in jobs_to_score:
+        cost = estimate_tokens(_job_prompt_text(item[0], cv_content)) + SCORE_OUTPUT_TOKENS if size > 1 else 0
+        if not groups or len(groups[-1]) == size or (settings.ollama_num_ctx and used + cost > budget):
+            groups.append([])
+            used = 0
+        groups[-1].append(item)
+        used += cost
+    return groups
+
+
+async def _score_cv(
+    groups: list[list[ScoringItem]],
+    score_jobs: Callable[..., Awaitable[list[ScoreResult | None]]],
+    early_stop: EarlyStop,
+) -> tuple[list[ScoreResult | None], int]:
+    """Score one CV's jobs, grouped into LLM calls; returns the results in input order and the number of jobs left unscored.
+
+    Without early stopping every call is queued at once. With it, calls are
+    made in cosine order, ``llm_parallelism()`` at a time, until the rest can
+    no longer enter the CV's top N.
+    """
+    window = llm_parallelism() if early_stop.n else max(len(groups), 1)
+    results: list[ScoreResult | None] = []
+    for first in range(0, len(groups), window):
+        calls = groups[first:first + window]
+        if not early_stop.can_improve(calls[0][0][1]):
+            return results, sum(map(len, groups[first:]))
+        starts = accumulate((len(group) for group in calls[:-1]), initial=len(results) + 1)
+        scored = await asyncio.gather(*(score_jobs(start=start, group=group) for start, group in zip(starts, calls)))
+        for group, group_results in zip(calls, scored):
+            for (_, cosine), score_result in zip(group, group_results):
+                if score_result is not None and cosine is not None:
+                    early_stop.record(cosine, score_result.overall_fit_score)
+            results.extend(group_results)
+    return results, 0
+
+
+async def scorer(
+    state: OverallState, writer: StreamWriter = lambda chunk: None, config: RunnableConfig | None = None
+) -> dict:
+    """LangGraph node: deep-score every CV against its job descriptions.
+
+    If cosine_results exist in state (Option B), score each CV's top-N jobs with cosine scores.
+    Otherwise (Option A), score all job_descriptions directly for every CV.
+    Up to ``llm_parallelism()`` LLM calls run at once (``settings.llm_concurrency`` per Ollama endpoint); results keep input order.
+    With ``settings.scorer_batch_size`` > 1, each call scores several of a CV's jobs
+    (SCORER_BATCH_PROMPT), so the CV is evaluated once per batch instead of once per job.
+    Each result is also written to ``writer`` (LangGraph's ``custom`` stream mode) as it completes.
+    With ``settings.llm_early_stop_n`` set, Option B stops scoring a CV once its remaining
+    jobs can no longer enter its top N (see cascade.EarlyStop).
+    Each score is stored as soon as it completes (see checkpoints.progress_store),
+    so a resumed run only scores the jobs it had not reached.
+    """
+    store = progress_store(config)
+    slots = llm_slots()
+    llm = chat_model(ScoreResult, stage_model("scorer"))
+    batch_llm = chat_model(ScoreBatch, stage_model("scorer"))
+
+    early_stop_n = settings.llm_early_stop_n if "cosine_results" in state else 0
+    tasks = []
+    for cv_path, parsed_cv in state["parsed_cvs"].items():
+        cv_content = _cv_prompt_text(parsed_cv)
+        if "cosine_results" in state:
+            # Option B: score the top-N jobs that came from the embedder
+            jobs_to_score = state["cosine_results"][cv_path]
+            logger.info("Scoring %d job(s) for %s (Option B — with cosine pre-filter)", len(jobs_to_score), cv_path)
+        else:
+            # Option A: score all jobs directly (no cosine pre-filter)
+            jobs_to_score = [(job, None) for job in state["job_descriptions"]]
+            logger.info("Scoring %d job(s) for %s (Option A — LLM only)", len(jobs_to_score), cv_path)
+
+        score_jobs = partial(
+            _score_jobs, total=len(jobs_to_score), cv_path=cv_path, cv_content=cv_content,
+            llm=llm, batch_llm=batch_llm, store=store, slots=slots, emit=writer,
+        )
+        tasks.append(_score_cv(_group(jobs_to_score, cv_content), score_jobs, EarlyStop(early_stop_n)))
+
+    # gather() keeps results in the order the jobs were queued, whatever order they finish in
+    per_cv = await asyncio.gather(*tasks)
+    scored = [score_result for cv_results, _ in per_cv for score_result in cv_results]
+    results = [score_result for score_result in scored if score_result is not None]
+    failed = len(scored) - len(results)
+    stopped = sum(unscored for _, unscored in per_cv)
+    if early_stop_n:
+        logger.info("Early stop (top %d per CV) — %d LLM call(s) saved", early_stop_n, stopped)
+
+    logger.info(
+        "All %d job(s) scored — %d from artifact cache, %d by LLM, %d failed",
+        len(results), store.stats.hits, len(results) - store.stats.hits, failed,
+    )
+    return {"score_results": results}
@@ -22,4 +22,33 @@ Guidelines:
 
 Content:
 {content}
-"""
\ No newline at end of file
+"""
+
+# Only the fields the layout parser (tools/cv_layout.py) could not resolve, from the sections they are in
+CV_SECTIONS_PROMPT = """\
+Role: You are a CV parsing specialist.
+
+Task: Extract the following fields from the CV sections below. The other fields of the CV are already known.
+
+Fields to extract:
+{fields}
+
+Guidelines:
+- Focus on the main content of the CV; ignore formatting, headers/footers, and decorative elements
+- If a field cannot be found, omit it
+
+CV sections:
+{content}
+"""
+
+# Field descriptions for CV_SECTIONS_PROMPT's {fields}
+CV_FIELDS = {
+    "name": "Full name of the candidate",
+    "location": "Location of the candidate",
+    "summary": "Professional summary or objective statement",
+    "skills": "Key skills and competencies (as a list)",
+    "experience": "Work experience entries, each with: company, role, duration, description",
+    "education": "Education entries, each with: institution, degree, year",
+    "certifications": "Professional certifications (as a list)",
+    "languages": 'Languages spoken, each with: language, proficiency (e.g. "native", "fluent", "B2")',
+}
@@ -28,4 +28,46 @@ Candidate CV:
 
 Job Description:
 {job_content}
-"""
\ No newline at end of file
+"""
+
+# Several jobs per call. The instructions and the CV come first and are identical
+# for every batch of a CV, so Ollama can reuse their evaluated tokens (prompt cache)
+# and only evaluates the jobs.
+SCORER_BATCH_PROMPT = """\
+Role: You are an expert recruiter and talent-match analyst.
+
+Task: Evaluate how well the candidate's CV matches each of the job descriptions listed after the CV. Assess every job on its own, independently of the others.
+
+For each job, provide the following scores (each between 0.0 and 1.0):
+- overall_fit_score: How well the candidate fits the role overall
+- skill_match_score: How well the candidate's skills align with the job requirements
+- experience_match_score: How relevant the candidate's work experience is to the role
+
+Also provide for each job:
+- job_reference: The job's reference exactly as given in its heading (e.g. "job-1")
+- identified_gaps: A list of specific areas where the CV falls short of the job requirements (skills missing, experience lacking, qualifications not met). Return an empty list if there are no gaps.
+- llm_explanation: A concise paragraph explaining your reasoning behind the scores, highlighting key strengths and weaknesses of the candidate for this role.
+
+Return one entry in "scores" per job, in the order the jobs are listed.
+
+Scoring guidelines:
+- 0.0 = No match at all
+- 0.3 = Poor match, major gaps
+- 0.5 = Partial match, some relevant skills or experience
+- 0.7 = Good match, most requirements met
+- 0.9 = Excellent match, nearly all requirements met
+- 1.0 = Perfect match
+
+Be objective and base your assessment strictly on the information provided. Do not assume skills or experience not mentioned in the CV.
+
+Candidate CV:
+{cv_content}
+
+{jobs_content}
+"""
+
+# One job in SCORER_BATCH_PROMPT's {jobs_content}
+SCORER_BATCH_JOB = """\
+Job Description (reference: {reference}):
+{job_content}
+"""
@@ -0,0 +1,34 @@
+"""Shared per-event-loop resources for nodes that fan out with LangGraph Send.
+
+Each Send runs the node separately, but a run's crawler and concurrency
+limits must be shared by all of them. asyncio primitives are bound to
+one event loop, so the shared instance is kept per running loop.
+"""
+import asyncio
+import weakref
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class LoopLocal(Generic[T]):
+    """Lazily create one ``factory()`` instance per running event loop."""
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self._factory = factory
+        self._instances: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, T] = weakref.WeakKeyDictionary()
+
+    def get(self) -> T:
+        loop = asyncio.get_running_loop()
+        if loop not in self._instances:
+            self._instances[loop] = self._factory()
+        return self._instances[loop]
+
+    def peek(self) -> T | None:
+        """This loop's instance, without creating one."""
+        return self._instances.get(asyncio.get_running_loop())
+
+    def pop(self) -> T | None:
+        """Detach and return this loop's instance, if one was created."""
+        return self._instances.pop(asyncio.get_running_loop(), None)
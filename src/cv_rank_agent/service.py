@@ -0,0 +1,206 @@
+"""Long-running ranking service: one compiled graph, warm models, a warm browser and shared clients.
+
+Entry point: uv run python -m cv_rank_agent.service [--host 127.0.0.1] [--port 8765]
+
+The CLI pays for imports, graph compilation, browser start-up and possibly
+an Ollama model load on every invocation. The service pays them once: the
+graph is compiled at start-up, the LLM and embedding model are loaded and
+pinned with ``keep_alive``, the crawler pool keeps its browser open, and the
+Ollama clients and LLM slots (see clients.py) are shared by every run.
+
+Endpoints:
+
+- ``POST /rank`` — body ``{"cv_paths": [...], "job_urls": [...], "stream": false}``.
+  CV paths are read on the service host. Returns ``{"run_id", "score_results",
+  "metrics"}``; with ``"stream": true`` the response is NDJSON with the same
+  events as the CLI's ``--stream ndjson``, followed by a final ``done`` event.
+- ``GET /health`` — running and queued runs, and the state of each Ollama endpoint.
+
+At most ``settings.service_max_running`` runs execute at once and
+``settings.service_max_queued`` wait for a slot; further requests are rejected
+with 503 and a Retry-After header instead of piling up behind the LLM.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from contextlib import aclosing, asynccontextmanager
+from typing import Any
+
+from aiohttp import web
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.state import CompiledStateGraph
+
+from cv_rank_agent import metrics
+from cv_rank_agent.clients import endpoint_pool, warm_models
+from cv_rank_agent.config import settings
+from cv_rank_agent.graph import build_graph
+from cv_rank_agent.streaming import stream_events
+from cv_rank_agent.tools.web_crawl import close_shared_pool, shared_pool
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceBusy(Exception):
+    """Raised when a run is submitted while every slot and queue place is taken."""
+
+
+class RunQueue:
+    """Admission control: ``max_running`` runs at once, at most ``max_queued`` waiting."""
+
+    def __init__(self, max_running: int, max_queued: int) -> None:
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.running = 0
+        self.queued = 0
+        self._slots = asyncio.Semaphore(max_running)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a run slot; raises ServiceBusy right away when the queue is full."""
+        if self._slots.locked() and self.queued >= self.max_queued:
+            raise ServiceBusy(f"{self.running} run(s) in progress and {self.queued} queued")
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+
+def _validate(body: Any) -> dict[str, list[str]]:
+    """Graph inputs from a /rank request body; raises ValueError with a message for the client."""
+    if not isinstance(body, dict):
+        raise ValueError("Body must be a JSON object")
+    inputs = {}
+    for key in ("cv_paths", "job_urls"):
+        value = body.get(key)
+        if not isinstance(value, list) or not value or not all(isinstance(item, str) for item in value):
+            raise ValueError(f'"{key}" must be a non-empty list of strings')
+        inputs[key] = value
+    if len(inputs["job_urls"]) > settings.max_jobs:
+        raise ValueError(f"Maximum {settings.max_jobs} job URLs allowed (MAX_JOBS)")
+    return inputs
+
+
+def _summary(run: metrics.RunMetrics) -> dict[str, Any]:
+    """The run report without its per-item list, to keep responses small."""
+    report = run.report()
+    report.pop("items")
+    if settings.metrics_dir is not None:
+        run.write_report(settings.metrics_dir / f"run-{run.run_id}.json")
+    return report
+
+
+class RankingService:
+    """Holds the compiled graph and the run queue; serves /rank and /health."""
+
+    def __init__(self, graph: CompiledStateGraph | None = None, queue: RunQueue | None = None) -> None:
+        self.graph = graph or build_graph()
+        self.queue = queue or RunQueue(settings.service_max_running, settings.service_max_queued)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([web.post("/rank", self.rank), web.get("/health", self.health)])
+        app.on_startup.append(self._start)
+        app.on_cleanup.append(self._stop)
+        return app
+
+    async def _start(self, app: web.Application) -> None:
+        await warm_models()
+        pool = shared_pool()
+        pool.persistent = True  # kept open across runs; closed on shutdown
+        await pool.start()
+        logger.info("Service ready — browser started, up to %d run(s) at once", self.queue.max_running)
+
+    async def _stop(self, app: web.Application) -> None:
+        await close_shared_pool(force=True)
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "ok",
+            "running": self.queue.running,
+            "queued": self.queue.queued,
+            "max_running": self.queue.max_running,
+            "max_queued": self.queue.max_queued,
+            "ollama": endpoint_pool().status(),
+        })
+
+    async def rank(self, request: web.Request) -> web.StreamResponse:
+        try:
+            body = await request.json()
+            inputs = _validate(body)
+        except (json.JSONDecodeError, ValueError) as exc:
+            return web.json_response({"error": str(exc)}, status=400)
+
+        try:
+            async with self.queue.slot():
+                with metrics.recording() as run:
+                    config: RunnableConfig = {"callbacks": [metrics.MetricsCallback(run)]}
+                    logger.info("Run %s — %d CV path(s), %d job URL(s)", run.run_id, len(inputs["cv_paths"]), len(inputs["job_urls"]))
+                    if body.get("stream"):
+                        return await self._stream(request, inputs, config, run)
+                    output = await self.graph.ainvoke(inputs, config)
+                scores = [score.model_dump(mode="json") for score in output["score_results"]]
+                return web.json_response({"run_id": run.run_id, "score_results": scores, "metrics": _summary(run)})
+        except ServiceBusy as exc:
+            return web.json_response({"error": f"Service busy: {exc}"}, status=503, headers={"Retry-After": "5"})
+        except Exception as exc:
+            logger.exception("Run failed")
+            return web.json_response({"error": str(exc)}, status=500)
+
+    async def _stream(
+        self, request: web.Request, inputs: dict, config: RunnableConfig, run: metrics.RunMetrics
+    ) -> web.StreamResponse:
+        """Write the run's events as NDJSON while it executes."""
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        try:
+            # Closing the event stream on the way out stops the graph run
+            async with aclosing(stream_events(self.graph, inputs, config)) as events:
+                async for event in events:
+                    await response.write((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+            done = {"event": "done", "run_id": run.run_id}
+        except ConnectionResetError:  # aiohttp's ClientConnectionResetError included: nobody is reading any more
+            logger.warning("Run %s stopped — the client disconnected", run.run_id)
+            return response
+        except Exception as exc:  # headers are sent already; report the failure in-stream
+            logger.exception("Run %s failed", run.run_id)
+            done = {"event": "error", "run_id": run.run_id, "error": str(exc)}
+        run.finish()
+        await response.write((json.dumps({**done, "metrics": _summary(run)}) + "\n").encode("utf-8"))
+        await response.write_eof()
+        return response
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="cv_rank_agent.service",
+        description="Serve CV ranking over HTTP with warm models, a warm browser and one compiled graph.",
+    )
+    parser.add_argument("--host", default=settings.service_host)
+    parser.add_argument("--port", type=int, default=settings.service_port)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    args = parse_args(argv)
+    if settings.ollama_keep_alive is None:
+        settings.ollama_keep_alive = -1  # keep the models loaded for as long as the service runs
+    web.run_app(RankingService().app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Vectorized cosine similarity with top-k selection and an optional IVF index.
+
+Vectors are normalized once into float32 matrices, so ranking a CV against
+every job is a single matrix-vector product followed by ``argpartition``.
+For very large corpora that are queried repeatedly, IVFIndex trades a
+one-off k-means build for probing only a few clusters per query.
+"""
+import numpy as np
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Return a float32 copy of ``matrix`` with unit-length rows (zero rows stay zero)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first, without a full sort."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    candidates = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def cosine_top_k(query: np.ndarray, matrix: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Exact top-k by cosine similarity of a normalized query against normalized rows."""
+    scores = matrix @ query
+    indices = top_k(scores, k)
+    return indices, scores[indices]
+
+
+class IVFIndex:
+    """Inverted-file approximate nearest-neighbour index over normalized vectors.
+
+    Rows are clustered with spherical k-means; a query scores only the rows
+    of its ``n_probe`` closest clusters.
+    """
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        n_lists: int | None = None,
+        n_probe: int = 8,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> None:
+        self.matrix = matrix
+        self.n_lists = n_lists or max(1, int(np.sqrt(len(matrix))))
+        self.n_probe = min(n_probe, self.n_lists)
+        rng = np.random.default_rng(seed)
+
+        # Train centroids on a sample — enough points per list for stable clusters
+        sample_size = min(len(matrix), self.n_lists * 40)
+        sample = matrix[rng.choice(len(matrix), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, self.n_lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = normalize_rows(sums)
+        self.centroids = centroids
+
+        # Assign every row in chunks to bound the temporary score matrix
+        assignment = np.concatenate([
+            np.argmax(matrix[start:start + 8192] @ centroids.T, axis=1)
+            for start in range(0, len(matrix), 8192)
+        ])
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(self.n_lists + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(self.n_lists)]
+
+    def search(self, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k rows for a normalized query, best first."""
+        probes = top_k(self.centroids @ query, self.n_probe)
+        candidates = np.concatenate([self.lists[p] for p in probes])
+        indices, scores = cosine_top_k(query, self.matrix[candidates], k)
+        return candidates[indices], scores
@@ -1,17 +1,25 @@
 """TypedDict / Pydantic state schema shared across graph nodes."""
 from __future__ import annotations
 
-from typing import NotRequired, TypedDict
+import operator
+from typing import Annotated, NotRequired, TypedDict
 
 from cv_rank_agent.models import JobDescription, ParsedCV, ScoreResult
 
 
 class InputState(TypedDict):
     """Inputs to the graph, set before execution."""
-    cv_path: str
+    cv_paths: list[str]          # CV files, directories and/or archives of CVs (batch mode)
     job_urls: list[str]
 
 
+class JobTask(TypedDict):
+    """Input of one per-job job_parser task, sent by fan_out_jobs()."""
+    url: str
+    index: int                   # 1-based position in job_urls
+    total: int
+
+
 class OverallState(TypedDict):
     """Superset of all data flowing through the graph.
 
@@ -19,12 +27,13 @@ class OverallState(TypedDict):
     input fields, intermediate data populated by nodes, and output fields.
     """
     # Inputs
-    cv_path: str
+    cv_paths: list[str]
     job_urls: list[str]
     # Intermediate (populated by nodes)
-    parsed_cv: ParsedCV
+    parsed_cvs: dict[str, ParsedCV]  # CV file path → parsed CV, in input order
+    parsed_jobs: Annotated[list[tuple[int, JobDescription | None, str]], operator.add]  # (index, job, path) per task
     job_descriptions: list[JobDescription]
-    cosine_results: NotRequired[list[tuple[JobDescription, float]]]  # only in Option B
+    cosine_results: NotRequired[dict[str, list[tuple[JobDescription, float]]]]  # per CV path, only in Option B
     # Output
     score_results: list[ScoreResult]
 
@@ -0,0 +1,68 @@
+"""Streamed results of a ranking run, shared by the CLI (``--stream``) and the service (``"stream": true``).
+
+result_updates() turns the graph's ``astream`` chunks into the two kinds of
+interim result: the embedder's cosine ranking of each candidate, then each
+score as the scorer completes it. to_events() shapes those as the NDJSON
+events both entry points write, so the CLI and the service stay in step.
+"""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Any, Literal
+
+if TYPE_CHECKING:
+    from cv_rank_agent.models import JobDescription, ScoreResult
+    from langchain_core.runnables import RunnableConfig
+    from langgraph.graph.state import CompiledStateGraph
+
+CosineResults = dict[str, list[tuple["JobDescription", float]]]
+Update = tuple[Literal["cosine_results"], CosineResults] | tuple[Literal["score"], "ScoreResult"]
+
+
+async def result_updates(
+    graph: CompiledStateGraph, inputs: dict | None, config: RunnableConfig | None = None, **astream: Any
+) -> AsyncIterator[Update]:
+    """Run the graph, yielding ("cosine_results", {candidate: [(job, cosine)]}) and ("score", ScoreResult).
+
+    Closing the iterator (``contextlib.aclosing``) stops the run.
+    """
+    chunks = graph.astream(inputs, config=config, stream_mode=["updates", "custom"], **astream)
+    async with aclosing(chunks):
+        async for mode, chunk in chunks:
+            if mode == "updates" and "embedder" in chunk:
+                yield "cosine_results", chunk["embedder"]["cosine_results"]
+            elif mode == "custom" and "score_result" in chunk:
+                yield "score", chunk["score_result"]
+
+
+def score_event(score: ScoreResult) -> dict:
+    return {"event": "score", **score.model_dump(mode="json")}
+
+
+def to_events(update: Update) -> list[dict]:
+    """The NDJSON events of one update: a ``cosine_ranking`` per candidate, or one ``score``."""
+    kind, value = update
+    if kind == "score":
+        return [score_event(value)]
+    return [
+        {
+            "event": "cosine_ranking",
+            "candidate_reference": candidate,
+            "jobs": [
+                {"job_reference": job.source_url, "title": job.title, "cosine_similarity_score": cosine}
+                for job, cosine in ranked
+            ],
+        }
+        for candidate, ranked in value.items()
+    ]
+
+
+async def stream_events(
+    graph: CompiledStateGraph, inputs: dict | None, config: RunnableConfig | None = None, **astream: Any
+) -> AsyncIterator[dict]:
+    """Run the graph, yielding its NDJSON events as they happen; closing the iterator stops the run."""
+    async with aclosing(result_updates(graph, inputs, config, **astream)) as updates:
+        async for update in updates:
+            for event in to_events(update):
+                yield event
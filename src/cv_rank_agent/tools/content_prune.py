@@ -0,0 +1,88 @@
+"""Deterministic boilerplate pruning of crawled job-page markdown.
+
+Runs between the crawl and JOB_PARSER_PROMPT so the LLM only pays
+prompt-eval time for the job listing itself, not for navigation, cookie
+banners, sign-in prompts or "Similar jobs" link lists.
+"""
+import re
+
+from cv_rank_agent.tools.tokens import truncate_to_tokens
+
+_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LIST_MARKER = re.compile(r"^\s*(?:[*+-]|\d+[.)])\s+")
+
+# Headings after which a job page only lists other content
+_STOP_SECTIONS = re.compile(
+    r"^(?:#+\s*)?(?:\*\*)?\s*(?:similar jobs|similar searches|people also viewed|related jobs|more jobs"
+    r"|recommended jobs|explore (?:collaborative articles|more)|other jobs|you may also like"
+    r"|looking for talent\??|more searches)\b",
+    re.I,
+)
+# Lines that are nothing but a UI label (a button, a menu entry), list item or not
+_UI_LABEL = re.compile(
+    r"skip to (?:main )?content|(?:sign in|log in|join now)(?: to (?:see|save|apply|view|continue)\b.*)?"
+    r"|create (?:a )?job alert|get the app|report this job|save this job|show more|show less"
+    r"|(?:(?:accept|reject)(?: all)?\s*)+|privacy policy|user agreement|terms of (?:use|service)|copyright policy",
+    re.I,
+)
+# Cookie banners and footers; matched on lines that are not list items, so requirements are never dropped
+_BANNER = re.compile(r"(?:we|this site) uses? cookies\b.*|.*\bcookies? policy\b.*|.*©.*", re.I)
+
+
+def _visible(line: str) -> str:
+    """The line as a reader sees it — images removed, links reduced to their text."""
+    return _LINK.sub(r"\1", _IMAGE.sub("", line)).strip()
+
+
+def _is_link_line(line: str) -> bool:
+    """True for lines that are mostly link text, e.g. nav menus and job-card lists."""
+    links = "".join(m.group(1) for m in _LINK.finditer(line))
+    text = _LIST_MARKER.sub("", _visible(line))
+    return bool(links) and len(links.strip()) >= 0.6 * len(text)
+
+
+def _is_boilerplate(line: str, text: str) -> bool:
+    """True for a short line that as a whole is a UI label, a cookie banner or a footer."""
+    if len(text) >= 200:
+        return False
+    if _LIST_MARKER.match(line):
+        return bool(_UI_LABEL.fullmatch(_LIST_MARKER.sub("", text)))
+    return bool(_UI_LABEL.fullmatch(text) or _BANNER.fullmatch(text))
+
+
+def _main_content(lines: list[str]) -> list[str]:
+    """Start at the first H1 (the job title) and stop at the first "more jobs" section."""
+    start = next((i for i, line in enumerate(lines) if line.startswith("# ")), 0)
+    if start > 0.6 * len(lines):
+        start = 0  # an H1 this late is not the job title
+    end = next(
+        (i for i, line in enumerate(lines[start + 1:], start=start + 1) if _STOP_SECTIONS.match(line.strip())),
+        len(lines),
+    )
+    return lines[start:end]
+
+
+def prune_markdown(markdown: str, max_tokens: int) -> str:
+    """Reduce crawled markdown to the job listing and fit it in ``max_tokens``.
+
+    Keeps the main content region, drops link lists, UI boilerplate and
+    repeated lines, inlines link text (URLs are pure token cost) and finally
+    truncates to the token budget.
+    """
+    kept: list[str] = []
+    seen: set[str] = set()
+    for line in _main_content(markdown.splitlines()):
+        text = _visible(line)
+        if _is_link_line(line) or _is_boilerplate(line, text):
+            continue
+        if not text:
+            if kept and kept[-1]:
+                kept.append("")
+            continue
+        key = " ".join(text.lower().split())
+        if key in seen:
+            continue
+        seen.add(key)
+        kept.append(_LINK.sub(r"\1", _IMAGE.sub("", line)).rstrip())  # keeps list markers / headings
+    return truncate_to_tokens("\n".join(kept).strip(), max_tokens)
@@ -0,0 +1,97 @@
+"""Persistent on-disk crawl cache keyed by normalized URL.
+
+Pages are stored in a SQLite database in WAL mode, so several runs on the
+same machine can read and write the cache at the same time.
+"""
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from pydantic import BaseModel
+
+from cv_rank_agent.config import settings
+from cv_rank_agent.db import connect
+
+# Query parameters that only track the visitor and never change the page
+_TRACKING_PARAMS = {"refid", "trackingid", "trk", "fbclid", "gclid", "position", "pagenum"}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class CrawledPage(BaseModel):
+    """A crawled page plus the HTTP validators needed to revalidate it."""
+    url: str
+    markdown: str
+    html: str = ""                       # raw HTML, kept for structured-data extraction
+    etag: str | None = None              # from the ETag response header
+    last_modified: str | None = None     # from the Last-Modified response header
+
+
+class CrawlCacheMiss(LookupError):
+    """Raised in offline mode when a URL has never been cached."""
+
+
+@dataclass
+class CrawlCacheStats:
+    """Counters for one run — how many browser crawls the cache saved."""
+    hits: int = 0          # served from cache, no network I/O at all
+    revalidated: int = 0   # stale, but a conditional request confirmed it unchanged
+    misses: int = 0        # needed a full browser crawl
+
+    @property
+    def saved_crawls(self) -> int:
+        return self.hits + self.revalidated
+
+
+def normalize_url(url: str) -> str:
+    """Canonical cache key — lower-cased host; default port, fragment, trailing slash and tracking params dropped."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith("utm_")
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+class CrawlCache:
+    """SQLite-backed store of CrawledPage records with a freshness TTL."""
+
+    def __init__(self, path: Path | None = None, ttl_hours: float | None = None) -> None:
+        self.path = path or settings.cache_dir / "crawl.sqlite3"
+        self.ttl_seconds = (settings.crawl_cache_ttl_hours if ttl_hours is None else ttl_hours) * 3600
+        self.stats = CrawlCacheStats()
+        with connect(self.path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " url TEXT PRIMARY KEY, fetched_at REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+
+    def get(self, url: str) -> tuple[CrawledPage, bool] | None:
+        """Return ``(page, is_fresh)`` for a cached URL, or None if never cached."""
+        with connect(self.path) as conn:
+            row = conn.execute(
+                "SELECT fetched_at, payload FROM pages WHERE url = ?", (normalize_url(url),)
+            ).fetchone()
+        if row is None:
+            return None
+        fetched_at, payload = row
+        return CrawledPage.model_validate_json(payload), time.time() - fetched_at < self.ttl_seconds
+
+    def put(self, page: CrawledPage) -> None:
+        """Store (or replace) a freshly crawled page."""
+        with connect(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (url, fetched_at, payload) VALUES (?, ?, ?)",
+                (normalize_url(page.url), time.time(), page.model_dump_json()),
+            )
+
+    def touch(self, url: str) -> None:
+        """Mark a cached page as fresh again after a successful revalidation."""
+        with connect(self.path) as conn:
+            conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), normalize_url(url)))
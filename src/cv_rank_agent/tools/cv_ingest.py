@@ -0,0 +1,209 @@
+"""Bulk CV ingestion: text and layout extraction in a process pool, streamed to cv_parser.
+
+PyMuPDF and python-docx extraction is CPU-bound and holds the GIL, so an HR
+export of thousands of CVs is read in worker processes (CV_INGEST_WORKERS,
+one per core by default). Inputs are CV files, directories of them, and
+zip/tar archives; an archive member is read by this process one at a time
+and its bytes are sent to a worker, so the archive is never unpacked to
+disk. At most CV_INGEST_QUEUE CVs are in flight (submitted and not yet
+consumed), which keeps memory flat however large the export is.
+
+Records are yielded in input order. A CV that cannot be read (corrupt,
+encrypted, no text layer) is yielded as a SkippedCV with the reason, and the
+rest of the batch goes on. So is a CV that crashes its worker process: the
+CVs in flight with it are extracted again in a fresh pool.
+"""
+import hashlib
+import itertools
+import multiprocessing
+import os
+import tarfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+
+from cv_rank_agent.config import settings
+from cv_rank_agent.tools.cv_layout import CVDraft, read_cv_draft
+from cv_rank_agent.tools.file_load import ARCHIVE_SUFFIXES, CV_SUFFIXES, expand_cv_paths, load_cv
+
+_OLE_MAGIC = b"\xd0\xcf\x11\xe0"  # compound file: a password-protected DOCX, or a legacy .doc
+
+
+@dataclass
+class CVSource:
+    """A CV to extract: a file path, or an archive member (``export.zip!alice/cv.pdf``) with its bytes."""
+    path: str
+    data: bytes | None = None  # archive members only; files are read by the worker
+
+
+@dataclass
+class CVRecord:
+    """The extracted text of one CV, its content hash and its layout draft (None if not recognized or disabled)."""
+    path: str
+    text: str
+    content_hash: str      # sha256 of the file bytes, to spot the same CV under several names
+    draft: CVDraft | None
+    extract_s: float       # time spent reading and extracting the file
+
+
+@dataclass
+class SkippedCV:
+    """A CV that could not be read, and why."""
+    path: str
+    reason: str
+
+
+def _is_cv(name: str) -> bool:
+    base = name.rsplit("/", 1)[-1]
+    return name.lower().endswith(CV_SUFFIXES) and not base.startswith(".") and "__MACOSX/" not in name
+
+
+def _archive_sources(archive: str) -> Iterator[CVSource | SkippedCV]:
+    """The CV members of a zip or tar archive, read one at a time."""
+    try:
+        if archive.lower().endswith(".zip"):
+            with zipfile.ZipFile(archive) as zf:
+                for info in zf.infolist():
+                    if info.is_dir() or not _is_cv(info.filename):
+                        continue
+                    path = f"{archive}!{info.filename}"
+                    try:
+                        yield CVSource(path, zf.read(info))
+                    except (RuntimeError, zipfile.BadZipFile, OSError) as exc:  # encrypted member, bad CRC, ...
+                        yield SkippedCV(path, f"unreadable archive member ({exc})")
+        else:
+            with tarfile.open(archive, "r:*") as tar:  # streams .tar.gz without unpacking it
+                for member in tar:
+                    if not member.isfile() or not _is_cv(member.name):
+                        continue
+                    path = f"{archive}!{member.name}"
+                    try:
+                        yield CVSource(path, tar.extractfile(member).read())
+                    except (tarfile.TarError, EOFError, OSError, zlib.error) as exc:  # truncated archive, bad gzip data, ...
+                        yield SkippedCV(path, f"unreadable archive member ({exc})")
+                        return  # a tar stream cannot be resynced past damaged data
+    except (zipfile.BadZipFile, tarfile.TarError, OSError) as exc:
+        yield SkippedCV(archive, f"unreadable archive ({exc})")
+
+
+def iter_cv_sources(paths: Iterable[str]) -> Iterator[CVSource | SkippedCV]:
+    """CV files, the CVs of directories (as expand_cv_paths lists them) and the CV members of archives, in order."""
+    for path in expand_cv_paths(list(paths)):
+        if path.lower().endswith(ARCHIVE_SUFFIXES):
+            yield from _archive_sources(path)
+        else:
+            yield CVSource(path)
+
+
+def _skip_reason(path: str, data: bytes, exc: Exception) -> str:
+    if path.lower().endswith(".docx") and data.startswith(_OLE_MAGIC):
+        return "encrypted DOCX (password required) or a legacy .doc file"
+    if isinstance(exc, ValueError):  # encrypted PDF, unsupported format
+        return str(exc)
+    return f"unreadable file ({type(exc).__name__}: {exc})"
+
+
+def extract_cv(path: str, data: bytes | None = None, layout: bool = True) -> CVRecord | SkippedCV:
+    """Read one CV: its text (load_cv), content hash and, if ``layout``, its layout draft. Runs in a worker."""
+    started = time.perf_counter()
+    try:
+        if data is None:
+            data = Path(path).read_bytes()
+    except OSError as exc:
+        return SkippedCV(path, f"cannot read file ({exc.strerror or exc})")
+    try:
+        text = load_cv(path, data)
+        draft = read_cv_draft(path, data) if layout and text.strip() else None
+    except Exception as exc:  # PyMuPDF and python-docx raise many types for damaged files
+        return SkippedCV(path, _skip_reason(path, data, exc))
+    if not text.strip():
+        return SkippedCV(path, "no extractable text (a scanned image without OCR?)")
+    return CVRecord(path, text, hashlib.sha256(data).hexdigest(), draft, time.perf_counter() - started)
+
+
+def _resolved(result: CVRecord | SkippedCV) -> Future:
+    future: Future = Future()
+    future.set_result(result)
+    return future
+
+
+def _succeeded(future: Future) -> bool:
+    return future.done() and not future.cancelled() and future.exception() is None
+
+
+def _extract_alone(source: CVSource, layout: bool) -> CVRecord | SkippedCV:
+    """Extract one CV in a worker process of its own, so that a crash there is this CV's."""
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        try:
+            return pool.submit(extract_cv, source.path, source.data, layout).result()
+        except BrokenProcessPool:
+            return SkippedCV(source.path, "extraction worker crashed")
+
+
+def ingest_cvs(
+    paths: Iterable[str], workers: int | None = None, max_in_flight: int | None = None,
+) -> Iterator[CVRecord | SkippedCV]:
+    """Extract every CV of ``paths`` and yield the records in input order as they become ready.
+
+    ``workers`` defaults to CV_INGEST_WORKERS (0 = one per CPU core) and
+    ``max_in_flight`` to CV_INGEST_QUEUE (0 = two per worker). A single CV,
+    or one worker, is extracted in this process without a pool.
+    """
+    workers = workers or settings.cv_ingest_workers or os.cpu_count() or 1
+    max_in_flight = max(max_in_flight or settings.cv_ingest_queue or 2 * workers, 1)
+    layout = settings.cv_layout_parser
+    sources = iter_cv_sources(paths)
+    head = list(itertools.islice(sources, 2))
+    sources = itertools.chain(head, sources)
+
+    if workers == 1 or len(head) < 2:
+        for source in sources:
+            yield source if isinstance(source, SkippedCV) else extract_cv(source.path, source.data, layout)
+        return
+
+    # spawn, not fork: the parent runs LangGraph and asyncio threads, which a forked child must not inherit
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(workers, mp_context=context)
+    pending: deque[tuple[CVSource | SkippedCV, Future]] = deque()
+
+    def submit(source: CVSource | SkippedCV) -> Future:
+        if isinstance(source, SkippedCV):
+            return _resolved(source)
+        try:
+            return pool.submit(extract_cv, source.path, source.data, layout)
+        except BrokenProcessPool as exc:  # broke since the last result; handled when this CV is next
+            future: Future = Future()
+            future.set_exception(exc)
+            return future
+
+    def next_result() -> CVRecord | SkippedCV:
+        nonlocal pool
+        source, future = pending.popleft()
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            pass
+        # A worker died (a crash in native code, an OOM kill) and failed every CV in flight with it.
+        # The others go to a fresh pool; this one is retried alone, and skipped if it crashes again.
+        pool.shutdown(cancel_futures=True)
+        pool = ProcessPoolExecutor(workers, mp_context=context)
+        for i, (queued, queued_future) in enumerate(pending):
+            if not _succeeded(queued_future):
+                pending[i] = (queued, submit(queued))
+        return _extract_alone(source, layout)
+
+    try:
+        for source in sources:
+            if len(pending) >= max_in_flight:
+                yield next_result()
+            pending.append((source, submit(source)))
+        while pending:
+            yield next_result()
+    finally:
+        pool.shutdown(cancel_futures=True)
@@ -0,0 +1,472 @@
+"""Layout-aware CV parser: sections, contact details and lists read from the document structure, without the LLM.
+
+load_pdf and load_docx flatten a CV into plain text, but its structure is
+still visible in the file. PyMuPDF reports the font size and weight of every
+span, and python-docx reports paragraph styles and list numbering. From that,
+this module finds the section headings (Skills, Experience, Education, ...),
+the bullet items and the header block above the first section, and fills in:
+
+- name, email, phone and location from the header (and a Contact section);
+- summary, skills, languages and certifications from their sections;
+- experience and education entries whose heading line follows a common
+  pattern, e.g. "Role, Company (2019 – 2023)" or "MSc Physics, University of X, 2018".
+
+What it cannot resolve is left to the LLM: cv_parser asks it only for the
+unresolved fields, and sends only the sections they come from.
+"""
+import io
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from cv_rank_agent.models import Education, LanguageSkill, ParsedCV, WorkExperience
+from cv_rank_agent.tools.file_load import open_pdf
+
+
+@dataclass
+class Line:
+    """One line (PDF) or paragraph (DOCX) of a CV, with the layout hints the parser uses."""
+    text: str
+    heading: bool = False   # larger or bold type, or a heading/title style
+    bullet: bool = False    # a list item
+    size: float = 1.0       # font size relative to the body text
+
+
+# Section → heading text (the whole heading, case-insensitive)
+SECTION_TITLES = {
+    "summary": r"(professional |career |personal )?(summary|profile)|about( me)?|objective|introduction",
+    "skills": (
+        r"(technical |key |core |professional |it )?(skills|competencies|competences)"
+        r"( (&|and) (tools|technologies|expertise))?|technologies|tech stack|expertise|tools"
+    ),
+    "experience": r"(professional |work |relevant )?experience|employment( history)?|work history|career( history)?",
+    "education": r"education( (&|and) training)?|academic background",
+    "languages": r"languages?|language skills",
+    "certifications": r"certifications?|certificates|licen[cs]es( (&|and) certifications)?|courses|training",
+    "contact": r"contact( details| information)?|personal (details|information)",
+}
+_SECTIONS = [(name, re.compile(rf"(?:{pattern})", re.I)) for name, pattern in SECTION_TITLES.items()]
+
+_BULLET = re.compile(r"^\s*(?:[•●▪■◦‣○∙·►✓]\s*|[-–*]\s+)")
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE = re.compile(r"\+?\(?\d[\d\s()./-]{6,}\d")
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s+|\d{{1,2}}[/.])?(?:19|20)\d{{2}}"
+_DATE_RANGE = re.compile(
+    rf"{_DATE}\s*(?:-|–|—|to|until)\s*(?:{_DATE}|present|now|current|today|ongoing)|(?:since|from)\s+{_DATE}", re.I
+)
+_YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+_NAME = re.compile(r"^[^\W\d_][\w'’.-]*(?:\s+[^\W\d_][\w'’.-]*){1,4}$")
+_ENTRY_SEPARATOR = re.compile(r"\s*(?:,|\||–|—|·|\s-\s|\sat\s|\s@\s)\s*")
+_INSTITUTION = re.compile(
+    r"universit|college|school|institut|academy|polytechnic|hochschule|[ée]cole|escuela|faculty|\b(?:ETH|EPFL|MIT|TU|KTH|UCL)\b",
+    re.I,
+)
+_DEGREE = re.compile(
+    r"\b(?:b\.?sc|m\.?sc|b\.?a|m\.?a|b\.?eng|m\.?eng|bachelor|master|ph\.?d|doctor|mba|diploma|degree|"
+    r"engineer|associate|certificate|abitur|a-levels|baccalaur|licenciatura)",
+    re.I,
+)
+
+
+# --- reading the layout -------------------------------------------------------------------------
+
+
+def pdf_lines(file_path: str, data: bytes | None = None) -> list[Line]:
+    """The text lines of a PDF with their font size relative to the body text, boldness and bullets."""
+    raw: list[tuple[str, float, bool]] = []
+    with open_pdf(file_path, data) as doc:
+        for page in doc:
+            for block in page.get_text("dict")["blocks"]:
+                for line in block.get("lines", []):  # image blocks have none
+                    spans = [span for span in line["spans"] if span["text"].strip()]
+                    if not spans:
+                        continue
+                    text = "".join(span["text"] for span in line["spans"]).strip()
+                    bold = all(span["flags"] & 16 or "bold" in span["font"].lower() for span in spans)
+                    raw.append((text, max(span["size"] for span in spans), bold))
+    if not raw:
+        return []
+    sizes: Counter[float] = Counter()
+    for text, size, _ in raw:
+        sizes[round(size, 1)] += len(text)
+    body = sizes.most_common(1)[0][0]  # the size most of the text is set in
+    return [
+        Line(text, heading=bold or size >= body * 1.15, bullet=bool(_BULLET.match(text)), size=round(size / body, 2))
+        for text, size, bold in raw
+    ]
+
+
+def docx_lines(file_path: str, data: bytes | None = None) -> list[Line]:
+    """The paragraphs of a DOCX (headers, body and table cells, in document order) with style hints."""
+    from docx import Document
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+    doc = Document(file_path if data is None else io.BytesIO(data))
+    lines: list[Line] = []
+
+    def add(paragraph: Paragraph) -> None:
+        text = paragraph.text.strip()
+        if not text:
+            return
+        style = paragraph.style
+        style_name = (style.name if style is not None else "").lower()
+        style_bold = bool(style is not None and style.font.bold)
+        runs = [run for run in paragraph.runs if run.text.strip()]
+        bold = bool(runs) and all(run.bold if run.bold is not None else style_bold for run in runs)
+        numbered = paragraph._p.pPr is not None and paragraph._p.pPr.numPr is not None
+        size = 2.0 if style_name.startswith("title") else 1.3 if style_name.startswith("heading") else 1.0
+        lines.append(Line(
+            text,
+            heading=size > 1 or bold,
+            bullet=numbered or "list" in style_name or bool(_BULLET.match(text)),
+            size=size,
+        ))
+
+    for section in doc.sections:
+        for header_footer in (section.header, section.footer):
+            if header_footer and header_footer.is_linked_to_previous is False:
+                for paragraph in header_footer.paragraphs:
+                    add(paragraph)
+    for item in doc.iter_inner_content():
+        if isinstance(item, Table):
+            seen = set()
+            for row in item.rows:
+                for cell in row.cells:
+                    if cell._tc not in seen:  # merged cells repeat
+                        seen.add(cell._tc)
+                        for paragraph in cell.paragraphs:
+                            add(paragraph)
+        else:
+            add(item)
+    return lines
+
+
+def read_lines(file_path: str, data: bytes | None = None) -> list[Line]:
+    """The layout lines of a PDF or DOCX CV (or of its bytes, ``data``)."""
+    if file_path.lower().endswith(".pdf"):
+        return pdf_lines(file_path, data)
+    if file_path.lower().endswith(".docx"):
+        return docx_lines(file_path, data)
+    raise ValueError(f"Unsupported CV file format: {file_path}")
+
+
+# --- sections -----------------------------------------------------------------------------------
+
+
+@dataclass
+class Block:
+    """A section of the CV: its heading line (None for the header block) and its content lines."""
+    name: str               # a SECTION_TITLES key, "header", or "other" for an unrecognized section
+    heading: Line | None
+    lines: list[Line]
+
+    def render(self) -> str:
+        body = [f"- {_strip_bullet(line.text)}" if line.bullet else line.text for line in self.lines]
+        return "\n".join(([self.heading.text] if self.heading else []) + body)
+
+
+def _strip_bullet(text: str) -> str:
+    return _BULLET.sub("", text).strip()
+
+
+def _section_title(text: str) -> str | None:
+    """The section a heading text names, if any."""
+    text = re.sub(r"\s+", " ", text.strip(" :•-–|#*\t"))
+    if not text or len(text.split()) > 5:
+        return None
+    for name, pattern in _SECTIONS:
+        if pattern.fullmatch(text):
+            return name
+    return None
+
+
+def _heading_style(line: Line) -> tuple:
+    return round(line.size, 1), line.heading, line.text.isupper()
+
+
+def split_sections(lines: list[Line]) -> list[Block]:
+    """Split the CV into the header block and its sections, in document order.
+
+    A section starts at a heading-like line (larger, bold, upper-case or
+    ending in ":") naming a known section, or at an inline "Skills: ..." line.
+    A heading in the same style as the recognized ones starts an "other"
+    section, so e.g. "Projects" is not read as part of the preceding section.
+    """
+    starts: list[tuple[int, str, str | None]] = []  # line index, section, inline content
+    for i, line in enumerate(lines):
+        text = line.text.strip()
+        name = None if line.bullet else _section_title(text)
+        if name and (line.heading or text.isupper() or text.endswith(":")):
+            starts.append((i, name, None))
+    if len(starts) < 2:  # a plain-text CV: "Skills: Python, Go" lines
+        for i, line in enumerate(lines):
+            label, _, rest = line.text.partition(":")
+            if not line.bullet and rest.strip() and (name := _section_title(label)):
+                starts.append((i, name, rest.strip()))
+
+    # Only a distinctive style (larger or upper-case): bold body text is also used for job titles
+    styles = {
+        style for i, _, inline in starts
+        if inline is None and ((style := _heading_style(lines[i]))[0] > 1.05 or style[2])
+    }
+    known = {i for i, _, _ in starts}
+    first = min(known, default=len(lines))  # the header above the first section keeps its name line
+    for i, line in enumerate(lines[first:], start=first):
+        if (
+            i not in known and not line.bullet and _heading_style(line) in styles
+            and len(line.text.split()) <= 4 and not _YEAR.search(line.text)
+        ):
+            starts.append((i, "other", None))
+    starts.sort()
+
+    blocks = [Block("header", None, lines[: starts[0][0] if starts else len(lines)])]
+    for n, (i, name, inline) in enumerate(starts):
+        end = starts[n + 1][0] if n + 1 < len(starts) else len(lines)
+        content = ([Line(inline)] if inline else []) + lines[i + 1:end]
+        heading = Line(lines[i].text.split(":", 1)[0] if inline else lines[i].text, heading=True)
+        blocks.append(Block(name, heading, content))
+    return blocks
+
+
+# --- fields -------------------------------------------------------------------------------------
+
+
+def _items(lines: list[Line]) -> list[str]:
+    """A section's items: one per bullet (with its wrapped continuation lines) or other line."""
+    items: list[str] = []
+    in_bullet = False
+    for line in lines:
+        text = _strip_bullet(line.text)
+        if in_bullet and not line.bullet and not line.heading and items:
+            items[-1] += " " + text
+        else:
+            items.append(text)
+            in_bullet = line.bullet
+    return items
+
+
+def _split_list(text: str) -> list[str]:
+    """Split "Python (Django, Flask), SQL; Go" on separators outside parentheses."""
+    parts, depth, current = [], 0, []
+    for char in text:
+        depth += char in "([{"
+        depth -= char in ")]}" and depth > 0
+        if depth == 0 and char in ",;•|·":
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [part.strip(" .\t") for part in parts if part.strip(" .\t")]
+
+
+def _skills(lines: list[Line]) -> list[str] | None:
+    """Skill names from a list section; None if it reads as prose."""
+    skills: list[str] = []
+    for item in _items(lines):
+        label, _, rest = item.partition(":")
+        if rest.strip() and len(label.split()) <= 4:  # "Languages: Python, Go"
+            item = rest
+        for part in _split_list(item):
+            if len(part.split()) > 5:
+                return None
+            skills.append(part)
+    return list(dict.fromkeys(skills)) or None
+
+
+_LANGUAGE = re.compile(r"^(?P<language>[^\W\d_]+(?: [^\W\d_]+)?)\s*(?:[(:\-–—]\s*(?P<level>[^()]+?)\s*\)?)?$")
+
+
+def _languages(lines: list[Line]) -> list[LanguageSkill] | None:
+    """"English (native), German – B2" entries; None if any entry does not read as one."""
+    languages = []
+    for item in _items(lines):
+        for part in _split_list(item):
+            match = _LANGUAGE.match(part)
+            if match is None:
+                return None
+            languages.append(LanguageSkill(language=match["language"], proficiency=match["level"]))
+    return languages or None
+
+
+def _entry_parts(text: str) -> list[str]:
+    return [part.strip(" ()") for part in _ENTRY_SEPARATOR.split(text) if part.strip(" ()")]
+
+
+def _experience(lines: list[Line]) -> list[WorkExperience] | None:
+    """Entries with a dated heading line ("Role, Company (2019 – 2023)", or "Role" then "Company | dates").
+
+    Bullets and plain lines below an entry become its description. None when
+    any line does not fit, so the LLM reads the section instead.
+    """
+    entries: list[dict[str, Any]] = []
+    title: list[str] = []  # a heading line without dates, waiting for the dated line below it
+    for line in lines:
+        text = _strip_bullet(line.text)
+        dates = None if line.bullet else _DATE_RANGE.search(text)
+        if dates:
+            parts = title + _entry_parts(text[:dates.start()])
+            if len(parts) < 2:
+                return None
+            tail = text[dates.end():].strip(" )(:|,–—-")
+            entries.append({"role": parts[0], "company": parts[1], "duration": dates.group(0), "description": [tail] if tail else []})
+            title = []
+        elif line.heading and not line.bullet and not title:
+            title = _entry_parts(text)
+        elif entries and not title:
+            entries[-1]["description"].append(text)
+        else:
+            return None
+    if title or not entries:
+        return None
+    return [
+        WorkExperience(
+            role=entry["role"], company=entry["company"], duration=entry["duration"],
+            description=" ".join(entry["description"]) or None,
+        )
+        for entry in entries
+    ]
+
+
+def _education(lines: list[Line]) -> list[Education] | None:
+    """Entries naming a degree and an institution ("MSc Physics, University of X, 2018"), on one or two lines.
+
+    Bullets (thesis, grades) are skipped. None when a line does not fit.
+    """
+    entries: list[Education] = []
+    pending: list[str] = []
+    for line in lines:
+        if line.bullet:
+            continue
+        text = _strip_bullet(line.text)
+        years = _YEAR.findall(text)
+        parts = pending + _entry_parts(_DATE_RANGE.sub("", _YEAR.sub("", text)))
+        institution = next((part for part in parts if _INSTITUTION.search(part)), None)
+        degree = next((part for part in parts if _DEGREE.search(part) and part != institution), None)
+        if institution and not degree and len(parts) == 2:
+            degree = next(part for part in parts if part != institution)
+        if degree and not institution and len(parts) == 2:
+            institution = next(part for part in parts if part != degree)
+        if institution and degree:
+            entries.append(Education(institution=institution, degree=degree, year=years[-1] if years else None))
+            pending = []
+        elif not pending and not years:
+            pending = parts
+        else:
+            return None
+    if pending or not entries:
+        return None
+    return entries
+
+
+def _name(header: list[Line]) -> str | None:
+    """The largest name-like line among the first lines of the header."""
+    candidates = [line for line in header[:6] if _NAME.match(line.text.strip()) and not _section_title(line.text)]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda line: (line.size, line.heading)).text.strip()
+
+
+def _phone(lines: list[Line]) -> str | None:
+    """The first phone-number-like run of 8+ digits in ``lines`` that is not a date range."""
+    for line in lines:
+        for match in _PHONE.finditer(line.text):
+            candidate = match.group(0).strip()
+            if sum(char.isdigit() for char in candidate) >= 8 and not _DATE_RANGE.search(candidate):
+                return candidate
+    return None
+
+
+def _location(lines: list[Line]) -> str | None:
+    """The place in a "email | phone | City, Country" contact line: the part that is neither contact nor link."""
+    for line in lines:
+        if not (_EMAIL.search(line.text) or _phone([line])):
+            continue
+        for part in re.split(r"\s*[|•·]\s*|\s+[–—-]\s+", line.text):
+            if (
+                part and not _EMAIL.search(part) and not _PHONE.search(part)
+                and not re.search(r"https?:|www\.|linkedin|github|\.\w{2,3}/", part, re.I)
+                and re.fullmatch(r"[^\W\d_][\w'’. -]*(?:,\s*[\w'’. -]+)*", part.strip())
+            ):
+                return part.strip()
+    return None
+
+
+@dataclass
+class CVDraft:
+    """ParsedCV fields read from the layout, and what is left for the LLM."""
+    fields: dict[str, Any]    # resolved ParsedCV fields
+    unresolved: list[str]     # ParsedCV fields the LLM still has to extract
+    context: str              # the CV text they come from: their sections (and the header)
+
+    def parsed_cv(self, extracted: dict[str, Any] | None = None) -> ParsedCV:
+        """The ParsedCV: the layout's fields, completed by the LLM's ``extracted`` fields."""
+        return ParsedCV.model_validate({**self.fields, **(extracted or {})})
+
+
+def parse_layout(lines: list[Line]) -> CVDraft | None:
+    """Resolve what the layout allows; None when fewer than two known sections are found."""
+    blocks = split_sections(lines)
+    sections: dict[str, list[Line]] = {}
+    for block in blocks:
+        if block.name not in ("header", "other"):
+            sections.setdefault(block.name, []).extend(block.lines)
+    if len(sections) < 2:
+        return None
+    header = blocks[0].lines
+    others = [block for block in blocks if block.name == "other"]
+    contact = header + sections.get("contact", [])
+
+    fields: dict[str, Any] = {}
+    unresolved: list[str] = []
+    sources: dict[str, list[str]] = {  # field → the blocks the LLM needs to extract it
+        "name": ["header", "contact"], "location": ["header", "contact"],
+    }
+
+    if name := _name(header):
+        fields["name"] = name
+    else:
+        unresolved.append("name")
+    text = "\n".join(line.text for line in lines)
+    if email := _EMAIL.search("\n".join(line.text for line in contact)) or _EMAIL.search(text):
+        fields["email"] = email.group(0)
+    if phone := _phone(contact):
+        fields["phone"] = phone
+    if location := _location(contact):
+        fields["location"] = location
+    if "summary" in sections:
+        fields["summary"] = " ".join(_items(sections["summary"])) or None
+    else:  # a profile paragraph right below the name, without a heading of its own
+        prose = [line.text for line in header if len(line.text.split()) >= 8 and not _EMAIL.search(line.text)]
+        fields["summary"] = " ".join(prose) or None
+
+    parsers = {
+        "skills": _skills, "experience": _experience, "education": _education,
+        "languages": _languages, "certifications": lambda section: _items(section) or None,
+    }
+    for field_name, parse in parsers.items():
+        if field_name in sections:
+            value = parse(sections[field_name])
+            sources[field_name] = [field_name]
+        elif others and field_name in ("skills", "experience", "education"):
+            value, sources[field_name] = None, ["other"]  # maybe under a heading we do not know
+        else:
+            value = []  # the CV has no such section
+        if value is None:
+            unresolved.append(field_name)
+        else:
+            fields[field_name] = value
+
+    if unresolved and header and "location" not in fields:
+        unresolved.append("location")  # read from the header along with the rest
+    needed = {block for field_name in unresolved for block in sources[field_name]}
+    context = "\n\n".join(block.render() for block in blocks if block.name in needed and (block.lines or block.heading))
+    return CVDraft(fields=fields, unresolved=unresolved, context=context)
+
+
+def read_cv_draft(file_path: str, data: bytes | None = None) -> CVDraft | None:
+    """Parse a CV file's layout; None when its sections cannot be recognized."""
+    return parse_layout(read_lines(file_path, data))
@@ -1,10 +1,24 @@
-"""Utility functions to load and extract text from CV files (PDF and DOCX)."""
+"""Utility functions to load and extract text from CV files (PDF and DOCX), and to read job URL lists."""
+import io
+import json
+from pathlib import Path
 
-def load_pdf(file_path: str) -> str:
-    """Extract text from a PDF file using PyMuPDF (fitz)."""
+CV_SUFFIXES = (".pdf", ".docx")
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")  # bulk CV exports, read by tools/cv_ingest.py
+
+def open_pdf(file_path: str, data: bytes | None = None):
+    """Open a PDF with PyMuPDF (from ``data`` if given); raises ValueError if it is password-protected."""
     import pymupdf
 
-    doc = pymupdf.open(file_path)
+    doc = pymupdf.open(file_path) if data is None else pymupdf.open(stream=data, filetype="pdf")
+    if doc.needs_pass:
+        doc.close()
+        raise ValueError("encrypted PDF (password required)")
+    return doc
+
+def load_pdf(file_path: str, data: bytes | None = None) -> str:
+    """Extract text from a PDF file using PyMuPDF (fitz)."""
+    doc = open_pdf(file_path, data)
     parts: list[str] = []
 
     for page in doc:
@@ -15,7 +29,7 @@ def load_pdf(file_path: str) -> str:
     doc.close()
     return "\n".join(parts)
 
-def load_docx(file_path: str) -> str:
+def load_docx(file_path: str, data: bytes | None = None) -> str:
     """Extract text from a DOCX file.
 
     Extracts content from paragraphs, tables, headers, and footers
@@ -23,7 +37,7 @@ def load_docx(file_path: str) -> str:
     """
     from docx import Document
 
-    doc = Document(file_path)
+    doc = Document(file_path if data is None else io.BytesIO(data))
     parts: list[str] = []
 
     # --- header / footer text (each section can have its own) ---
@@ -50,11 +64,40 @@ def load_docx(file_path: str) -> str:
 
     return "\n".join(parts)
 
-def load_cv(file_path: str) -> str:
-    """Load CV text from a PDF or DOCX file."""
+def load_cv(file_path: str, data: bytes | None = None) -> str:
+    """Load CV text from a PDF or DOCX file (or its bytes, ``data``)."""
     if file_path.lower().endswith(".pdf"):
-        return load_pdf(file_path)
+        return load_pdf(file_path, data)
     elif file_path.lower().endswith(".docx"):
-        return load_docx(file_path)
+        return load_docx(file_path, data)
     else:
-        raise ValueError(f"Unsupported CV file format: {file_path}")
\ No newline at end of file
+        raise ValueError(f"Unsupported CV file format: {file_path}")
+
+def expand_cv_paths(paths: list[str]) -> list[str]:
+    """Expand directories into the PDF/DOCX files (and CV archives) they contain (sorted), keeping files as given."""
+    expanded: list[str] = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            expanded.extend(
+                str(p) for p in sorted(path.iterdir())
+                if p.is_file() and p.name.lower().endswith(CV_SUFFIXES + ARCHIVE_SUFFIXES)
+            )
+        else:
+            expanded.append(str(path))
+    return list(dict.fromkeys(expanded))
+
+def read_job_urls(jobs_path: Path) -> list[str]:
+    """Read the job URLs of a ``{"jobs": [...]}`` JSON file; raises ValueError if it is invalid."""
+    try:
+        data = json.loads(jobs_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Invalid JSON in {jobs_path}: {exc}") from exc
+
+    if not isinstance(data, dict) or "jobs" not in data:
+        raise ValueError(f'{jobs_path} must contain a JSON object with a "jobs" key.')
+
+    urls = data["jobs"]
+    if not isinstance(urls, list) or not all(isinstance(u, str) for u in urls):
+        raise ValueError(f'"jobs" in {jobs_path} must be a list of URL strings.')
+
+    return urls
@@ -0,0 +1,113 @@
+"""Token-budgeted prompt assembly: duplicate removal and priority-ordered trimming.
+
+A parsed job keeps its full description next to the requirements and
+responsibilities extracted from it, so the same bullets usually appear
+twice in a scoring prompt. remove_covered drops the description sentences
+that a structured item already states. fit_sections then renders a prompt
+part (CV or job) from prioritized sections within a token budget (see
+tools/tokens.py), trimming the least important sections first, so a long
+CV or posting is cut where it matters least instead of being truncated
+at the end of the model's context window.
+"""
+import re
+from dataclasses import dataclass
+
+from cv_rank_agent.tools.tokens import estimate_tokens, truncate_to_tokens
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\w])")
+_BULLET = re.compile(r"^\s*(?:[*+•·▪–-]|\d+[.)])\s+")
+_WORD = re.compile(r"\w+")
+_COVERED = 0.8       # share of a sentence's words one structured item must contain to repeat it
+_MIN_ITEM_TOKENS = 8  # a trimmed item shorter than this is dropped instead
+
+
+def _words(text: str) -> set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+def _is_heading(line: str) -> bool:
+    """A short label line such as "What you'll do" or "Requirements:"."""
+    return 0 < len(line.split()) <= 6 and not line.rstrip().endswith((".", "!", "?", ",", ";"))
+
+
+def unique_items(items: list[str], seen: set[str] | None = None) -> list[str]:
+    """``items`` without repeats (ignoring case, spacing and punctuation), also skipping those in ``seen``.
+
+    Kept items are added to ``seen``, so one set can dedupe several lists in turn.
+    """
+    seen = set() if seen is None else seen
+    kept = []
+    for item in items:
+        key = " ".join(_WORD.findall(item.lower()))
+        if key and key not in seen:
+            seen.add(key)
+            kept.append(item.strip())
+    return kept
+
+
+def remove_covered(text: str, items: list[str]) -> str:
+    """``text`` without the sentences that one of ``items`` already states.
+
+    A sentence is covered when at least 80% of its words occur in a single
+    item, e.g. the description bullet "5+ years of Python experience" and
+    the requirement "5+ years of professional Python experience". A
+    heading line right above a removed line ("What you'll do") goes too.
+    """
+    covered = [words for words in map(_words, items) if words]
+    if not covered:
+        return text.strip()
+
+    def repeats(sentence: str) -> bool:
+        words = _words(sentence)
+        return bool(words) and any(len(words & item) >= _COVERED * len(words) for item in covered)
+
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    kept: list[str | None] = []  # None marks a removed line
+    for line in lines:
+        bullet = _BULLET.match(line)
+        sentences = [s for s in _SENTENCE_END.split(line[bullet.end():] if bullet else line) if not repeats(s)]
+        kept.append(((bullet.group(0) if bullet else "") + " ".join(sentences)) if sentences else None)
+    return "\n".join(
+        line for i, line in enumerate(kept)
+        if line is not None and not (_is_heading(line) and i + 1 < len(kept) and kept[i + 1] is None)
+    )
+
+
+@dataclass
+class Section:
+    """Lines of a prompt part under an optional heading; sections with a lower ``priority`` are trimmed first."""
+    items: list[str]
+    priority: int
+    heading: str | None = None
+
+    def render(self) -> str:
+        return "\n".join(([self.heading] if self.heading else []) + self.items) if self.items else ""
+
+
+def render_sections(sections: list[Section]) -> str:
+    return "\n".join(text for text in (section.render() for section in sections) if text)
+
+
+def fit_sections(sections: list[Section], max_tokens: int | None) -> str:
+    """Render ``sections`` in order, trimmed to ``max_tokens`` (None = no budget).
+
+    Over budget, the section with the lowest priority (the later one among
+    equals) loses items from its end: its last item is cut to what is still
+    over budget, or dropped when less than a few tokens of it would remain.
+    A section left without items loses its heading too.
+    """
+    text = render_sections(sections)
+    if max_tokens is None or estimate_tokens(text) <= max_tokens:
+        return text
+    for section in sorted(reversed(sections), key=lambda section: section.priority):
+        while section.items and (over := estimate_tokens(text) - max_tokens) > 0:
+            last = section.items[-1]
+            cost = estimate_tokens(last)
+            if cost - over >= _MIN_ITEM_TOKENS:
+                section.items[-1] = truncate_to_tokens(last, cost - over)
+            else:
+                section.items.pop()
+            text = render_sections(sections)
+        if estimate_tokens(text) <= max_tokens:
+            break
+    return text
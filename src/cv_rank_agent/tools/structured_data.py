@@ -0,0 +1,147 @@
+"""Extract schema.org JobPosting data (JSON-LD or microdata) from raw HTML.
+
+Many job boards embed the posting as structured data, which maps straight
+onto JobDescription without an LLM call.
+"""
+import html
+import json
+import re
+
+from bs4 import BeautifulSoup, Tag
+
+from cv_rank_agent.models import JobDescription
+
+_REQUIREMENT_HEADINGS = re.compile(r"requirement|qualification|skills|you have|you bring|must have|profile", re.I)
+_RESPONSIBILITY_HEADINGS = re.compile(r"responsibilit|what you.ll do|duties|your role|the role|tasks", re.I)
+
+
+def _as_list(value: object) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _is_job_posting(node: dict) -> bool:
+    return any(str(t).rsplit("/", 1)[-1] == "JobPosting" for t in _as_list(node.get("@type")))
+
+
+def _find_json_ld_posting(soup: BeautifulSoup) -> dict | None:
+    """Return the first JobPosting object from any ld+json script (handles @graph and lists)."""
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except json.JSONDecodeError:
+            continue
+        stack = _as_list(data)
+        while stack:
+            node = stack.pop(0)
+            if not isinstance(node, dict):
+                continue
+            if _is_job_posting(node):
+                return node
+            stack.extend(_as_list(node.get("@graph")))
+    return None
+
+
+def _microdata_item(tag: Tag) -> dict:
+    """Flatten a microdata itemscope into a JSON-LD-like dict."""
+    item: dict = {}
+    for prop in tag.find_all(attrs={"itemprop": True}):
+        # Only direct properties — nested itemscopes are handled recursively
+        if prop.find_parent(attrs={"itemscope": True}) is not tag:
+            continue
+        if prop.has_attr("itemscope"):
+            value: object = _microdata_item(prop)
+        elif prop.has_attr("content"):
+            value = prop["content"]
+        elif prop.name == "meta":
+            continue
+        else:
+            value = prop.decode_contents()  # keep markup so list items stay separate
+        item.setdefault(prop["itemprop"], value)
+    return item
+
+
+def _find_microdata_posting(soup: BeautifulSoup) -> dict | None:
+    tag = soup.find(attrs={"itemscope": True, "itemtype": re.compile(r"schema\.org/JobPosting", re.I)})
+    return _microdata_item(tag) if tag is not None else None
+
+
+def _text(value: object) -> str:
+    """Plain text from a str/HTML fragment or a schema.org object with a name/description."""
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("description") or ""
+    # Some boards HTML-escape the markup inside JSON-LD strings
+    return BeautifulSoup(html.unescape(str(value)), "html.parser").get_text("\n", strip=True)
+
+
+def _location(posting: dict) -> str | None:
+    places: list[str] = []
+    for place in _as_list(posting.get("jobLocation")):
+        address = place.get("address", place) if isinstance(place, dict) else place
+        if isinstance(address, dict):
+            parts = [address.get(k) for k in ("addressLocality", "addressRegion", "addressCountry")]
+            parts = [_text(p) for p in parts if p]
+            if parts:
+                places.append(", ".join(parts))
+        elif address:
+            places.append(_text(address))
+    if "TELECOMMUTE" in str(posting.get("jobLocationType", "")).upper():
+        places.append("Remote")
+    return "; ".join(dict.fromkeys(places)) or None
+
+
+def _list_field(posting: dict, *keys: str) -> list[str]:
+    items: list[str] = []
+    for key in keys:
+        for value in _as_list(posting.get(key)):
+            text = _text(value)
+            items.extend(line.lstrip("•-* ").strip() for line in text.splitlines() if line.strip())
+    return list(dict.fromkeys(items))
+
+
+def _bullets_under(description_html: str, heading: re.Pattern) -> list[str]:
+    """Collect <li> items from lists that follow a heading matching ``heading``."""
+    soup = BeautifulSoup(description_html, "html.parser")
+    items: list[str] = []
+    for ul in soup.find_all(["ul", "ol"]):
+        label = ul.find_previous(["h1", "h2", "h3", "h4", "strong", "b", "p"])
+        if label is not None and heading.search(label.get_text(" ", strip=True)):
+            items.extend(li.get_text(" ", strip=True) for li in ul.find_all("li"))
+    return [item for item in dict.fromkeys(items) if item]
+
+
+def extract_job_posting(page_html: str, url: str) -> JobDescription | None:
+    """Map an embedded schema.org JobPosting onto JobDescription.
+
+    Returns None when the page has no posting, or when it lacks a title,
+    description or any requirements — the caller then falls back to the LLM.
+    """
+    if not page_html or "JobPosting" not in page_html:
+        return None
+    soup = BeautifulSoup(page_html, "html.parser")
+    posting = _find_json_ld_posting(soup) or _find_microdata_posting(soup)
+    if posting is None:
+        return None
+
+    description_html = str(posting.get("description") or "")
+    title = _text(posting.get("title") or "")
+    description = _text(description_html)
+    requirements = _list_field(
+        posting, "qualifications", "skills", "experienceRequirements", "educationRequirements"
+    ) or _bullets_under(description_html, _REQUIREMENT_HEADINGS)
+    responsibilities = _list_field(posting, "responsibilities") or _bullets_under(
+        description_html, _RESPONSIBILITY_HEADINGS
+    )
+    if not (title and description and requirements):
+        return None
+
+    return JobDescription(
+        title=title,
+        company=_text(posting.get("hiringOrganization") or "") or None,
+        location=_location(posting),
+        requirements=requirements,
+        responsibilities=responsibilities,
+        job_description=description,
+        source_url=url,
+    )
@@ -0,0 +1,42 @@
+"""Local token-count estimate for prompt budgeting (no tokenizer download needed)."""
+import re
+
+# Words, numbers and single punctuation marks — roughly how BPE tokenizers split text
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the LLM token count of ``text``.
+
+    Counts one token per punctuation mark and per ~5 characters of each
+    word. This slightly over-estimates llama-style BPE tokenizers on English,
+    which is the safe side for a budget.
+    """
+    return sum(-(-len(piece) // 5) for piece in _PIECES.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` so it fits within ``max_tokens``.
+
+    Whole lines are kept while they fit; the first line that doesn't is
+    cut at a word boundary.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    kept: list[str] = []
+    used = 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line)
+        if used + cost > max_tokens:
+            words: list[str] = []
+            for word in line.split():
+                used += estimate_tokens(word)
+                if used > max_tokens:
+                    break
+                words.append(word)
+            if words:
+                kept.append(" ".join(words))
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
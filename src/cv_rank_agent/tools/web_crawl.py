@@ -1,8 +1,171 @@
-"""WebCrawl tool bound to the job_parser node."""
-from crawl4ai import *
-
-async def web_crawl(url: str) -> str:
-    """Tool: crawl a URL and return its raw text content."""
-    async with AsyncWebCrawler() as crawler:
-        content = await crawler.arun(url=url)
-        return content.markdown
\ No newline at end of file
+"""WebCrawl tool bound to the job_parser node.
+
+crawl4ai (and with it Playwright) is only imported when a page actually
+has to be crawled, so runs served from the crawl cache never load it.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import urllib.error
+import urllib.request
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from cv_rank_agent import metrics
+from cv_rank_agent.config import settings
+from cv_rank_agent.runtime import LoopLocal
+from cv_rank_agent.tools.crawl_cache import CrawlCache, CrawlCacheMiss, CrawledPage
+
+if TYPE_CHECKING:
+    from crawl4ai import AsyncWebCrawler
+
+
+def _is_unchanged(page: CrawledPage) -> bool:
+    """Conditional GET with the cached validators — True on 304 Not Modified."""
+    headers = {"User-Agent": "Mozilla/5.0 (compatible; cv_rank_agent)"}
+    if page.etag:
+        headers["If-None-Match"] = page.etag
+    if page.last_modified:
+        headers["If-Modified-Since"] = page.last_modified
+    request = urllib.request.Request(page.url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=10):
+            return False  # 200 — the page changed (the body is left unread)
+    except urllib.error.HTTPError as exc:
+        return exc.code == 304
+    except (urllib.error.URLError, TimeoutError):
+        return False
+
+
+class CrawlerPool:
+    """A single long-lived AsyncWebCrawler shared by every crawl in a run.
+
+    The headless browser is only started on the first cache miss (or by
+    ``start()``) and is closed on exit. Concurrent crawls are bounded both
+    globally and per domain so a long URL list neither floods one job board
+    nor launches a browser per page. A ``persistent`` pool outlives the run
+    that used it: the service keeps one warm browser for all its runs.
+    """
+
+    def __init__(
+        self,
+        cache: CrawlCache | None = None,
+        max_concurrency: int | None = None,
+        per_domain_concurrency: int | None = None,
+    ) -> None:
+        self.cache = cache
+        self.persistent = False
+        self._crawler: AsyncWebCrawler | None = None
+        self._start_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(max_concurrency or settings.crawl_concurrency)
+        self._per_domain = per_domain_concurrency or settings.crawl_per_domain_concurrency
+        self._domain_slots: dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "CrawlerPool":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        if self._crawler is not None:
+            await self._crawler.close()
+            self._crawler = None
+
+    async def start(self) -> None:
+        """Start the browser now instead of on the first cache miss."""
+        await self._browser()
+
+    async def _browser(self) -> AsyncWebCrawler:
+        async with self._start_lock:
+            if self._crawler is None:
+                from crawl4ai import AsyncWebCrawler
+                from crawl4ai.async_crawler_strategy import AsyncHTTPCrawlerStrategy
+
+                if settings.crawl_strategy == "http":
+                    self._crawler = await AsyncWebCrawler(crawler_strategy=AsyncHTTPCrawlerStrategy()).start()
+                else:
+                    self._crawler = await AsyncWebCrawler().start()
+            return self._crawler
+
+    def _domain_slot(self, url: str) -> asyncio.Semaphore:
+        domain = urlsplit(url).hostname or ""
+        if domain not in self._domain_slots:
+            self._domain_slots[domain] = asyncio.Semaphore(self._per_domain)
+        return self._domain_slots[domain]
+
+    async def _crawl(self, url: str) -> CrawledPage:
+        crawler = await self._browser()
+        # Wait for the domain slot first so queued same-domain URLs don't hold global slots
+        async with self._domain_slot(url), self._slots:
+            started = time.perf_counter()
+            content = await crawler.arun(url=url)
+            elapsed = time.perf_counter() - started
+        headers = {k.lower(): v for k, v in (content.response_headers or {}).items()}
+        page = CrawledPage(
+            url=url,
+            markdown=content.markdown or "",
+            html=content.html or "",
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+        )
+        html_bytes, markdown_bytes = len(page.html.encode("utf-8")), len(page.markdown.encode("utf-8"))
+        metrics.count("crawl_bytes", html_bytes, kind="html")
+        metrics.count("crawl_bytes", markdown_bytes, kind="markdown")
+        metrics.record_item("web_crawl", url, elapsed, html_bytes=html_bytes, markdown_bytes=markdown_bytes)
+        return page
+
+    async def fetch(self, url: str) -> CrawledPage:
+        """Return the page for a URL, from the cache when possible.
+
+        Honors ``settings.crawl_cache_mode``: "refresh" always crawls,
+        "offline" never touches the network and raises CrawlCacheMiss
+        for URLs that were never cached.
+        """
+        mode = settings.crawl_cache_mode
+        cached = self.cache.get(url) if self.cache is not None and mode != "refresh" else None
+        if cached is not None:
+            page, is_fresh = cached
+            if is_fresh or mode == "offline":
+                self.cache.stats.hits += 1
+                metrics.count("crawl_cache_lookups", outcome="hit")
+                return page
+            if (page.etag or page.last_modified) and await asyncio.to_thread(_is_unchanged, page):
+                self.cache.touch(url)
+                self.cache.stats.revalidated += 1
+                metrics.count("crawl_cache_lookups", outcome="revalidated")
+                return page
+        elif mode == "offline":
+            metrics.count("crawl_cache_lookups", outcome="offline_miss")
+            raise CrawlCacheMiss(url)
+
+        page = await self._crawl(url)
+        if self.cache is not None:
+            self.cache.stats.misses += 1
+            metrics.count("crawl_cache_lookups", outcome="miss")
+            if page.markdown:
+                self.cache.put(page)
+        return page
+
+    async def crawl(self, url: str) -> str:
+        """Crawl a URL (or serve it from cache) and return its markdown."""
+        return (await self.fetch(url)).markdown
+
+
+_shared_pool: LoopLocal[CrawlerPool] = LoopLocal(lambda: CrawlerPool(CrawlCache()))
+
+
+def shared_pool() -> CrawlerPool:
+    """The cached CrawlerPool shared by every job_parser task on this event loop."""
+    return _shared_pool.get()
+
+
+async def close_shared_pool(force: bool = False) -> None:
+    """Close the shared browser, if one was started on this event loop.
+
+    A persistent pool is kept open unless ``force`` is set.
+    """
+    pool = _shared_pool.peek()
+    if pool is None or (pool.persistent and not force):
+        return
+    _shared_pool.pop()
+    await pool.__aexit__(None, None, None)
+
@@ -0,0 +1,230 @@
+"""Watch mode: keep a ranking up to date while a job list grows, doing work only for the delta.
+
+Entry point: uv run python -m cv_rank_agent <cv> <jobs.json> --watch
+
+The CVs are parsed once. Each refresh — whenever the jobs file changes, and
+every ``settings.watch_interval`` seconds — diffs the job list against the
+previous refresh:
+
+- new URLs are crawled, parsed and scored;
+- known URLs whose crawl cache entry has gone stale are revalidated, and
+  re-parsed and re-scored only if their job description changed;
+- removed URLs are dropped from the ranking.
+
+The embeddings of removed jobs, and the old embeddings of changed ones, are
+discarded from the embedding store, which is compacted once
+``settings.embedding_compact_share`` of its rows are dead.
+
+Which jobs get LLM scores is decided over the whole list, exactly as in a
+graph run (Option A/B routing, cosine top N, cascade), but unchanged jobs
+are never crawled again, their embeddings come from the embedding store
+and their scores are kept — crawls and model calls scale with the delta.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from cv_rank_agent import metrics
+from cv_rank_agent.artifacts import ArtifactStore
+from cv_rank_agent.clients import chat_model, llm_slots
+from cv_rank_agent.config import settings
+from cv_rank_agent.escalation import stage_model
+from cv_rank_agent.graph import embedder, route_after_collect_jobs
+from cv_rank_agent.models import JobDescription, ParsedCV, ScoreResult
+from cv_rank_agent.nodes.cv_parser import cv_parser
+from cv_rank_agent.nodes.job_parser import _parse_job
+from cv_rank_agent.nodes.scorer import _get_job_content_text, scorer
+from cv_rank_agent.tools.file_load import read_job_urls
+from cv_rank_agent.tools.web_crawl import CrawlerPool, close_shared_pool, shared_pool
+from langgraph.types import StreamWriter
+
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = 1.0  # how often the jobs file's modification time is checked
+
+
+@dataclass
+class RefreshStats:
+    """What one refresh changed."""
+    added: list[str]
+    changed: list[str]
+    removed: list[str]
+    rechecked: int    # known URLs whose stale crawl cache entry was revalidated
+    scored: int       # CV/job pairs sent to the scorer
+
+
+def _version(job: JobDescription) -> str:
+    """Hash of the job text the scorer sees; a new hash means the posting changed."""
+    return hashlib.sha256(_get_job_content_text(job).encode("utf-8")).hexdigest()
+
+
+def _is_stale(pool: CrawlerPool, url: str) -> bool:
+    """Whether a known URL is due for revalidation (its crawl cache entry expired or is gone)."""
+    if pool.cache is None:
+        return False
+    cached = pool.cache.get(url)
+    return cached is None or not cached[1]
+
+
+class IncrementalRanking:
+    """A ranking of CVs against a changing job list, kept between refreshes."""
+
+    def __init__(self, cv_paths: list[str]) -> None:
+        self.cv_paths = cv_paths
+        self.parsed_cvs: dict[str, ParsedCV] = {}
+        self.jobs: dict[str, JobDescription] = {}         # URL → job, in job list order
+        self.versions: dict[str, str] = {}                # URL → _version() of that job
+        self.scores: dict[tuple[str, str], ScoreResult] = {}  # (CV path, URL) → score, in ranking order
+
+    @property
+    def score_results(self) -> list[ScoreResult]:
+        return list(self.scores.values())
+
+    async def refresh(self, urls: list[str], writer: StreamWriter = lambda chunk: None) -> RefreshStats:
+        """Bring the ranking up to date with ``urls``; new scores are also written to ``writer``."""
+        if not self.parsed_cvs:
+            self.parsed_cvs = (await asyncio.to_thread(cv_parser, {"cv_paths": self.cv_paths}))["parsed_cvs"]
+
+        urls = list(dict.fromkeys(urls))
+        current = set(urls)
+        removed = [url for url in self.jobs if url not in current]
+        for url in removed:
+            del self.versions[url]
+        pool = shared_pool()
+        rechecked = [url for url in urls if url in self.jobs and _is_stale(pool, url)]
+        added = [url for url in urls if url not in self.jobs]
+        previous = dict(self.jobs)
+        changed = await self._parse(added + rechecked, pool)
+        self.jobs = {url: self.jobs[url] for url in urls if url in self.jobs}
+        await self._discard_embeddings(
+            {previous[url].job_description for url in removed + [url for url in changed if url in previous]}
+        )
+        added = [url for url in added if url in self.jobs]
+        stats = RefreshStats(
+            added=added, changed=[url for url in changed if url not in added],
+            removed=removed, rechecked=len(rechecked), scored=0,
+        )
+        if not changed and not removed:
+            return stats  # the ranking still holds
+
+        # Scores of removed or changed jobs are dropped; the rest are kept as they are
+        kept = {key: score for key, score in self.scores.items() if key[1] in self.jobs and key[1] not in changed}
+        state = {"parsed_cvs": self.parsed_cvs, "job_descriptions": list(self.jobs.values())}
+        many_jobs = route_after_collect_jobs(state) == "many_jobs"
+        if many_jobs:
+            selection = (await asyncio.to_thread(embedder, state))["cosine_results"]
+        else:
+            selection = {cv_path: [(job, None) for job in state["job_descriptions"]] for cv_path in self.parsed_cvs}
+        pending = {
+            cv_path: [(job, cosine) for job, cosine in ranked if (cv_path, job.source_url) not in kept]
+            for cv_path, ranked in selection.items()
+        }
+        stats.scored = sum(map(len, pending.values()))
+        new_scores = {}
+        if stats.scored:
+            if many_jobs:
+                to_score = {"parsed_cvs": self.parsed_cvs, "cosine_results": pending}
+            else:
+                jobs = {job.source_url: job for ranked in pending.values() for job, _ in ranked}
+                to_score = {"parsed_cvs": self.parsed_cvs, "job_descriptions": list(jobs.values())}
+            results = (await scorer(to_score, writer))["score_results"]
+            new_scores = {(score.candidate_reference, score.job_reference): score for score in results}
+
+        # The selection's order (cosine rank in Option B) with current cosine scores
+        self.scores = {}
+        for cv_path, ranked in selection.items():
+            for job, cosine in ranked:
+                key = (cv_path, job.source_url)
+                score = new_scores.get(key) or kept.get(key)
+                if score is not None:
+                    self.scores[key] = score.model_copy(update={"cosine_similarity_score": cosine})
+        return stats
+
+    async def _discard_embeddings(self, texts: set[str]) -> None:
+        """Drop stored embeddings of job descriptions no current job has, and compact the store past the threshold."""
+        texts -= {job.job_description for job in self.jobs.values()}
+        if not texts:
+            return
+        from cv_rank_agent.embedding_store import EmbeddingStore, text_key  # NumPy is only loaded when needed
+
+        def discard() -> int:
+            store = EmbeddingStore(settings.embedding_model)
+            store.discard([text_key(text) for text in texts])
+            return store.compact_if_needed(settings.embedding_compact_share)
+
+        reclaimed = await asyncio.to_thread(discard)
+        if reclaimed:
+            logger.info("Embedding store compacted — %d discarded row(s) reclaimed", reclaimed)
+            metrics.count("embedding_rows_reclaimed", reclaimed)
+
+    async def _parse(self, urls: list[str], pool: CrawlerPool) -> set[str]:
+        """Crawl and parse ``urls``; returns those whose job description is new or changed.
+
+        A URL that fails or is skipped is left out of the ranking and tried again on the next refresh.
+        """
+        if not urls:
+            return set()
+        llm, slots, store = chat_model(JobDescription, stage_model("job_parser")), llm_slots(), ArtifactStore()
+
+        async def parse(i: int, url: str) -> JobDescription | None:
+            try:
+                job, _, _ = await _parse_job(i, len(urls), url, pool, llm, slots, store)
+            except Exception as exc:  # one bad posting must not stop the watch
+                logger.warning("[%d/%d] Parsing failed for %s — retried on the next refresh: %s", i, len(urls), url, exc)
+                return None
+            return job
+
+        try:
+            jobs = await asyncio.gather(*(parse(i, url) for i, url in enumerate(urls, start=1)))
+        finally:
+            await close_shared_pool()  # free the browser between refreshes
+
+        changed = set()
+        for url, job in zip(urls, jobs):
+            if job is None:
+                continue
+            version = _version(job)
+            if self.versions.get(url) != version:
+                changed.add(url)
+            self.jobs[url], self.versions[url] = job, version
+        return changed
+
+
+async def watch(
+    cv_paths: list[str],
+    jobs_path: Path,
+    on_refresh: Callable[[IncrementalRanking, RefreshStats, metrics.RunMetrics], None],
+    writer: StreamWriter = lambda chunk: None,
+) -> None:
+    """Refresh the ranking whenever ``jobs_path`` changes and every ``settings.watch_interval`` seconds.
+
+    Runs until cancelled. A jobs file that is missing or invalid (e.g. caught
+    mid-write) is skipped until it changes again.
+    """
+    ranking = IncrementalRanking(cv_paths)
+    seen_mtime: int | None = None
+    last_refresh = float("-inf")
+    while True:
+        try:
+            mtime = jobs_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != seen_mtime or time.monotonic() - last_refresh >= settings.watch_interval:
+            seen_mtime, last_refresh = mtime, time.monotonic()
+            try:
+                urls = read_job_urls(jobs_path)
+            except (OSError, ValueError) as exc:
+                logger.warning("Jobs file not read, waiting for it to change: %s", exc)
+            else:
+                if len(urls) > settings.max_jobs:
+                    logger.warning("%d job URLs, only the first %d are ranked (MAX_JOBS)", len(urls), settings.max_jobs)
+                    urls = urls[: settings.max_jobs]
+                with metrics.recording() as run:
+                    stats = await ranking.refresh(urls, writer)
+                on_refresh(ranking, stats, run)
+        await asyncio.sleep(POLL_SECONDS)
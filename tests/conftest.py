@@ -0,0 +1,11 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+from cv_rank_agent.config import settings
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep every on-disk cache of a test inside its own tmp dir."""
+    monkeypatch.setattr(settings, "cache_dir", tmp_path / "cache")
@@ -1 +1,262 @@
 """Tests for the cv_parser node."""
+
+import os
+import tarfile
+import zipfile
+from concurrent.futures import Future
+
+import pymupdf
+import pytest
+from docx import Document
+
+from cv_rank_agent import escalation, metrics
+from cv_rank_agent.config import settings
+from cv_rank_agent.models import ParsedCV, WorkExperience
+from cv_rank_agent.nodes import cv_parser as cv_parser_module
+from cv_rank_agent.tools import cv_ingest
+from cv_rank_agent.tools.cv_layout import docx_lines, parse_layout
+
+
+class RecordingLLM:
+    """Records the prompts it is sent; returns ``reply`` built for the requested schema."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+        self.schemas = []
+
+    def __call__(self, schema, model=None):
+        self.schemas.append(schema)
+        return self
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return self.schemas[-1](**self.reply)
+
+
+def _use_llm(monkeypatch, reply):
+    llm = RecordingLLM(reply)
+    monkeypatch.setattr(cv_parser_module, "chat_model", llm)
+    monkeypatch.setattr(escalation, "chat_model", llm)
+    return llm
+
+
+def _write_pdf(path, lines):
+    """A one-page PDF; each line is (text, font size, bold)."""
+    doc = pymupdf.open()
+    page = doc.new_page()
+    y = 60
+    for text, size, bold in lines:
+        page.insert_text((50, y), text, fontsize=size, fontname="hebo" if bold else "helv")
+        y += size * 1.6
+    doc.save(path)
+    return str(path)
+
+
+def test_structured_docx_is_parsed_from_its_layout_without_the_llm(tmp_path, monkeypatch):
+    llm = _use_llm(monkeypatch, {})
+    document = Document()
+    document.add_paragraph("Ada Lovelace", style="Title")
+    document.add_paragraph("ada@example.com | +44 20 7946 0958 | London, UK")
+    document.add_heading("Profile", level=1)
+    document.add_paragraph("Engineer who turns analytical engines into production systems.")
+    document.add_heading("Skills", level=1)
+    document.add_paragraph("Python, SQL; Kubernetes (EKS, GKE)", style="List Bullet")
+    document.add_heading("Experience", level=1)
+    document.add_paragraph("Lead Engineer, Analytical Engines Ltd (Jan 2019 – Present)")
+    document.add_paragraph("Built the scheduling service.", style="List Bullet")
+    document.add_paragraph("Engineer | Babbage & Co | 2015 - 2018")
+    document.add_heading("Education", level=1)
+    document.add_paragraph("BSc Mathematics, University of London, 2015")
+    document.add_heading("Languages", level=1)
+    document.add_paragraph("English (native), French – B2")
+    document.save(tmp_path / "cv.docx")
+
+    with metrics.recording() as run:
+        result = cv_parser_module.cv_parser({"cv_paths": [str(tmp_path / "cv.docx")]})["parsed_cvs"]
+
+    cv = result[str(tmp_path / "cv.docx")]
+    assert (cv.name, cv.email, cv.phone, cv.location) == ("Ada Lovelace", "ada@example.com", "+44 20 7946 0958", "London, UK")
+    assert cv.summary == "Engineer who turns analytical engines into production systems."
+    assert cv.skills == ["Python", "SQL", "Kubernetes (EKS, GKE)"]
+    assert cv.experience == [
+        WorkExperience(company="Analytical Engines Ltd", role="Lead Engineer", duration="Jan 2019 – Present",
+                       description="Built the scheduling service."),
+        WorkExperience(company="Babbage & Co", role="Engineer", duration="2015 - 2018"),
+    ]
+    assert [(e.institution, e.degree, e.year) for e in cv.education] == [("University of London", "BSc Mathematics", "2015")]
+    assert [(lang.language, lang.proficiency) for lang in cv.languages] == [("English", "native"), ("French", "B2")]
+    assert cv.certifications == []
+    assert llm.prompts == []
+    assert [item["path"] for item in run.items] == ["layout"]
+
+
+def test_llm_extracts_only_the_sections_the_layout_left_open(tmp_path, monkeypatch):
+    llm = _use_llm(monkeypatch, {"experience": [{"company": "Acme", "role": "Staff Engineer"}], "location": "Zurich"})
+    cv_path = _write_pdf(tmp_path / "cv.pdf", [
+        ("Grace Hopper", 20, True),
+        ("grace@example.com", 10, False),
+        ("SKILLS", 13, True),
+        ("- Python, Go, PostgreSQL", 10, False),
+        ("EXPERIENCE", 13, True),
+        ("For ten years I led the compiler team at Acme, where we shipped three major releases.", 10, False),
+        ("EDUCATION", 13, True),
+        ("MSc Computer Science, ETH Zurich, 2015", 10, False),
+    ])
+
+    with metrics.recording() as run:
+        for _ in range(2):  # the second run is served from the artifact cache
+            cv = cv_parser_module.cv_parser({"cv_paths": [cv_path]})["parsed_cvs"][cv_path]
+
+    assert len(llm.prompts) == 1
+    prompt = llm.prompts[0]
+    assert "- experience:" in prompt and "- location:" in prompt and "- skills:" not in prompt
+    assert "compiler team" in prompt and "Grace Hopper" in prompt
+    assert "PostgreSQL" not in prompt and "ETH Zurich" not in prompt
+    assert set(llm.schemas[1].model_fields) == {"experience", "location"}
+    assert (cv.name, cv.location, cv.skills) == ("Grace Hopper", "Zurich", ["Python", "Go", "PostgreSQL"])
+    assert [(e.role, e.company) for e in cv.experience] == [("Staff Engineer", "Acme")]
+    assert [item["path"] for item in run.items] == ["layout+llm", "layout+cached"]
+
+
+def test_cv_without_recognizable_sections_goes_to_the_llm_whole(tmp_path, monkeypatch):
+    llm = _use_llm(monkeypatch, {"name": "Ada", "skills": ["Python"]})
+    cv_path = _write_pdf(tmp_path / "cv.pdf", [
+        ("Ada, a Python developer in London, looking for backend roles.", 10, False),
+    ])
+    assert cv_parser_module.cv_parser({"cv_paths": [cv_path]})["parsed_cvs"][cv_path] == ParsedCV(name="Ada", skills=["Python"])
+    assert llm.schemas == [ParsedCV] and "looking for backend roles" in llm.prompts[0]
+
+    monkeypatch.setattr(settings, "cv_layout_parser", False)
+    document = Document()
+    document.add_heading("Skills", level=1)
+    document.add_paragraph("Python")
+    document.add_heading("Languages", level=1)
+    document.add_paragraph("English")
+    document.save(tmp_path / "off.docx")
+    assert parse_layout(docx_lines(str(tmp_path / "off.docx"))) is not None
+    cv_parser_module.cv_parser({"cv_paths": [str(tmp_path / "off.docx")]})
+    assert llm.schemas == [ParsedCV, ParsedCV]
+
+
+def _cv_docx(path, name):
+    document = Document()
+    document.add_heading(name, level=1)
+    document.add_heading("Skills", level=2)
+    document.add_paragraph("Python, Go")
+    document.add_heading("Languages", level=2)
+    document.add_paragraph("English")
+    document.save(path)
+    return str(path)
+
+
+def _blank_pdf():
+    doc = pymupdf.open()
+    doc.new_page()
+    return doc.tobytes()
+
+
+def test_bulk_ingestion_extracts_in_a_process_pool_and_skips_unreadable_files(tmp_path):
+    export = tmp_path / "export"
+    export.mkdir()
+    _cv_docx(export / "a.docx", "Ada Lovelace")
+    (export / "b.docx").write_bytes((export / "a.docx").read_bytes())
+    (export / "c.pdf").write_bytes(b"%PDF-1.7 truncated")
+    (export / "notes.txt").write_text("not a CV")
+    doc = pymupdf.open()
+    doc.new_page().insert_text((50, 60), "Secret CV")
+    doc.save(export / "d.pdf", encryption=pymupdf.PDF_ENCRYPT_AES_256, user_pw="pw", owner_pw="pw")
+    with zipfile.ZipFile(export / "e.zip", "w") as zf:
+        zf.write(export / "a.docx", "hr/grace.docx")
+        zf.writestr("__MACOSX/hr/._grace.docx", b"resource fork")
+        zf.writestr("hr/blank.pdf", _blank_pdf())
+
+    records = list(cv_ingest.ingest_cvs([str(export)], workers=2, max_in_flight=2))
+
+    assert [record.path for record in records] == [
+        str(export / name) for name in ("a.docx", "b.docx", "c.pdf", "d.pdf", "e.zip!hr/grace.docx", "e.zip!hr/blank.pdf")
+    ]
+    a, b, c, d, grace, blank = records
+    assert "Ada Lovelace" in a.text and a.draft.fields["skills"] == ["Python", "Go"]
+    assert a.content_hash == b.content_hash == grace.content_hash
+    assert c.reason.startswith("unreadable file")
+    assert d.reason == "encrypted PDF (password required)"
+    assert blank.reason.startswith("no extractable text")
+
+
+def test_bulk_ingestion_skips_an_unreadable_tar_member_and_keeps_the_others(tmp_path):
+    archive = tmp_path / "export.tar"
+    with tarfile.open(archive, "w") as tar:
+        tar.add(_cv_docx(tmp_path / "ada.docx", "Ada Lovelace"), "hr/ada.docx")
+        tar.add(_cv_docx(tmp_path / "grace.docx", "Grace Hopper"), "hr/grace.docx")
+    with tarfile.open(archive) as tar:
+        grace = tar.getmember("hr/grace.docx")
+    with open(archive, "r+b") as f:
+        f.truncate(grace.offset_data + grace.size // 2)  # the export was cut off mid-member
+
+    ada, grace = cv_ingest.ingest_cvs([str(archive)], workers=1)
+
+    assert ada.path == f"{archive}!hr/ada.docx" and "Ada Lovelace" in ada.text
+    assert grace.path == f"{archive}!hr/grace.docx" and grace.reason.startswith("unreadable archive member")
+
+
+def _crashing_extract(path, data=None, layout=True):
+    """extract_cv, except that the worker process dies on a CV named crash.docx."""
+    if path.endswith("crash.docx"):
+        os._exit(1)
+    return cv_ingest.extract_cv(path, data, layout)
+
+
+def test_bulk_ingestion_skips_a_cv_that_crashes_its_worker_and_goes_on_in_a_fresh_pool(tmp_path, monkeypatch):
+    paths = [_cv_docx(tmp_path / f"{name}.docx", name.title()) for name in ("ada", "crash", "grace", "linus")]
+    monkeypatch.setattr(cv_ingest, "extract_cv", _crashing_extract)
+
+    records = list(cv_ingest.ingest_cvs(paths, workers=2, max_in_flight=3))
+
+    assert [record.path for record in records] == paths
+    assert records[1] == cv_ingest.SkippedCV(paths[1], "extraction worker crashed")
+    assert all(isinstance(record, cv_ingest.CVRecord) for i, record in enumerate(records) if i != 1)
+
+
+def test_bulk_ingestion_keeps_a_bounded_number_of_cvs_in_flight(tmp_path, monkeypatch):
+    paths = [_cv_docx(tmp_path / f"cv{i}.docx", f"Candidate Number{i}") for i in range(8)]
+    submitted = []
+
+    class InlineExecutor:
+        def __init__(self, workers, mp_context):
+            pass
+
+        def submit(self, fn, *args):
+            submitted.append(args[0])
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+        def shutdown(self, cancel_futures):
+            pass
+
+    monkeypatch.setattr(cv_ingest, "ProcessPoolExecutor", InlineExecutor)
+    consumed = 0
+    for record in cv_ingest.ingest_cvs(paths, workers=4, max_in_flight=3):
+        assert len(submitted) - consumed <= 3  # submitted and not yet consumed, this one included
+        assert record.path == paths[consumed]
+        consumed += 1
+    assert consumed == 8
+
+
+def test_cv_parser_skips_unreadable_cvs_and_parses_identical_ones_once(tmp_path, monkeypatch):
+    _use_llm(monkeypatch, {})
+    first = _cv_docx(tmp_path / "first.docx", "Ada Lovelace")
+    (tmp_path / "copy.docx").write_bytes((tmp_path / "first.docx").read_bytes())
+    (tmp_path / "broken.docx").write_bytes(b"not a zip")
+
+    with metrics.recording() as run:
+        parsed = cv_parser_module.cv_parser({"cv_paths": [str(tmp_path)]})["parsed_cvs"]
+
+    assert list(parsed) == [str(tmp_path / "copy.docx"), first]
+    assert parsed[first].name == "Ada Lovelace" and parsed[first] is parsed[str(tmp_path / "copy.docx")]
+    assert [item["path"] for item in run.items] == ["skipped", "layout", "duplicate"]
+    assert run.counter("cvs_skipped") == 1
+
+    with pytest.raises(ValueError, match="No readable CV"):
+        cv_parser_module.cv_parser({"cv_paths": [str(tmp_path / "broken.docx")]})
@@ -1 +1,215 @@
 """Tests for the embedder node."""
+
+import numpy as np
+import pytest
+
+from cv_rank_agent.cascade import CascadePolicy, EarlyStop
+from cv_rank_agent.config import settings
+from cv_rank_agent.embedding_store import EmbeddingStore, text_key
+from cv_rank_agent.lexical import BM25Index, reciprocal_rank_fusion, tokenize
+from cv_rank_agent.models import JobDescription, ParsedCV
+from cv_rank_agent.nodes import embedder as embedder_module
+from cv_rank_agent.similarity import IVFIndex, cosine_top_k, normalize_rows
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.sent: list[str] = []
+
+    def __call__(self, texts):
+        self.sent.extend(texts)
+        return [[float(len(text)), 1.0, 0.0] for text in texts]
+
+
+def test_embedding_store_only_embeds_unseen_texts(tmp_path):
+    embed = FakeEmbeddings()
+    store = EmbeddingStore("test-model", directory=tmp_path)
+
+    first = store.embed(["a", "bb"], embed)
+    second = EmbeddingStore("test-model", directory=tmp_path).embed(["bb", "ccc", "a"], embed)
+
+    assert embed.sent == ["a", "bb", "ccc"]
+    assert first.dtype == np.float32 and first.shape == (2, 3)
+    np.testing.assert_array_equal(second[:, 0], [2.0, 3.0, 1.0])
+    assert isinstance(store.matrix(), np.memmap)
+
+
+def test_embedding_store_compaction_reclaims_discarded_rows(tmp_path):
+    embed = FakeEmbeddings()
+    store = EmbeddingStore("test-model", directory=tmp_path, dtype="float16")
+    store.embed(["a", "bb", "ccc"], embed)
+
+    store.discard([text_key("bb")])
+    assert store.compact() == 1
+    assert store.matrix().shape == (2, 3)
+    np.testing.assert_array_equal(store.embed(["ccc", "a"], embed)[:, 0], [3.0, 1.0])
+    assert embed.sent == ["a", "bb", "ccc"]
+
+
+def test_embedding_store_reader_is_not_misled_by_a_concurrent_compaction(tmp_path, monkeypatch):
+    embed = FakeEmbeddings()
+    store = EmbeddingStore("test-model", directory=tmp_path)
+    store.embed(["a", "bb", "ccc"], embed)
+    store.discard([text_key("a")])
+    other_run = EmbeddingStore("test-model", directory=tmp_path)
+    read_rows = EmbeddingStore._rows
+    compacted = []
+
+    def rows_then_compact(self, conn, keys):
+        found = read_rows(self, conn, keys)
+        if self is store and not compacted:  # another run compacts between this read and the file mapping
+            compacted.append(other_run.compact())
+        return found
+
+    monkeypatch.setattr(EmbeddingStore, "_rows", rows_then_compact)
+    vectors = store.embed(["ccc", "bb"], embed)
+
+    assert compacted == [1]
+    np.testing.assert_array_equal(vectors[:, 0], [3.0, 2.0])
+    assert embed.sent == ["a", "bb", "ccc"]
+
+
+def test_embedding_store_failed_compaction_keeps_the_old_generation(tmp_path):
+    embed = FakeEmbeddings()
+    store = EmbeddingStore("test-model", directory=tmp_path)
+    store.embed(["a", "bb", "ccc"], embed)
+    store.discard([text_key("a")])
+    files = sorted(tmp_path.glob("*.bin"))
+
+    def fail(fd):
+        raise OSError("disk full")
+
+    with pytest.MonkeyPatch.context() as patch, pytest.raises(OSError):
+        patch.setattr("cv_rank_agent.embedding_store.os.fsync", fail)
+        store.compact()
+
+    assert sorted(tmp_path.glob("*.bin")) == files and store.dead_rows() == 1
+    np.testing.assert_array_equal(store.embed(["ccc", "bb"], embed)[:, 0], [3.0, 2.0])
+    assert store.compact() == 1 and [path.name for path in tmp_path.glob("*.bin")] == ["test-model.float32.1.bin"]
+
+
+def test_cosine_top_k_matches_full_sort():
+    rng = np.random.default_rng(1)
+    matrix = normalize_rows(rng.normal(size=(200, 16)))
+    query = normalize_rows(rng.normal(size=16))
+
+    indices, scores = cosine_top_k(query, matrix, 10)
+
+    expected = np.argsort(-(matrix @ query))[:10]
+    np.testing.assert_array_equal(indices, expected)
+    np.testing.assert_allclose(scores, (matrix @ query)[expected], rtol=1e-6)
+    assert len(cosine_top_k(query, matrix[:3], 10)[0]) == 3
+
+
+def test_ivf_index_finds_exact_neighbours_when_probing_all_lists():
+    rng = np.random.default_rng(2)
+    matrix = normalize_rows(rng.normal(size=(500, 16)))
+    query = normalize_rows(rng.normal(size=16))
+
+    index = IVFIndex(matrix, n_lists=8, n_probe=8)
+
+    np.testing.assert_array_equal(index.search(query, 5)[0], cosine_top_k(query, matrix, 5)[0])
+
+
+def test_embedder_ranks_every_cv_against_shared_job_matrix(monkeypatch):
+    class AxisEmbeddings:
+        """Embeds text on the axis named by its first word."""
+
+        def __init__(self, **kwargs):
+            pass
+
+        def embed_documents(self, texts):
+            axes = {"python": [1.0, 0.0, 0.0], "java": [0.0, 1.0, 0.0], "sales": [0.0, 0.0, 1.0]}
+            return [axes[text.split()[0].lower()] for text in texts]
+
+    monkeypatch.setattr(embedder_module, "embeddings", AxisEmbeddings)
+    monkeypatch.setattr(settings, "llm_top_n", 1)
+    jobs = [
+        JobDescription(title=t, job_description=f"{t} role", source_url=f"https://example.com/{t}")
+        for t in ("sales", "java", "python")
+    ]
+    cvs = {"alice.pdf": ParsedCV(name="Alice", summary="Python developer"), "bob.pdf": ParsedCV(name="Bob", summary="Java developer")}
+
+    result = embedder_module.embedder({"parsed_cvs": cvs, "job_descriptions": jobs})
+
+    assert [job.title for job, _ in result["cosine_results"]["alice.pdf"]] == ["python"]
+    assert [job.title for job, _ in result["cosine_results"]["bob.pdf"]] == ["java"]
+    assert result["cosine_results"]["alice.pdf"][0][1] == 1.0
+
+
+def test_cascade_policy_floor_knee_and_budget():
+    ranked = [("a", 0.81), ("b", 0.79), ("c", 0.62), ("d", 0.60), ("e", 0.40)]
+
+    assert CascadePolicy(top_n=4).select({"cv": ranked}) == {"cv": ranked[:4]}
+    assert CascadePolicy(top_n=2).cut([("a", 0.1), ("b", -0.2)]) == [("a", 0.1), ("b", -0.2)]  # no floor by default
+    assert CascadePolicy(top_n=5, min_similarity=0.5).cut(ranked) == ranked[:4]
+    assert CascadePolicy(top_n=5, knee_gap=0.1).cut(ranked) == ranked[:2]
+    # The budget goes to the best cosine scores across all CVs
+    budgeted = CascadePolicy(top_n=5, call_budget=3).select({"cv1": ranked, "cv2": [("x", 0.80), ("y", 0.3)]})
+    assert budgeted == {"cv1": [("a", 0.81), ("b", 0.79)], "cv2": [("x", 0.80)]}
+
+
+def test_early_stop_once_lower_cosine_cannot_enter_top_n():
+    early_stop = EarlyStop(2)
+    assert early_stop.can_improve(0.80)  # fewer than N jobs scored
+    for cosine, fit in [(0.80, 0.90), (0.75, 0.80), (0.70, 0.74)]:
+        early_stop.record(cosine, fit)
+
+    assert early_stop.can_improve(0.745)  # bound still above the 2nd-best fit
+    assert not early_stop.can_improve(0.60)
+    assert EarlyStop(0).can_improve(0.0)
+
+
+def test_tokenize_folds_synonyms_and_phrases():
+    assert tokenize("Python3, Node.js, K8s and Postgres on Amazon Web Services") == [
+        "python", "nodejs", "kubernetes", "postgresql", "aws",
+    ]
+    assert tokenize("C++ / C# / .NET — machine learning") == ["cpp", "csharp", "dotnet", "ml"]
+    assert tokenize("Node JS and TensorFlow") == ["nodejs", "tensorflow"]
+
+
+def test_tokenize_keeps_ambiguous_abbreviations_apart():
+    assert tokenize("Kubernetes node pools, TF modules, AI products") == [
+        "kubernetes", "node", "pools", "tf", "modules", "ai", "products",
+    ]
+    assert "ml" not in tokenize("AI") and "terraform" not in tokenize("TF") and "nodejs" not in tokenize("node")
+
+
+def test_bm25_index_is_incremental_and_ranks_rare_terms_higher():
+    index = BM25Index()
+    index.extend([tokenize("python django"), tokenize("python kubernetes"), tokenize("java spring")])
+    scores = index.scores(tokenize("Python k8s"))
+    assert scores.argmax() == 1 and scores[2] == 0
+
+    index.add(tokenize("kubernetes kubernetes python"))
+    assert len(index) == 4 and index.scores(tokenize("k8s")).argmax() == 3
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([np.array([0, 1, 2]), np.array([1, 3])], k=60)
+    assert max(fused, key=fused.get) == 1
+    assert fused[3] == 1 / 62
+
+
+def test_embedder_fuses_lexical_skill_matches(monkeypatch):
+    class FlatEmbeddings:
+        """Every job is equally similar to the CV, so only BM25 can break the tie."""
+
+        def __init__(self, **kwargs):
+            pass
+
+        def embed_documents(self, texts):
+            return [[1.0, 0.0] for _ in texts]
+
+    monkeypatch.setattr(embedder_module, "embeddings", FlatEmbeddings)
+    monkeypatch.setattr(settings, "llm_top_n", 1)
+    monkeypatch.setattr(settings, "lexical_fusion", True)
+    jobs = [
+        JobDescription(title=t, requirements=reqs, job_description=f"{t} role", source_url=t)
+        for t, reqs in (("sales", ["Negotiation"]), ("platform", ["Kubernetes", "Terraform"]), ("web", ["React"]))
+    ]
+    cvs = {"ops.pdf": ParsedCV(name="Ops", skills=["k8s", "terraform"])}
+
+    result = embedder_module.embedder({"parsed_cvs": cvs, "job_descriptions": jobs})
+
+    assert [(job.title, score) for job, score in result["cosine_results"]["ops.pdf"]] == [("platform", 1.0)]
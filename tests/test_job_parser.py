@@ -1 +1,329 @@
 """Tests for the job_parser node."""
+
+import asyncio
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+from cv_rank_agent import escalation, metrics
+from cv_rank_agent import graph as graph_module
+from cv_rank_agent.artifacts import ArtifactStore
+from cv_rank_agent.checkpoints import checkpointer
+from cv_rank_agent.clients import ChatModel
+from cv_rank_agent.config import settings
+from cv_rank_agent.models import JobDescription, ParsedCV
+from cv_rank_agent.nodes import job_parser as job_parser_module
+from cv_rank_agent.tools.content_prune import prune_markdown
+from cv_rank_agent.tools.crawl_cache import CrawlCache, CrawledPage, normalize_url
+from cv_rank_agent.tools.structured_data import extract_job_posting
+from cv_rank_agent.tools.tokens import estimate_tokens, truncate_to_tokens
+from cv_rank_agent.tools.web_crawl import CrawlerPool
+
+PAGES = Path(__file__).parent / "fixtures" / "pages"
+
+
+class FakePool:
+    """Stands in for CrawlerPool; later URLs finish crawling first."""
+
+    def __init__(self, *args, **kwargs):
+        self.cache = CrawlCache()
+        self.delays = {}
+        self.fetched = threading.Event()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def fetch(self, url):
+        await asyncio.sleep(self.delays.get(url, 0))
+        self.fetched.set()
+        return CrawledPage(url=url, markdown=f"content of {url}")
+
+
+class FakeLLM:
+    def with_structured_output(self, schema):
+        return self
+
+    async def ainvoke(self, prompt):
+        title = prompt.rsplit("content of ", 1)[1].strip()
+        return JobDescription(title=title, job_description="desc", source_url="")
+
+
+def _use_fakes(monkeypatch, pool):
+    async def close_shared_pool():
+        return None
+
+    monkeypatch.setattr(job_parser_module, "shared_pool", lambda: pool)
+    monkeypatch.setattr(job_parser_module, "close_shared_pool", close_shared_pool)
+    monkeypatch.setattr(job_parser_module, "chat_model", lambda schema, model=None: FakeLLM())
+
+
+def test_job_parser_tasks_are_collected_in_url_order(monkeypatch):
+    urls = [f"https://example.com/jobs/{i}" for i in range(5)]
+    pool = FakePool()
+    pool.delays = {url: 0.01 * (len(urls) - i) for i, url in enumerate(urls)}
+    _use_fakes(monkeypatch, pool)
+
+    async def run():
+        sends = job_parser_module.fan_out_jobs({"job_urls": urls})
+        outputs = await asyncio.gather(*(job_parser_module.job_parser(send.arg) for send in sends))
+        # The reducer appends in completion order, which is arbitrary
+        parsed = [item for output in reversed(outputs) for item in output["parsed_jobs"]]
+        return await job_parser_module.collect_jobs({"parsed_jobs": parsed})
+
+    result = asyncio.run(run())
+
+    assert [job.source_url for job in result["job_descriptions"]] == urls
+    assert [job.title for job in result["job_descriptions"]] == urls
+
+
+def test_graph_parses_cv_while_jobs_are_crawled(monkeypatch):
+    pool = FakePool()
+    _use_fakes(monkeypatch, pool)
+
+    def cv_parser(state):
+        # Deadlocks (and times out) if job crawling only starts after CV parsing
+        assert pool.fetched.wait(timeout=5)
+        return {"parsed_cvs": {"cv.pdf": ParsedCV(name="Ada")}}
+
+    seen = {}
+
+    async def recording_scorer(state):
+        seen["jobs"] = [job.title for job in state["job_descriptions"]]
+        seen["cvs"] = list(state["parsed_cvs"])
+        return {"score_results": []}
+
+    monkeypatch.setattr(graph_module, "cv_parser", cv_parser)
+    monkeypatch.setattr(graph_module, "scorer", recording_scorer)
+    urls = [f"https://example.com/jobs/{i}" for i in range(3)]
+
+    asyncio.run(graph_module.build_graph().ainvoke({"cv_paths": ["cv.pdf"], "job_urls": urls}))
+
+    assert seen == {"jobs": urls, "cvs": ["cv.pdf"]}
+
+
+def test_resumed_run_only_redoes_unfinished_jobs(monkeypatch):
+    pool = FakePool()
+    _use_fakes(monkeypatch, pool)
+    urls = [f"https://example.com/jobs/{i}" for i in range(4)]
+    pool.delays = {urls[3]: 0.05}  # still crawling when job 2 fails
+    fetched = []
+    fetch = pool.fetch
+
+    async def flaky_fetch(url):
+        fetched.append(url)
+        if url == urls[2] and fetched.count(url) == 1:
+            await asyncio.sleep(0.01)  # after jobs 0 and 1 finished
+            raise TimeoutError("browser crashed")
+        return await fetch(url)
+
+    pool.fetch = flaky_fetch
+
+    async def scorer(state):
+        return {"score_results": []}
+
+    monkeypatch.setattr(graph_module, "cv_parser", lambda state: {"parsed_cvs": {"cv.pdf": ParsedCV(name="Ada")}})
+    monkeypatch.setattr(graph_module, "scorer", scorer)
+    config = {"configurable": {"thread_id": "run-1"}}
+
+    async def run():
+        async with checkpointer() as saver:
+            graph = graph_module.build_graph(saver)
+            try:
+                await graph.ainvoke({"cv_paths": ["cv.pdf"], "job_urls": urls}, config)
+            except TimeoutError:
+                pass
+            first = list(fetched)
+            await graph.ainvoke(None, config)  # --resume
+            return first, (await graph.aget_state(config)).values
+
+    first, state = asyncio.run(run())
+
+    assert fetched[len(first):] == [urls[2], urls[3]]  # jobs 0 and 1 finished before the failure
+    assert [job.title for job in state["job_descriptions"]] == urls
+
+
+class StageLLM(ChatModel):
+    """A small model that leaves fields empty or returns invalid output for some pages, and a large one that does not."""
+
+    async def ainvoke(self, prompt):
+        page = prompt.rsplit("content of ", 1)[1].strip()
+        if self.model == settings.llm_model:
+            return JobDescription(title="Large", job_description="desc", requirements=["Python"], source_url="")
+        if page == "broken":
+            raise ValueError("malformed structured output")
+        return JobDescription(title="" if page == "sparse" else "Small", job_description="desc", requirements=["Go"], source_url="")
+
+
+def test_incomplete_extraction_escalates_to_the_large_model(monkeypatch):
+    monkeypatch.setattr(settings, "job_parser_model", "small:1b")
+    monkeypatch.setattr(escalation, "chat_model", StageLLM)
+
+    async def parse(url):
+        llm = StageLLM(JobDescription, escalation.stage_model("job_parser"))
+        return await job_parser_module._parse_job(1, 1, url, FakePool(), llm, asyncio.Semaphore(1), ArtifactStore())
+
+    with metrics.recording() as run:
+        results = [asyncio.run(parse(url)) for url in ("complete", "sparse", "broken")]
+
+    assert [(job.title, model) for job, _, model in results] == [
+        ("Small", "small:1b"), ("Large", settings.llm_model), ("Large", settings.llm_model),
+    ]
+    assert run.counter("llm_escalations", node="job_parser") == 2
+    assert escalation.missing_fields(JobDescription(title=" ", job_description="d", source_url="")) == [
+        "title", "requirements or responsibilities",
+    ]
+
+    # The escalated result is cached under the model that produced it
+    job, path, model = asyncio.run(parse("sparse"))
+    assert (job.title, path, model) == ("Large", "cached", None)
+    monkeypatch.setattr(settings, "escalate_extraction", False)
+    job, path, model = asyncio.run(parse("sparse"))
+    assert (job.title, path, model) == ("", "llm", "small:1b")
+
+
+def test_normalize_url_drops_tracking_and_trailing_slash():
+    assert normalize_url("HTTPS://www.LinkedIn.com:443/jobs/view/42/?trackingId=abc&refId=x#top") == (
+        "https://www.linkedin.com/jobs/view/42"
+    )
+    assert normalize_url("https://example.com/jobs?b=2&a=1&utm_source=x") == "https://example.com/jobs?a=1&b=2"
+
+
+def test_crawl_cache_roundtrip_and_ttl(tmp_path):
+    cache = CrawlCache(tmp_path / "crawl.sqlite3", ttl_hours=1)
+    cache.put(CrawledPage(url="https://example.com/jobs/1/", markdown="# Job", etag='"v1"'))
+
+    page, is_fresh = cache.get("https://example.com/jobs/1")
+    assert page.markdown == "# Job" and page.etag == '"v1"'
+    assert is_fresh
+
+    stale = CrawlCache(tmp_path / "crawl.sqlite3", ttl_hours=0)
+    assert stale.get("https://example.com/jobs/1")[1] is False
+    assert stale.get("https://example.com/jobs/2") is None
+
+
+class FakeCrawler:
+    """Stands in for AsyncWebCrawler; every crawl returns the same page and validators."""
+
+    def __init__(self):
+        self.crawled = []
+
+    async def arun(self, url):
+        self.crawled.append(url)
+        return SimpleNamespace(markdown="# Job", html="<h1>Job</h1>", response_headers={"ETag": '"v1"'})
+
+
+def _job_board(etag):
+    """A local server answering conditional GETs: 304 while If-None-Match is ``etag["current"]``."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(304 if self.headers.get("If-None-Match") == etag["current"] else 200)
+            self.send_header("ETag", etag["current"])
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_expired_page_is_revalidated_instead_of_crawled_again():
+    etag = {"current": '"v1"'}
+    server = _job_board(etag)
+    url = f"http://127.0.0.1:{server.server_port}/jobs/1"
+    pool = CrawlerPool(CrawlCache(ttl_hours=1))
+    pool._crawler = crawler = FakeCrawler()
+
+    def expire():
+        with sqlite3.connect(pool.cache.path) as conn:
+            conn.execute("UPDATE pages SET fetched_at = fetched_at - 7200")
+
+    async def run():
+        first = await pool.fetch(url)
+        expire()
+        with metrics.recording() as run:
+            revalidated = await pool.fetch(url)
+        fresh_again = pool.cache.get(url)[1]
+        etag["current"] = '"v2"'
+        expire()
+        await pool.fetch(url)
+        return first, revalidated, fresh_again, run
+
+    try:
+        first, revalidated, fresh_again, run = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    assert revalidated == first and first.etag == '"v1"'
+    assert fresh_again  # the entry's expiry was renewed
+    assert run.counter("crawl_cache_lookups", outcome="revalidated") == 1
+    assert pool.cache.stats.revalidated == 1
+    assert crawler.crawled == [url, url]  # crawled again only once the page changed
+
+
+def test_extract_job_posting_from_json_ld():
+    job = extract_job_posting((PAGES / "jsonld_backend_engineer.html").read_text(), "https://example.com/jobs/1")
+
+    assert job.title == "Senior Backend Engineer (Python)"
+    assert job.company == "Acme Analytics"
+    assert job.location == "Berlin, DE; Remote"
+    assert "Strong PostgreSQL and SQL skills" in job.requirements
+    assert "Mentor engineers and review code" in job.responsibilities
+    assert job.source_url == "https://example.com/jobs/1"
+
+
+def test_extract_job_posting_from_microdata():
+    job = extract_job_posting((PAGES / "microdata_data_scientist.html").read_text(), "https://example.com/jobs/2")
+
+    assert (job.title, job.company, job.location) == ("Data Scientist", "Beta Retail", "Amsterdam, NL")
+    assert job.requirements == [
+        "MSc in a quantitative field",
+        "3+ years with Python, pandas and scikit-learn",
+        "Experience with A/B testing",
+    ]
+
+
+def test_extract_job_posting_requires_structured_data():
+    assert extract_job_posting("<html><body><h1>Engineer</h1></body></html>", "https://example.com") is None
+
+
+def test_prune_markdown_keeps_listing_and_drops_boilerplate():
+    markdown = (PAGES / "linkedin_ml_engineer.md").read_text()
+    pruned = prune_markdown(markdown, max_tokens=4000)
+
+    assert pruned.startswith("# Machine Learning Engineer")
+    assert "Strong Python; working knowledge of SQL" in pruned
+    assert "Train, evaluate and deploy ranking models with PyTorch" in pruned
+    for junk in ("Sign in", "cookies", "Similar jobs", "Privacy Policy", "https://"):
+        assert junk not in pruned
+    assert estimate_tokens(pruned) < estimate_tokens(markdown) / 4
+
+
+def test_prune_markdown_keeps_requirements_that_mention_ui_words():
+    requirements = [
+        "- Experience building OAuth sign in and single sign-on flows",
+        "- Familiarity with cookie-based session management",
+        "- Able to log in to production systems during on-call",
+        "- Knowledge of copyright and licensing compliance for OSS",
+        "- Cookie policy and consent banners under GDPR",
+        "- Python, PostgreSQL",
+    ]
+    markdown = "\n".join([
+        "# Backend Engineer", "Sign in", "We use cookies to improve your experience. Accept all",
+        "## Requirements", *requirements, "- Show more", "© 2026 Example Jobs",
+    ])
+
+    assert prune_markdown(markdown, max_tokens=4000) == "\n".join(["# Backend Engineer", "## Requirements", *requirements])
+
+
+def test_prune_markdown_enforces_token_budget():
+    markdown = (PAGES / "linkedin_ml_engineer.md").read_text()
+    assert estimate_tokens(prune_markdown(markdown, max_tokens=50)) <= 50
+    assert truncate_to_tokens("one two three four", 2) == "one two"
@@ -1 +1,301 @@
 """Tests for the scorer node."""
+
+import asyncio
+import json
+import re
+from pathlib import Path
+from typing import TypedDict
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.graph import END, START, StateGraph
+
+from cv_rank_agent import metrics
+from cv_rank_agent.artifacts import ArtifactStore, artifact_key
+from cv_rank_agent.checkpoints import discard_progress, progress_store
+from cv_rank_agent.config import settings
+from cv_rank_agent.models import JobDescription, ParsedCV, ScoreBatch, ScoreResult, WorkExperience
+from cv_rank_agent.__main__ import stream_results
+from cv_rank_agent.nodes import scorer as scorer_module
+from cv_rank_agent.prompts.scorer import SCORER_PROMPT
+from cv_rank_agent.tools.structured_data import extract_job_posting
+from cv_rank_agent.tools.tokens import estimate_tokens
+
+PAGES = Path(__file__).parent / "fixtures" / "pages"
+
+JOB = JobDescription(title="Backend Engineer", requirements=["Python"], job_description="Build APIs.", source_url="u1")
+
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        return ScoreResult(
+            job_reference="", overall_fit_score=0.8, skill_match_score=0.7,
+            experience_match_score=0.6, llm_explanation="ok",
+        )
+
+
+def test_score_reuses_artifact_for_identical_input():
+    llm, store = CountingLLM(), ArtifactStore()
+
+    slots = asyncio.Semaphore(1)
+
+    async def run():
+        first = await scorer_module._score("CV text", JOB, llm, store, slots)
+        second = await scorer_module._score("CV text", JOB, llm, store, slots)
+        await scorer_module._score("Other CV", JOB, llm, store, slots)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert llm.calls == 2
+    assert second.overall_fit_score == first.overall_fit_score
+    assert (store.stats.hits, store.stats.misses) == (1, 2)
+
+
+def test_resumed_run_reuses_scores_without_the_artifact_cache(monkeypatch):
+    monkeypatch.setattr(settings, "artifact_cache", False)
+    llm, slots = CountingLLM(), asyncio.Semaphore(1)
+    config = {"configurable": {"thread_id": "run-1"}}
+
+    async def score(store):
+        return await scorer_module._score("CV text", JOB, llm, store, slots)
+
+    asyncio.run(score(progress_store(config)))
+    asyncio.run(score(progress_store(config)))  # the resumed run
+    asyncio.run(score(progress_store()))         # not checkpointed: nothing is kept
+    discard_progress("run-1")
+    asyncio.run(score(progress_store(config)))
+
+    assert llm.calls == 3
+
+
+def test_artifact_key_changes_with_prompt_and_model():
+    base = artifact_key("prompt v1 {content}", "text")
+    assert artifact_key("prompt v1 {content}", "text") == base
+    assert artifact_key("prompt v2 {content}", "text") != base
+    assert artifact_key("prompt v1 {content}", "text", model="other-model") != base
+
+
+def test_scorer_runs_concurrently_keeps_order_and_isolates_failures(monkeypatch):
+    jobs = [
+        JobDescription(title=f"Job {i}", job_description=f"Description {i}", source_url=f"https://example.com/{i}")
+        for i in range(6)
+    ]
+    in_flight = peak = 0
+
+    class SlowLLM:
+        def with_structured_output(self, schema):
+            return self
+
+        async def ainvoke(self, prompt):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            number = int(prompt.rsplit("Description ", 1)[1].split()[0])
+            await asyncio.sleep(0.01 * (6 - number))  # later jobs finish first
+            in_flight -= 1
+            if number == 3:
+                raise ValueError("malformed structured output")
+            return ScoreResult(
+                job_reference="", overall_fit_score=number / 10, skill_match_score=0.5,
+                experience_match_score=0.5, llm_explanation="ok",
+            )
+
+    monkeypatch.setattr(scorer_module, "chat_model", lambda schema, model=None: SlowLLM())
+    monkeypatch.setattr(scorer_module.settings, "llm_concurrency", 3)
+    state = {"parsed_cvs": {"cv.pdf": ParsedCV(name="Ada")}, "job_descriptions": jobs}
+
+    emitted = []
+    results = asyncio.run(scorer_module.scorer(state, emitted.append))["score_results"]
+
+    assert [r.job_reference for r in results] == [job.source_url for job in jobs if job.title != "Job 3"]
+    # Streamed in completion order, as soon as each score is ready
+    assert sorted(chunk["score_result"].job_reference for chunk in emitted) == sorted(r.job_reference for r in results)
+    assert emitted[0]["score_result"].job_reference != jobs[0].source_url
+    assert all(r.candidate_reference == "cv.pdf" for r in results)
+    assert peak == 3
+
+
+class BatchingLLM:
+    """Answers SCORER_PROMPT with one score and SCORER_BATCH_PROMPT with one score per listed job."""
+
+    def __init__(self, schema, calls, drop=False):
+        self.schema, self.calls, self.drop = schema, calls, drop
+
+    async def ainvoke(self, prompt):
+        references = re.findall(r"reference: (job-\d+)", prompt)
+        self.calls.append(len(references) if self.schema is ScoreBatch else 1)
+        descriptions = re.findall(r"Description (\d+)", prompt)
+        scores = [
+            ScoreResult(
+                job_reference=reference, overall_fit_score=int(number) / 10, skill_match_score=0.5,
+                experience_match_score=0.5, llm_explanation="ok",
+            )
+            for reference, number in zip(references or [""], descriptions)
+        ]
+        if self.schema is ScoreResult:
+            return scores[0]
+        return ScoreBatch(scores=scores[:-1] if self.drop else scores[::-1])  # in any order
+
+
+def _batch_state(n):
+    jobs = [
+        JobDescription(title=f"Job {i}", job_description=f"Description {i}", source_url=f"https://example.com/{i}")
+        for i in range(n)
+    ]
+    return {"parsed_cvs": {"cv.pdf": ParsedCV(name="Ada")}, "cosine_results": {"cv.pdf": [(job, 0.9) for job in jobs]}}
+
+
+def test_scorer_batches_jobs_per_call_and_caches_each_job(monkeypatch):
+    calls = []
+    monkeypatch.setattr(scorer_module, "chat_model", lambda schema, model=None: BatchingLLM(schema, calls))
+    monkeypatch.setattr(settings, "scorer_batch_size", 2)
+    state = _batch_state(5)
+
+    results = asyncio.run(scorer_module.scorer(state))["score_results"]
+    first_calls = list(calls)
+    monkeypatch.setattr(settings, "scorer_batch_size", 4)
+    rerun = asyncio.run(scorer_module.scorer(state))["score_results"]
+
+    assert first_calls == [2, 2, 1]  # the last job alone goes through SCORER_PROMPT
+    assert [r.job_reference for r in results] == [job.source_url for job, _ in state["cosine_results"]["cv.pdf"]]
+    assert [r.overall_fit_score for r in results] == [0.0, 0.1, 0.2, 0.3, 0.4]
+    assert all(r.cosine_similarity_score == 0.9 and r.candidate_reference == "cv.pdf" for r in results)
+    assert calls == first_calls and rerun == results  # other batch boundaries, same per-job cache entries
+
+
+def test_malformed_batch_falls_back_to_single_job_scoring(monkeypatch):
+    calls = []
+    monkeypatch.setattr(scorer_module, "chat_model", lambda schema, model=None: BatchingLLM(schema, calls, drop=True))
+    monkeypatch.setattr(settings, "scorer_batch_size", 3)
+
+    with metrics.recording() as run:
+        results = asyncio.run(scorer_module.scorer(_batch_state(3)))["score_results"]
+
+    assert calls == [3, 1, 1, 1]
+    assert [r.overall_fit_score for r in results] == [0.0, 0.1, 0.2]
+    assert run.counter("scorer_batch_fallbacks") == 1
+
+
+def test_batches_close_before_overflowing_the_context_window(monkeypatch):
+    jobs = [(JobDescription(title=f"Job {i}", job_description="word " * 400, source_url=str(i)), None) for i in range(6)]
+    monkeypatch.setattr(settings, "scorer_batch_size", 4)
+
+    assert [len(group) for group in scorer_module._group(jobs, "CV text")] == [4, 2]
+    monkeypatch.setattr(settings, "ollama_num_ctx", 2500)
+    assert [len(group) for group in scorer_module._group(jobs, "CV text")] == [2, 2, 2]
+
+
+def test_scoring_prompt_drops_repeated_description_and_keeps_requirements_within_budget(monkeypatch):
+    job = extract_job_posting((PAGES / "jsonld_backend_engineer.html").read_text(encoding="utf-8"), "u1")
+    text = scorer_module._job_prompt_text(job, "CV text")
+
+    assert text.count("Own the event ingestion pipeline end to end") == 1
+    assert text.count("Strong PostgreSQL and SQL skills") == 1
+    assert "What you'll do" not in text and "We offer flexible hours" in text
+    assert estimate_tokens(text) < estimate_tokens(scorer_module._get_job_content_text(job))
+
+    monkeypatch.setattr(settings, "scorer_prompt_max_tokens", estimate_tokens(SCORER_PROMPT) + 90)
+    trimmed = scorer_module._job_prompt_text(job, "CV text")
+    assert estimate_tokens(trimmed) <= 90 - estimate_tokens("CV text")
+    assert all(requirement in trimmed for requirement in job.requirements)
+    assert "Description:" not in trimmed and "Responsibilities:" in trimmed
+
+
+def test_long_cv_is_trimmed_oldest_description_first_and_prompt_size_is_recorded(monkeypatch):
+    cv = ParsedCV(name="Ada", summary="Backend engineer.", skills=["Python", "Go"], experience=[
+        WorkExperience(company=f"Company {n}", role="Engineer", description=f"Project {n} " + "detail " * 60)
+        for n in range(3)
+    ])
+    full = scorer_module._cv_prompt_text(cv)
+    monkeypatch.setattr(settings, "ollama_num_ctx", estimate_tokens(SCORER_PROMPT) + scorer_module.SCORE_OUTPUT_TOKENS + 300)
+    trimmed = scorer_module._cv_prompt_text(cv)
+
+    assert estimate_tokens(trimmed) <= 150 < estimate_tokens(full)
+    assert "Skills: Python, Go" in trimmed and all(f"Engineer at Company {n}" in trimmed for n in range(3))
+    assert "Project 0" in trimmed and "Project 2" not in trimmed
+
+    monkeypatch.setattr(scorer_module, "chat_model", lambda schema, model=None: CountingLLM())
+    with metrics.recording() as run:
+        asyncio.run(scorer_module.scorer({"parsed_cvs": {"cv.pdf": cv}, "job_descriptions": [JOB]}))
+    item = run.items[0]
+    assert item["prompt_tokens"] == estimate_tokens(SCORER_PROMPT) + estimate_tokens(trimmed) + estimate_tokens(
+        scorer_module._job_prompt_text(JOB, trimmed)
+    )
+    assert run.counter("scorer_prompt_tokens") == item["prompt_tokens"]
+
+
+def test_stream_results_writes_ndjson_events(capsys):
+    score = ScoreResult(
+        job_reference="u1", candidate_reference="cv.pdf", overall_fit_score=0.9, skill_match_score=0.8,
+        experience_match_score=0.7, llm_explanation="ok", cosine_similarity_score=0.5,
+    )
+
+    class FakeGraph:
+        async def astream(self, inputs, config=None, *, stream_mode, durability=None):
+            yield "updates", {"cv_parser": {"parsed_cvs": {}}}
+            yield "updates", {"embedder": {"cosine_results": {"cv.pdf": [(JOB, 0.5)]}}}
+            yield "custom", {"score_result": score}
+
+    kept = asyncio.run(stream_results(FakeGraph(), {}, "ndjson"))
+
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert kept == []
+    assert [event["event"] for event in events] == ["cosine_ranking", "score"]
+    assert events[0]["jobs"] == [{"job_reference": "u1", "title": "Backend Engineer", "cosine_similarity_score": 0.5}]
+    assert events[1]["overall_fit_score"] == 0.9 and events[1]["candidate_reference"] == "cv.pdf"
+
+
+class OllamaLikeChat(BaseChatModel):
+    """Chat model reporting Ollama's timing fields, as ChatOllama does."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "ollama-like"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        info = {
+            "prompt_eval_count": 120, "eval_count": 30, "load_duration": 500_000_000,
+            "prompt_eval_duration": 200_000_000, "eval_duration": 600_000_000,
+        }
+        return ChatResult(generations=[ChatGeneration(message=AIMessage("ok"), generation_info=info)])
+
+
+def test_run_metrics_record_nodes_llm_eval_and_counters():
+    class State(TypedDict):
+        done: bool
+
+    async def scorer(state: State) -> dict:
+        await OllamaLikeChat().ainvoke("score this")
+        metrics.count("crawl_cache_lookups", outcome="hit")
+        metrics.count("crawl_cache_lookups", outcome="miss")
+        metrics.record_item("scorer", "u1", 0.25)
+        return {"done": True}
+
+    builder = StateGraph(State)
+    builder.add_node("scorer", scorer)
+    builder.add_edge(START, "scorer")
+    builder.add_edge("scorer", END)
+    graph = builder.compile()
+
+    metrics.count("crawl_cache_lookups", outcome="hit")  # outside a recorded run: ignored
+    with metrics.recording() as run:
+        asyncio.run(graph.ainvoke({"done": False}, {"callbacks": [metrics.MetricsCallback(run)]}))
+    report = run.report()
+
+    assert list(report["nodes"]) == ["scorer"]
+    assert report["nodes"]["scorer"]["tasks"] == 1
+    llm = report["llm"]["scorer"]
+    assert (llm["calls"], llm["prompt_tokens"], llm["completion_tokens"]) == (1, 120, 30)
+    assert (llm["prompt_eval_s"], llm["eval_s"], llm["load_s"]) == (0.2, 0.6, 0.5)
+    assert llm["completion_tokens_per_s"] == 50.0
+    assert report["hit_rates"]["crawl_cache"] == 0.5
+    assert report["items"] == [{"node": "scorer", "item": "u1", "seconds": 0.25}]
+    prometheus = run.prometheus()
+    assert 'cv_rank_llm_prompt_tokens_total{node="scorer"} 120' in prometheus
+    assert 'cv_rank_crawl_cache_lookups_total{outcome="miss"} 1' in prometheus
@@ -0,0 +1,215 @@
+"""Tests for the ranking service."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from cv_rank_agent import service as service_module
+from cv_rank_agent.clients import EndpointPool, chat_model
+from cv_rank_agent.config import Settings, settings
+from cv_rank_agent.models import JobDescription, ScoreResult
+
+JOB = JobDescription(title="Backend Engineer", job_description="Build APIs.", source_url="u1")
+SCORE = ScoreResult(
+    job_reference="u1", candidate_reference="cv.pdf", overall_fit_score=0.9, skill_match_score=0.8,
+    experience_match_score=0.7, llm_explanation="ok", cosine_similarity_score=0.5,
+)
+
+
+class FakeGraph:
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.release.set()
+        self.stopped = False
+
+    async def ainvoke(self, inputs, config=None):
+        await self.release.wait()
+        return {"score_results": [SCORE]}
+
+    async def astream(self, inputs, config=None, *, stream_mode):
+        try:
+            yield "updates", {"embedder": {"cosine_results": {"cv.pdf": [(JOB, 0.5)]}}}
+            yield "custom", {"score_result": SCORE}
+        finally:
+            self.stopped = True
+
+
+@pytest.fixture
+def no_warmup(monkeypatch):
+    async def start(self, app):
+        return None
+
+    monkeypatch.setattr(service_module.RankingService, "_start", start)
+
+
+def test_rank_returns_scores_and_streams_events(no_warmup):
+    async def run():
+        service = service_module.RankingService(graph=FakeGraph())
+        async with TestClient(TestServer(service.app())) as client:
+            response = await client.post("/rank", json={"cv_paths": ["cv.pdf"], "job_urls": ["u1"]})
+            body = await response.json()
+            streamed = await client.post("/rank", json={"cv_paths": ["cv.pdf"], "job_urls": ["u1"], "stream": True})
+            events = [json.loads(line) for line in (await streamed.text()).splitlines()]
+            invalid = await client.post("/rank", json={"cv_paths": "cv.pdf", "job_urls": ["u1"]})
+            return response.status, body, events, invalid.status
+
+    status, body, events, invalid_status = asyncio.run(run())
+
+    assert status == 200
+    assert [score["overall_fit_score"] for score in body["score_results"]] == [0.9]
+    assert body["metrics"]["run_id"] == body["run_id"]
+    assert [event["event"] for event in events] == ["cosine_ranking", "score", "done"]
+    assert events[0]["jobs"][0]["cosine_similarity_score"] == 0.5
+    assert invalid_status == 400
+
+
+def test_streamed_run_stops_when_the_client_disconnects(no_warmup, monkeypatch, caplog):
+    written = []
+
+    class DisconnectedResponse(service_module.web.StreamResponse):
+        async def write(self, data):
+            if written:
+                raise ConnectionResetError("Cannot write to closing transport")
+            written.append(data)
+            await super().write(data)
+
+    monkeypatch.setattr(service_module.web, "StreamResponse", DisconnectedResponse)
+    graph = FakeGraph()
+
+    async def run():
+        service = service_module.RankingService(graph=graph)
+        async with TestClient(TestServer(service.app())) as client:
+            response = await client.post("/rank", json={"cv_paths": ["cv.pdf"], "job_urls": ["u1"], "stream": True})
+            return response.status, await response.text()
+
+    status, text = asyncio.run(run())
+
+    assert status == 200 and [json.loads(line)["event"] for line in text.splitlines()] == ["cosine_ranking"]
+    assert graph.stopped and len(written) == 1
+    assert "client disconnected" in caplog.text and "failed" not in caplog.text
+
+
+def test_rank_rejects_runs_beyond_the_queue(no_warmup):
+    async def run():
+        graph = FakeGraph()
+        graph.release.clear()
+        service = service_module.RankingService(graph=graph, queue=service_module.RunQueue(max_running=1, max_queued=1))
+        async with TestClient(TestServer(service.app())) as client:
+            request = {"cv_paths": ["cv.pdf"], "job_urls": ["u1"]}
+            first = asyncio.create_task(client.post("/rank", json=request))
+            second = asyncio.create_task(client.post("/rank", json=request))
+            while service.queue.queued < 1:
+                await asyncio.sleep(0.01)
+            health = await (await client.get("/health")).json()
+            rejected = await client.post("/rank", json=request)
+            graph.release.set()
+            return health, rejected.status, rejected.headers.get("Retry-After"), (await first).status, (await second).status
+
+    health, rejected, retry_after, first, second = asyncio.run(run())
+
+    assert (health["running"], health["queued"]) == (1, 1)
+    assert (rejected, retry_after) == (503, "5")
+    assert (first, second) == (200, 200)
+
+
+def test_chat_models_are_reused_per_settings_and_event_loop(monkeypatch):
+    model = settings.llm_model
+
+    async def models():
+        monkeypatch.setattr(settings, "llm_model", model)
+        first, again = chat_model(ScoreResult).client(), chat_model(ScoreResult).client()
+        monkeypatch.setattr(settings, "llm_model", "other-model")
+        return first, again, chat_model(ScoreResult).client()
+
+    first, again, other = asyncio.run(models())
+    next_loop, _, _ = asyncio.run(models())
+
+    assert first is again
+    assert other is not first
+    assert next_loop is not first  # async connection pools are bound to their event loop
+
+
+def _pool(*models):
+    pool = EndpointPool([f"http://ollama-{i}" for i in range(len(models))])
+    for endpoint, served in zip(pool.endpoints, models):
+        endpoint.models, endpoint.checked_at = set(served), float("inf")  # no health checks
+    return pool
+
+
+def test_endpoint_pool_dispatches_to_least_busy_endpoint_serving_the_model():
+    pool = _pool({"llama3.1:8b", "nomic-embed-text:latest"}, {"llama3.1:8b"}, {"nomic-embed-text:latest"})
+
+    chat = [pool.acquire("llama3.1:8b") for _ in range(4)]
+    embed = pool.acquire("nomic-embed-text")
+
+    assert [e.url for e in chat] == ["http://ollama-0", "http://ollama-1", "http://ollama-0", "http://ollama-1"]
+    assert embed.url == "http://ollama-2"
+
+
+def test_endpoint_pool_fails_over_on_timeouts():
+    pool = _pool({"llama3.1:8b"}, {"llama3.1:8b"})
+    calls = []
+
+    async def call(url):
+        calls.append(url)
+        if url == "http://ollama-0":
+            raise httpx.ReadTimeout("timed out")
+        return url
+
+    first = asyncio.run(pool.arun("llama3.1:8b", call))
+    second = asyncio.run(pool.arun("llama3.1:8b", call))
+
+    assert calls == ["http://ollama-0", "http://ollama-1", "http://ollama-1"]  # the timed-out endpoint is marked down
+    assert (first, second) == ("http://ollama-1", "http://ollama-1")
+    assert [e.outstanding for e in pool.endpoints] == [0, 0]
+
+
+def test_endpoint_pool_routes_only_the_missing_model_around_a_404():
+    from ollama import ResponseError
+
+    both = {"llama3.1:8b", "llama3.2:3b"}
+    pool = _pool(both, both)  # the last health check listed both models on both endpoints
+    calls = []
+
+    def call(model):
+        def on(url):
+            calls.append((url, model))
+            if model == "llama3.2:3b" and url == "http://ollama-0":
+                raise ResponseError(f"model '{model}' not found", 404)  # removed since the health check
+            return url
+        return on
+
+    small = [pool.run("llama3.2:3b", call("llama3.2:3b")) for _ in range(2)]
+    large = [pool.run("llama3.1:8b", call("llama3.1:8b")) for _ in range(2)]
+
+    assert small == ["http://ollama-1", "http://ollama-1"]
+    assert [url for url, model in calls if model == "llama3.2:3b"] == ["http://ollama-0", "http://ollama-1", "http://ollama-1"]
+    assert large == ["http://ollama-0", "http://ollama-0"]  # still routed its other models (it has the fewest dispatched)
+    assert all(e.healthy for e in pool.endpoints)
+
+    def missing_everywhere(url):
+        raise ResponseError("model 'llama3.2:3b' not found", 404)
+
+    with pytest.raises(ResponseError):  # no endpoint left with the model: the 404 is raised, not a LookupError
+        pool.run("llama3.2:3b", missing_everywhere)
+
+
+def test_endpoint_pool_does_not_retry_bad_requests():
+    pool = _pool({"llama3.1:8b"}, {"llama3.1:8b"})
+    calls = []
+
+    def call(url):
+        calls.append(url)
+        raise ValueError("invalid schema")
+
+    with pytest.raises(ValueError):
+        pool.run("llama3.1:8b", call)
+    assert len(calls) == 1 and all(e.healthy for e in pool.endpoints)
+
+
+def test_ollama_endpoints_setting_is_comma_separated(monkeypatch):
+    monkeypatch.setenv("OLLAMA_ENDPOINTS", "http://gpu-1:11434/, http://gpu-2:11434")
+    assert Settings().ollama_endpoints == ["http://gpu-1:11434/", "http://gpu-2:11434"]
@@ -0,0 +1,36 @@
+"""Import-time budgets: heavy dependencies are only imported by the stages that use them."""
+
+import re
+import subprocess
+import sys
+
+_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)")
+
+# Cumulative import time budgets (ms); generous, to catch eager heavy imports rather than jitter
+CLI_BUDGET_MS = 300
+GRAPH_BUDGET_MS = 4000
+
+# Imported only when a page is crawled, an LLM or embedding call is made, or a CV file is read
+DEFERRED = {"crawl4ai", "playwright", "langchain_ollama", "ollama", "numpy", "pymupdf", "docx", "aiohttp"}
+
+
+def _import(module: str) -> dict[str, int]:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True,
+    ).stderr
+    return {m.group(2): int(m.group(1)) for m in map(_LINE.match, stderr.splitlines()) if m}
+
+
+def test_cli_module_imports_only_the_standard_library():
+    times = _import("cv_rank_agent.__main__")
+
+    third_party = {name.split(".")[0] for name in times} & (DEFERRED | {"pydantic", "langgraph", "langchain_core"})
+    assert third_party == set()
+    assert times["cv_rank_agent.__main__"] / 1000 < CLI_BUDGET_MS
+
+
+def test_graph_import_defers_crawler_llm_clients_and_numpy():
+    times = _import("cv_rank_agent.graph")
+
+    assert {name.split(".")[0] for name in times} & DEFERRED == set()
+    assert times["cv_rank_agent.graph"] / 1000 < GRAPH_BUDGET_MS
@@ -0,0 +1,105 @@
+"""Tests for watch mode (incremental re-ranking)."""
+
+import asyncio
+
+from cv_rank_agent import metrics
+from cv_rank_agent import watch as watch_module
+from cv_rank_agent.config import settings
+from cv_rank_agent.embedding_store import EmbeddingStore, text_key
+from cv_rank_agent.models import JobDescription, ParsedCV, ScoreResult
+
+
+class FakeCache:
+    def __init__(self):
+        self.stale = set()
+
+    def get(self, url):
+        return None, url not in self.stale
+
+
+class FakePool:
+    def __init__(self):
+        self.cache = FakeCache()
+
+
+def _use_fakes(monkeypatch, pages):
+    pool, parsed, scored = FakePool(), [], []
+
+    async def parse_job(i, total, url, pool, llm, slots, store):
+        parsed.append(url)
+        return JobDescription(title=url, job_description=pages[url], source_url=url), "llm", "llama3.1:8b"
+
+    async def scorer(state, writer):
+        pairs = [(cv, job.source_url) for cv in state["parsed_cvs"] for job in state["job_descriptions"]]
+        scored.extend(pairs)
+        return {"score_results": [
+            ScoreResult(
+                job_reference=url, candidate_reference=cv, overall_fit_score=0.5, skill_match_score=0.5,
+                experience_match_score=0.5, llm_explanation=pages[url],
+            )
+            for cv, url in pairs
+        ]}
+
+    async def close_shared_pool():
+        return None
+
+    monkeypatch.setattr(watch_module, "cv_parser", lambda state: {"parsed_cvs": {"cv.pdf": ParsedCV(name="Ada")}})
+    monkeypatch.setattr(watch_module, "_parse_job", parse_job)
+    monkeypatch.setattr(watch_module, "scorer", scorer)
+    monkeypatch.setattr(watch_module, "shared_pool", lambda: pool)
+    monkeypatch.setattr(watch_module, "close_shared_pool", close_shared_pool)
+    monkeypatch.setattr(watch_module, "chat_model", lambda schema, model=None: None)
+    return pool, parsed, scored
+
+
+def test_refresh_only_processes_added_changed_and_removed_jobs(monkeypatch):
+    pages = {"a": "Python", "b": "Go", "c": "Rust"}
+    pool, parsed, scored = _use_fakes(monkeypatch, pages)
+    ranking = watch_module.IncrementalRanking(["cv.pdf"])
+
+    async def run():
+        first = await ranking.refresh(["a", "b"])
+        parsed.clear(), scored.clear()
+        added = await ranking.refresh(["a", "b", "c"])
+        added_work = (list(parsed), list(scored))
+        parsed.clear(), scored.clear()
+        pages["b"] = "Go and Kubernetes"
+        pool.cache.stale = {"b"}
+        changed = await ranking.refresh(["b", "c"])
+        return first, added, added_work, changed
+
+    first, added, added_work, changed = asyncio.run(run())
+
+    assert (first.added, first.scored) == (["a", "b"], 2)
+    assert (added.added, added.changed, added.scored) == (["c"], [], 1)
+    assert added_work == (["c"], [("cv.pdf", "c")])
+    assert (changed.changed, changed.removed, changed.rechecked, changed.scored) == (["b"], ["a"], 1, 1)
+    assert parsed == ["b"] and scored == [("cv.pdf", "b")]
+    assert {s.job_reference: s.llm_explanation for s in ranking.score_results} == {"b": "Go and Kubernetes", "c": "Rust"}
+
+
+def test_refresh_discards_embeddings_of_removed_and_changed_jobs(monkeypatch):
+    pages = {"a": "Python", "b": "Go", "c": "Rust"}
+    pool, _, _ = _use_fakes(monkeypatch, pages)
+    monkeypatch.setattr(settings, "embedding_compact_share", 0.5)
+    store = EmbeddingStore()
+    store.add({text_key(text): [float(i), 1.0] for i, text in enumerate(pages.values())})
+    ranking = watch_module.IncrementalRanking(["cv.pdf"])
+
+    async def run():
+        await ranking.refresh(["a", "b", "c"])
+        await ranking.refresh(["b", "c"])
+        dead_after_removal = EmbeddingStore().dead_rows()
+        pages["b"] = "Go and Kubernetes"
+        pool.cache.stale = {"b"}
+        with metrics.recording() as run:
+            await ranking.refresh(["b", "c"])
+        return dead_after_removal, run
+
+    dead_after_removal, run = asyncio.run(run())
+
+    store = EmbeddingStore()
+    assert dead_after_removal == 1  # one of three rows dead: below the compaction threshold
+    assert run.counter("embedding_rows_reclaimed") == 2
+    assert store.rows([text_key(text) for text in ("Python", "Go", "Rust")]) == {text_key("Rust"): 0}
+    assert store.dead_rows() == 0 and store.matrix().tolist() == [[2.0, 1.0]]